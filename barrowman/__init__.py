@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from math import pi, atan, tan, radians
+import weakref
+import numpy
 
 __author__ = 'Nathan Bergey'
 __email__ = 'nathan.bergey@gmail.com'
@@ -10,8 +12,21 @@ class Component(object):
     """Base class for a single rocket Component. This can be something
     like a nosecone or the body of a rocket. It is a physical thing that
     has a length and width, and therefore volume and area.
+
+    Derived quantities (volume, area) are computed once and cached. Setting any
+    attribute of the component throws the cache away and tells every model
+    built from the component (e.g. an `original.Body`) to do the same.
     """
 
+    def __setattr__(self, name, value):
+        super(Component, self).__setattr__(name, value)
+        self._invalidate()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_listeners', None)
+        return state
+
     @property
     def length(self):
         """The length of the component"""
@@ -20,12 +35,35 @@ class Component(object):
     @property
     def volume(self):
         """The volume of the component"""
-        return self._volume()
+        return self._cached('volume', self._volume)
 
     @property
     def area(self):
         """The area of the component"""
-        return self._area()
+        return self._cached('area', self._area)
+
+    @property
+    def _radius(self):
+        return self._width / 2.0
+
+    def _cached(self, key, compute):
+        cache = self.__dict__.setdefault('_cache', {})
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = compute()
+            return value
+
+    def _invalidate(self):
+        self.__dict__.pop('_cache', None)
+        for listener in list(self.__dict__.get('_listeners', ())):
+            listener._component_changed(self)
+
+    def _listen(self, listener):
+        """Register an object whose ``_component_changed(component)`` method
+        is called every time this component changes. Listeners are held weakly.
+        """
+        self.__dict__.setdefault('_listeners', weakref.WeakSet()).add(listener)
 
 
 class Nose(Component):
@@ -36,26 +74,112 @@ class Nose(Component):
     :param str shape: The type of nosecone, see class for list of valid shapes
     :param float width: The diameter of the nose [meters]
     :param float length: The length of the nose [meters]
+    :param float parameter: (Optional, default=None) The shape parameter, for
+                            the shapes that have one (see `nose_volume`)
 
     """
 
-    CONE = 'cone'   #: Shape type 'cone'
+    CONE = 'cone'                    #: Shape type 'cone'
+    OGIVE = 'ogive'                  #: Shape type 'ogive' (tangent ogive)
+    SECANT_OGIVE = 'secant ogive'    #: Shape type 'secant ogive', parameter: ogive radius
+    ELLIPSOID = 'ellipsoid'          #: Shape type 'ellipsoid' (half ellipsoid)
+    PARABOLIC = 'parabolic'          #: Shape type 'parabolic' series, parameter: K
+    POWER = 'power'                  #: Shape type 'power' series, parameter: n
+    HAACK = 'haack'                  #: Shape type 'haack' series, parameter: C
 
-    def __init__(self, shape, width, length):
+    #: All the valid shapes
+    SHAPES = (CONE, OGIVE, SECANT_OGIVE, ELLIPSOID, PARABOLIC, POWER, HAACK)
+
+    def __init__(self, shape, width, length, parameter=None):
+        if shape not in self.SHAPES:
+            raise ValueError("Unknown nose shape: {0!r}".format(shape))
         self.shape = shape
+        self.parameter = parameter
         self._width = width
         self._length = length
-        self._radius = width / 2.0
 
     def _volume(self):
-        if self.shape == self.CONE:
-            return pi * self._radius**2 * self._length / 3.0
-        return 0
+        return float(nose_volume(self.shape, self._width, self._length, self.parameter))
+
+    def _geometry(self):
+        return ('Nose', self.shape, self.parameter, self._width, self._length)
 
     def _area(self):
         return pi * self._radius**2
 
 
+def _shape_parameter(shape, parameter, R, L):
+    """The parameter of a nose shape, with None (or NaN entries) replaced by
+    the default for the shape"""
+    if shape == Nose.SECANT_OGIVE:
+        default = (R**2 + L**2) / (2 * R)   # radius of the tangent ogive
+    else:
+        default = {Nose.PARABOLIC: 1.0, Nose.POWER: 0.5, Nose.HAACK: 0.0}.get(shape, numpy.nan)
+    if parameter is None:
+        return default
+    return numpy.where(numpy.isnan(parameter), default, parameter)
+
+
+def _ogive_volume(R, L, rho, a, b):
+    """Volume under y = sqrt(rho^2 - (a - x)^2) - b from x = 0 to L"""
+    def F(u):
+        return ((rho**2 + b**2) * u - u**3 / 3.0
+                - b * (u * numpy.sqrt(rho**2 - u**2) + rho**2 * numpy.arcsin(u / rho)))
+    return pi * (F(a) - F(a - L))
+
+
+def nose_volume(shape, width, length, parameter=None):
+    """Volume of a nosecone, from the closed form integral of its profile.
+    Works on floats or on arrays of widths, lengths and parameters.
+
+    The shapes, with R the base radius, L the length and y(x) the radius at a
+    distance x from the tip:
+
+    - CONE: y = R x/L
+    - OGIVE: the circular arc of radius rho = (R^2 + L^2)/2R tangent to the body
+    - SECANT_OGIVE: a circular arc of radius ``parameter`` (at least half the
+      length of the nose side, sqrt(R^2 + L^2)/2) through the tip and the base,
+      default the tangent ogive radius
+    - ELLIPSOID: half an ellipsoid, y = R sqrt(1 - (1 - x/L)^2)
+    - PARABOLIC: y = R (2(x/L) - K(x/L)^2)/(2 - K), K = ``parameter``
+      between 0 (cone) and 1 (full parabola, the default)
+    - POWER: y = R (x/L)^n, n = ``parameter`` between 0 and 1 (cone), default
+      0.5
+    - HAACK: y = R/sqrt(pi) sqrt(t - sin(2t)/2 + C sin(t)^3) with
+      t = acos(1 - 2x/L), C = ``parameter``: 0 for Von Karman (the default),
+      1/3 for LV-Haack
+
+    :param str shape: The type of nosecone, one of `Nose.SHAPES`
+    :param width: The diameter of the nose [meters]
+    :param length: The length of the nose [meters]
+    :param parameter: (Optional, default=None) The shape parameter; None, or
+                      NaN entries, for the default of the shape
+    :returns: the volume [meters^3]
+
+    """
+    R = numpy.multiply(width, 0.5)
+    L = length
+    p = _shape_parameter(shape, parameter, R, L)
+
+    if shape == Nose.CONE:
+        return pi * R**2 * L / 3.0
+    if shape == Nose.ELLIPSOID:
+        return 2 * pi * R**2 * L / 3.0
+    if shape == Nose.POWER:
+        return pi * R**2 * L / (2 * p + 1)
+    if shape == Nose.PARABOLIC:
+        return pi * R**2 * L * (4 / 3.0 - p + p**2 / 5.0) / (2 - p)**2
+    if shape == Nose.HAACK:
+        return pi * R**2 * L * (0.5 + 3 * p / 16.0)
+    if shape == Nose.OGIVE:
+        rho = (R**2 + L**2) / (2 * R)
+        return _ogive_volume(R, L, rho, L, rho - R)
+    if shape == Nose.SECANT_OGIVE:
+        alpha = numpy.arctan(R / L) - numpy.arccos(numpy.sqrt(L**2 + R**2) / (2 * p))
+        return _ogive_volume(R, L, p, p * numpy.cos(alpha), -p * numpy.sin(alpha))
+    raise ValueError("Unknown nose shape: {0!r}".format(shape))
+
+
 class Tube(Component):
     """A cylindrical section of rocket.
 
@@ -67,11 +191,13 @@ class Tube(Component):
     def __init__(self, width, length):
         self._width = width
         self._length = length
-        self._radius = width / 2.0
 
     def _volume(self):
         return pi * (self._width/2.0)**2 * self._length
 
+    def _geometry(self):
+        return ('Tube', self._width, self._length)
+
     def _area(self):
         return pi * self._radius**2
 
@@ -108,3 +234,6 @@ class Fin(Component):
         else:
             self.sweep = span * tan(radians(sweepangle))
             self.sweepangle = radians(sweepangle)
+
+    def _geometry(self):
+        return ('Fin', self.root, self.tip, self.span, self.sweep)
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+import sys
+from barrowman.cli import main
+
+sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Batch Evaluation
+================
+
+Evaluate the `original` Barrowman equations for many rocket designs at once.
+
+Instead of building a `Nose`, `Tube` and `Fin` object (and an `original.Body`,
+`Tail` and `Rocket`) for every design, a `RocketBatch` holds the geometry as
+columns -- one array per parameter, one entry per design -- and runs each
+equation across every design in a single NumPy expression.
+
+Each design is a simple rocket: a nosecone followed by one or more tubes of the
+same diameter, with a set of identical trapezoidal fins at the bottom.
+"""
+# -*- coding: utf-8 -*-
+import numpy
+from barrowman import Nose, nose_volume
+from barrowman.original import _tail_terms, _tail_C_Na
+
+
+def _broadcast(value, Mach):
+    """Spread a per-design result over a Mach argument that broadcasts against
+    the designs (e.g. a column of Mach numbers for a Mach x design table).
+    """
+    shape = numpy.broadcast(value, Mach).shape
+    if value.shape == shape:
+        return value
+    return numpy.array(numpy.broadcast_to(value, shape))
+
+
+class TailBatch(object):
+    """A set of tails (fin sets) stored column-wise, the batch counterpart of
+    `original.Tail`.
+
+    :param root: Root chord of the fins [meters]
+    :param tip: Tip chord of the fins [meters]
+    :param span: Span of the fins [meters]
+    :param sweep: (Optional, default=None) Sweep length of the fins [meters]
+    :param sweepangle: (Optional, default=45.0) Sweep angle of the fins, used
+                       when sweep is not given [degrees]
+    :param N: (Optional, default=4) Number of fins
+    :param width: (Optional, default=0) Diameter of the body at the fins
+                  [meters], 0 for fins without a body
+
+    """
+
+    def __init__(self, root, tip, span, sweep=None, sweepangle=45.0, N=4, width=0):
+        if sweep is None:
+            sweep = numpy.multiply(span, numpy.tan(numpy.radians(sweepangle)))
+
+        columns = numpy.broadcast_arrays(*[numpy.asarray(c, dtype=float) for c in (
+            root, tip, span, sweep, N, width)])
+        columns = [numpy.atleast_1d(c) for c in columns]
+
+        self.root = columns[0]    #: Root chord of the fins
+        self.tip = columns[1]     #: Tip chord of the fins
+        self.span = columns[2]    #: Span of the fins
+        self.sweep = columns[3]   #: Sweep length of the fins
+        self.N = columns[4]       #: Number of fins
+        self.width = columns[5]   #: Diameter of the body at the fins
+        self._C_Na_terms = None
+
+    def __len__(self):
+        return len(self.root)
+
+    def C_P(self, Mach):
+        """Partial center of pressure of each tail (eq. 3-10), see
+        `original.Tail.C_P`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of tail centers of pressure [meters] (from the fin root
+                  leading edge)
+
+        """
+        x_t = self.sweep
+        c_r = self.root
+        c_t = self.tip
+
+        X = ((x_t / 3.0) * ((c_r + (2 * c_t)) / (c_r + c_t)))
+        X += (1 / 6.0) * (c_r + c_t - (c_r * c_t)/(c_r + c_t))
+
+        return _broadcast(X, Mach)
+
+    def C_Na(self, Mach, A_r):
+        """Normal force coefficient derivative of each tail, including fin-body
+        interference, see `original.Tail.C_Na`.
+
+        The geometry-only terms are computed on the first call and reused.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :param A_r: Reference area, a float or one per design [meters^2]
+        :returns: array of tail C_Na
+
+        """
+        if self._C_Na_terms is None:
+            self._C_Na_terms = _tail_terms(self.root, self.tip, self.span, self.sweep,
+                                           self.N, self.width)
+        a, b, c, k = self._C_Na_terms
+        return _tail_C_Na(Mach, a, b, c, k / A_r)
+
+
+def rocket_C_P(X_B, C_NaB, X_T, C_NaT):
+    """Combine body and tail results into the center of pressure of the whole
+    rocket (eq. 3-107), see `original.Rocket.C_P`. Arguments are arrays (or
+    floats) that broadcast against each other.
+
+    :param X_B: Body center of pressure [meters] (tip of nose = 0)
+    :param C_NaB: Body normal force coefficient derivative
+    :param X_T: Tail center of pressure [meters] (tip of nose = 0)
+    :param C_NaT: Tail normal force coefficient derivative
+    :returns: rocket center of pressure [meters] (tip of nose = 0)
+
+    """
+    return (X_B*C_NaB + X_T*C_NaT)/(C_NaB + C_NaT)
+
+
+class RocketBatch(object):
+    """A set of rocket designs stored column-wise.
+
+    Every parameter may be an array with one entry per design, or a single
+    number shared by all designs. Parameters follow the same conventions (and
+    SI units) as `barrowman.Nose`, `barrowman.Tube` and `barrowman.Fin`.
+
+    :param width: Diameter of the body [meters]
+    :param nose_length: Length of the nosecone [meters]
+    :param tube_length: Length of the tube section [meters]. A 2-D array
+                        (designs x tubes) describes several tubes per design.
+    :param root: Root chord of the fins [meters]
+    :param tip: Tip chord of the fins [meters]
+    :param span: Span of the fins [meters]
+    :param sweep: (Optional, default=None) Sweep length of the fins [meters]
+    :param sweepangle: (Optional, default=45.0) Sweep angle of the fins, used
+                       when sweep is not given [degrees]
+    :param N: (Optional, default=4) Number of fins
+    :param str nose_shape: (Optional, default=Nose.CONE) Shape of every nosecone
+    :param nose_parameter: (Optional, default=None) Shape parameter of the
+                           nosecones, see `barrowman.nose_volume`; None or NaN
+                           for the default of the shape
+
+    """
+
+    def __init__(self, width, nose_length, tube_length, root, tip, span,
+                 sweep=None, sweepangle=45.0, N=4, nose_shape=Nose.CONE, nose_parameter=None):
+        if nose_shape not in Nose.SHAPES:
+            raise ValueError("Unknown nose shape: {0!r}".format(nose_shape))
+
+        tube_length = numpy.asarray(tube_length, dtype=float)
+        if tube_length.ndim > 1:
+            tube_length = tube_length.sum(axis=-1)
+
+        if sweep is None:
+            sweep = numpy.multiply(span, numpy.tan(numpy.radians(sweepangle)))
+
+        if nose_parameter is None:
+            nose_parameter = numpy.nan
+
+        columns = numpy.broadcast_arrays(*[numpy.asarray(c, dtype=float) for c in (
+            width, nose_length, tube_length, root, tip, span, sweep, N, nose_parameter)])
+        columns = [numpy.atleast_1d(c) for c in columns]
+
+        self.nose_shape = nose_shape
+        self.nose_parameter = columns.pop()  #: Shape parameter of the nosecones (NaN: default)
+        self.width = columns[0]         #: Diameter of the body
+        self.nose_length = columns[1]   #: Length of the nosecone
+        self.tube_length = columns[2]   #: Total length of the tubes
+        root, tip, span, sweep, N = columns[3:]
+        self.tail = TailBatch(root, tip, span, sweep, N=N, width=columns[0])  #: The fins, as a `TailBatch`
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a batch on the fields of a record array with (at least) the
+        fields of `records.RECORD`, e.g. a memory-mapped design file. The
+        float64 fields are used in place, not copied.
+
+        :param records: A NumPy record array, with one nose shape
+        :returns: a `RocketBatch`
+        """
+        codes = numpy.unique(records['nose_shape'])
+        if len(codes) > 1:
+            raise ValueError("The records have {0} nose shapes, a batch has one".format(len(codes)))
+        nose_shape = Nose.SHAPES[int(codes[0])] if len(codes) else Nose.CONE
+        return cls(records['width'], records['nose_length'], records['tube_length'],
+                   records['root'], records['tip'], records['span'],
+                   sweep=records['sweep'], N=records['N'], nose_shape=nose_shape,
+                   nose_parameter=records['nose_parameter'])
+
+    def take(self, index):
+        """Some of the designs, as a new batch.
+
+        :param index: Positions of the designs (or a boolean mask)
+        :returns: a `RocketBatch`
+        """
+        return RocketBatch(self.width[index], self.nose_length[index], self.tube_length[index],
+                           self.root[index], self.tip[index], self.span[index],
+                           sweep=self.sweep[index], N=self.N[index], nose_shape=self.nose_shape,
+                           nose_parameter=self.nose_parameter[index])
+
+    @property
+    def root(self):
+        """Root chord of the fins [meters]"""
+        return self.tail.root
+
+    @property
+    def tip(self):
+        """Tip chord of the fins [meters]"""
+        return self.tail.tip
+
+    @property
+    def span(self):
+        """Span of the fins [meters]"""
+        return self.tail.span
+
+    @property
+    def sweep(self):
+        """Sweep length of the fins [meters]"""
+        return self.tail.sweep
+
+    @property
+    def N(self):
+        """Number of fins"""
+        return self.tail.N
+
+    def __len__(self):
+        return len(self.width)
+
+    @property
+    def l_0(self):
+        """Body length of each design [meters]"""
+        return self.nose_length + self.tube_length
+
+    @property
+    def A_B(self):
+        """Nose base area of each design [meters^2]"""
+        return numpy.pi * (self.width / 2.0)**2
+
+    @property
+    def A_r(self):
+        """Reference area of each design [meters^2]"""
+        return self.A_B
+
+    @property
+    def V_B(self):
+        """Body volume of each design [meters^3]"""
+        return self.V_N + self.A_B * self.tube_length
+
+    @property
+    def V_N(self):
+        """Nosecone volume of each design [meters^3]"""
+        return nose_volume(self.nose_shape, self.width, self.nose_length, self.nose_parameter)
+
+    def body_C_P(self, Mach):
+        """Center of pressure of each body (eq. 3-89), see `original.Body.C_P`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of body centers of pressure [meters] (tip of nose = 0)
+
+        """
+        X = self.l_0 - (self.V_B / self.A_B)
+        return _broadcast(X, Mach)
+
+    def body_C_Na(self, Mach):
+        """Normal force coefficient derivative of each body (eq. 3-66), see
+        `original.Body.C_Na`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of body C_Na
+
+        """
+        return _broadcast(2.0 * (self.A_B / self.A_r), Mach)
+
+    def tail_C_P(self, Mach):
+        """Partial center of pressure of each tail (eq. 3-10), see
+        `original.Tail.C_P`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of tail centers of pressure [meters] (from the fin root
+                  leading edge)
+
+        """
+        return self.tail.C_P(Mach)
+
+    def tail_C_Na(self, Mach):
+        """Normal force coefficient derivative of each tail, see
+        `original.Tail.C_Na`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of tail C_Na
+
+        """
+        return self.tail.C_Na(Mach, self.A_r)
+
+    def C_P(self, Mach):
+        """Center of pressure of each rocket (eq. 3-107), see
+        `original.Rocket.C_P`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of rocket centers of pressure [meters] (tip of nose = 0)
+
+        """
+        X_T = (self.l_0 - self.root) + self.tail_C_P(Mach)
+        return rocket_C_P(self.body_C_P(Mach), self.body_C_Na(Mach), X_T, self.tail_C_Na(Mach))
+
+    def C_Na(self, Mach):
+        """Normal force coefficient derivative of each rocket, see
+        `original.Rocket.C_Na`.
+
+        :param Mach: Mach number, a float or an array that broadcasts against
+                     the designs [dimensionless]
+        :returns: array of rocket C_Na
+
+        """
+        return self.body_C_Na(Mach) + self.tail_C_Na(Mach)
@@ -0,0 +1,308 @@
+"""
+Geometry Cache
+==============
+
+Reuse `original.Body` and `original.Tail` models between designs that share
+parts. Across a sweep, many designs have the same nose and tubes and differ
+only in their fins (or the other way around); a `GeometryCache` hands every
+such design the same model, so its terms are summed and cached once.
+
+Models are looked up by `geometry_key`, a hash of the geometry of their
+components, not by the component objects themselves: two separately built but
+identical noses find the same body.
+
+Results can also be kept between runs, on disk, in a `ResultCache`: an SQLite
+database of C_P and C_Na by geometry, Mach number and the version of the
+equations (`original.EQUATIONS_VERSION`), so results from older equations are
+never used.
+"""
+# -*- coding: utf-8 -*-
+from collections import OrderedDict, namedtuple
+import copy
+import hashlib
+import sqlite3
+import numpy
+import barrowman
+from barrowman import original
+
+#: Statistics of a `GeometryCache`, as returned by `GeometryCache.info`
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'maxsize', 'currsize'))
+
+
+def _canonical(value):
+    """A text form of one geometry value that is the same for equal values"""
+    if value is None:
+        return 'None'
+    if isinstance(value, str):
+        return repr(value)
+    return float(value).hex()
+
+
+def geometry_key(*parts):
+    """Canonical hash of the geometry of some components.
+
+    Components are compared by type and geometry (shape, shape parameter,
+    width and length of nosecones and tubes; root, tip, span and sweep of fins)
+    in order. Other parts (e.g. a fin count) are compared by value.
+
+    :param parts: Components, or numbers and strings
+    :returns: hex digest (str)
+    """
+    text = []
+    for part in parts:
+        if hasattr(part, '_geometry'):
+            geometry = part._geometry()
+            text.append('{0}({1})'.format(geometry[0], ','.join(
+                _canonical(value) for value in geometry[1:])))
+        else:
+            text.append(_canonical(part))
+    return hashlib.sha1(';'.join(text).encode('utf-8')).hexdigest()
+
+
+class GeometryCache(object):
+    """A bounded, least recently used cache of body and tail models.
+
+    The cache keeps its own copies of the components it is given, so later
+    changes to the caller's components do not reach the cached models. The
+    models it returns are shared between every design with the same geometry:
+    use them, don't change them.
+
+    :param int maxsize: (Optional, default=1024) Most models kept (bodies and
+                        tails together); the least recently used is dropped
+                        first. None for no limit.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._models = OrderedDict()
+        self.hits = 0        #: Lookups that found a model
+        self.misses = 0      #: Lookups that built a new model
+        self.evictions = 0   #: Models dropped to stay within maxsize
+
+    def __len__(self):
+        return len(self._models)
+
+    def _get(self, key, build):
+        try:
+            model = self._models[key]
+        except KeyError:
+            self.misses += 1
+            model = self._models[key] = build()
+            if self.maxsize is not None and len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+                self.evictions += 1
+            return model
+        self.hits += 1
+        self._models.move_to_end(key)
+        return model
+
+    def body(self, components):
+        """The body model of some components.
+
+        :param list components: Body components, nose first (see `original.Body`)
+        :returns: an `original.Body`
+        """
+        components = tuple(components)
+        key = geometry_key('body', *components)
+        return self._get(key, lambda: original.Body(copy.deepcopy(components)))
+
+    def tail(self, fin, N, width=None):
+        """The tail model of a fin set.
+
+        :param Fin fin: A fin
+        :param int N: The number of fins
+        :param float width: (Optional, default=None) Diameter of the body at
+                            the fins (see `original.Tail`)
+        :returns: an `original.Tail`
+        """
+        key = geometry_key('tail', fin, N, width)
+        return self._get(key, lambda: original.Tail(copy.deepcopy(fin), N, width))
+
+    def rocket(self, components, fin, N):
+        """A rocket built from cached parts. The fins are attached to the last
+        body component, whose width is used for fin-body interference.
+
+        :param list components: Body components, nose first
+        :param Fin fin: A fin
+        :param int N: The number of fins
+        :returns: an `original.Rocket`
+        """
+        components = tuple(components)
+        return original.Rocket(self.body(components),
+                               self.tail(fin, N, components[-1]._width))
+
+    def info(self):
+        """Statistics of the cache.
+
+        :returns: a `CacheInfo`
+        """
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._models))
+
+    def clear(self):
+        """Drop every model and reset the statistics."""
+        self._models.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+def model_key(model):
+    """Canonical hash of the geometry of a model, see `geometry_key`.
+
+    :param model: An `original.Rocket`, `original.Body` or `original.Tail`
+                  (or a frozen one, see `frozen`)
+    :returns: hex digest (str)
+    """
+    if hasattr(model, 'body') and hasattr(model, 'tail'):
+        return geometry_key('rocket', model_key(model.body), model_key(model.tail))
+    if hasattr(model, 'components'):
+        return geometry_key('body', *model.components)
+    if hasattr(model, '_fin'):
+        return geometry_key('tail', model._fin, model.N, model.width)
+    raise TypeError("Can't key a {0}".format(type(model).__name__))
+
+
+def batch_keys(batch):
+    """Canonical hash of the geometry of every design in a batch.
+
+    :param batch.RocketBatch batch: The designs
+    :returns: list of hex digests (str), one per design
+    """
+    columns = numpy.column_stack([batch.width, batch.nose_length, batch.tube_length,
+                                  batch.root, batch.tip, batch.span, batch.sweep, batch.N,
+                                  batch.nose_parameter]).astype('<f8')
+    columns += 0.0                              # -0.0 is 0.0
+    columns[numpy.isnan(columns)] = numpy.nan   # and every NaN the same NaN
+    prefix = 'batch;{0!r};'.format(batch.nose_shape).encode('utf-8')
+    return [hashlib.sha1(prefix + row.tobytes()).hexdigest() for row in columns]
+
+
+class ResultCache(object):
+    """Results (C_P and C_Na) kept on disk between runs, in SQLite.
+
+    Results are stored by the canonical geometry of a model (`model_key`, or
+    `batch_keys` for the designs of a `batch.RocketBatch`), the Mach number
+    and a version stamp, and are only found again by the same stamp. The
+    stamp names the library and equations versions
+    (`original.EQUATIONS_VERSION`): any change to the equations starts a
+    fresh cache.
+
+    Use `evaluate` for single models and `evaluate_batch` for batches, or
+    `lookup` and `insert` to handle keys directly; every bulk operation is a
+    few queries, however many designs it covers.
+
+    :param str path: Name of the database file (':memory:' for one in memory)
+    :param str version: (Optional, default=None) Version stamp of the
+                        results; None for the library and equations versions
+    """
+
+    def __init__(self, path, version=None):
+        if version is None:
+            version = '{0}/equations-{1}'.format(barrowman.__version__,
+                                                 original.EQUATIONS_VERSION)
+        self.version = version
+        self.hits = 0    #: Results found
+        self.misses = 0  #: Results computed
+        self._db = sqlite3.connect(path)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS results (
+            key TEXT, mach REAL, version TEXT, C_P REAL, C_Na REAL,
+            PRIMARY KEY (key, mach, version)) WITHOUT ROWID""")
+        self._db.execute("CREATE TEMP TABLE lookup (i INTEGER PRIMARY KEY, key TEXT)")
+        self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM results WHERE version = ?",
+                                (self.version,)).fetchone()[0]
+
+    def lookup(self, keys, Mach):
+        """Find stored results.
+
+        :param list keys: Geometry keys
+        :param float Mach: Mach number [dimensionless]
+        :returns: (C_P, C_Na, found): arrays with one entry per key, NaN where
+                  not found, and a boolean array of which were found
+
+        """
+        C_P = numpy.full(len(keys), numpy.nan)
+        C_Na = numpy.full(len(keys), numpy.nan)
+        found = numpy.zeros(len(keys), dtype=bool)
+        with self._db:
+            self._db.execute("DELETE FROM lookup")
+            self._db.executemany("INSERT INTO lookup VALUES (?, ?)", enumerate(keys))
+            rows = self._db.execute(
+                """SELECT lookup.i, results.C_P, results.C_Na FROM lookup JOIN results
+                ON results.key = lookup.key AND results.mach = ? AND results.version = ?""",
+                (float(Mach), self.version)).fetchall()
+        if rows:
+            index, found_C_P, found_C_Na = zip(*rows)
+            index = numpy.array(index)
+            C_P[index] = found_C_P
+            C_Na[index] = found_C_Na
+            found[index] = True
+        return C_P, C_Na, found
+
+    def insert(self, keys, Mach, C_P, C_Na):
+        """Store results, replacing any stored for the same keys.
+
+        :param list keys: Geometry keys
+        :param float Mach: Mach number [dimensionless]
+        :param C_P: Centers of pressure, one per key [meters]
+        :param C_Na: Normal force coefficient derivatives, one per key
+        """
+        Mach, version = float(Mach), self.version
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                ((key, Mach, version, float(c_p), float(c_na))
+                 for key, c_p, c_na in zip(keys, C_P, C_Na)))
+
+    def evaluate(self, model, Mach):
+        """C_P and C_Na of a model, from the cache if stored, otherwise
+        computed and stored.
+
+        :param model: An `original.Rocket`, `original.Body` or `original.Tail`
+        :param float Mach: Mach number [dimensionless]
+        :returns: (C_P, C_Na)
+        """
+        key = model_key(model)
+        C_P, C_Na, found = self.lookup([key], Mach)
+        if found[0]:
+            self.hits += 1
+            return float(C_P[0]), float(C_Na[0])
+        self.misses += 1
+        C_P, C_Na = model.C_P(Mach), model.C_Na(Mach)
+        self.insert([key], Mach, [C_P], [C_Na])
+        return C_P, C_Na
+
+    def evaluate_batch(self, batch, Mach):
+        """C_P and C_Na of every design in a batch. Stored results are looked
+        up in bulk; only the designs missing are evaluated, and then stored.
+
+        :param batch.RocketBatch batch: The designs
+        :param float Mach: Mach number [dimensionless]
+        :returns: (C_P, C_Na), arrays with one entry per design
+        """
+        keys = batch_keys(batch)
+        C_P, C_Na, found = self.lookup(keys, Mach)
+        missing = numpy.flatnonzero(~found)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if len(missing):
+            rest = batch.take(missing)
+            C_P[missing] = rest.C_P(Mach)
+            C_Na[missing] = rest.C_Na(Mach)
+            self.insert([keys[i] for i in missing], Mach, C_P[missing], C_Na[missing])
+        return C_P, C_Na
+
+    def purge(self):
+        """Delete the results of every other version."""
+        with self._db:
+            self._db.execute("DELETE FROM results WHERE version != ?", (self.version,))
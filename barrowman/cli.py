@@ -0,0 +1,149 @@
+"""
+Command Line
+============
+
+The ``barrowman`` command: evaluate files of rocket designs (see `stream` for
+the format) over a list of Mach numbers, and write the results as they are
+found::
+
+    barrowman designs.csv --mach 0.3 0.8 1.2 --jobs 4 -o results.jsonl
+    cat designs.jsonl | barrowman --format jsonl --coefficients C_D C_lp --reynolds 2e6
+
+Designs are read from the files named, or from standard input, and results go
+to standard output unless ``-o`` names a file. ``--profile`` prints how long
+reading, evaluating and writing took to standard error.
+"""
+# -*- coding: utf-8 -*-
+import argparse
+import sys
+import time
+from barrowman import __version__
+from barrowman import stream
+
+
+class _Timer(object):
+    """Time spent getting items from an iterable"""
+
+    def __init__(self, iterable):
+        self.iterable = iterable
+        self.seconds = 0.0
+
+    def __iter__(self):
+        iterator = iter(self.iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds += time.perf_counter() - start
+                return
+            self.seconds += time.perf_counter() - start
+            yield item
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='barrowman', description="Evaluate rocket designs with the Barrowman method.")
+    parser.add_argument('designs', nargs='*', default=['-'],
+                        help="design files (CSV or JSON lines); '-' or none for standard input")
+    parser.add_argument('-o', '--output', default='-',
+                        help="result file; '-' or none for standard output")
+    parser.add_argument('-m', '--mach', type=float, nargs='+', default=[0.3],
+                        help="Mach numbers to evaluate at (default: 0.3)")
+    parser.add_argument('-c', '--coefficients', nargs='+', default=[],
+                        choices=stream.EXTRA_FIELDS, metavar='NAME',
+                        help="other coefficients to add: {0}".format(', '.join(stream.EXTRA_FIELDS)))
+    parser.add_argument('--reynolds', type=float,
+                        help="Reynolds number on the body length, for C_D")
+    parser.add_argument('-f', '--format', choices=(stream.CSV, stream.JSONL),
+                        help="format of the designs (default: from the file name)")
+    parser.add_argument('--output-format', choices=(stream.CSV, stream.JSONL),
+                        help="format of the results (default: from the file name, "
+                             "or the format of the designs)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes; 0 for one per CPU (default: 1)")
+    parser.add_argument('--chunksize', type=int, default=10000,
+                        help="designs evaluated at a time (default: 10000)")
+    parser.add_argument('--profile', action='store_true',
+                        help="print the time taken by each phase to standard error")
+    parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    return parser
+
+
+def _lines(paths):
+    """Each design file in turn, open"""
+    for path in paths:
+        if path == '-':
+            yield sys.stdin
+        else:
+            with open(path) as lines:
+                yield lines
+
+
+def _chunks(paths, format, chunksize):
+    """Chunks of every design file in turn, numbered on from the files before"""
+    start = 0
+    for lines in _lines(paths):
+        for chunk in stream.read_chunks(lines, format, chunksize, start):
+            yield chunk
+            start = chunk[0] + len(chunk[2])
+
+
+def main(argv=None):
+    """Run the ``barrowman`` command.
+
+    :param list argv: (Optional, default=None) Arguments, by default from the
+                      command line
+    :returns: exit status
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if 'C_D' in args.coefficients and args.reynolds is None:
+        parser.error("C_D needs --reynolds")
+
+    formats = []
+    for path in args.designs:
+        if args.format:
+            formats.append(args.format)
+        elif path == '-':
+            parser.error("give --format to read standard input")
+        else:
+            try:
+                formats.append(stream.guess_format(path))
+            except ValueError as error:
+                parser.error(str(error))
+    if len(set(formats)) > 1:
+        parser.error("design files must all be the same format")
+    format = formats[0]
+
+    output_format = args.output_format
+    if output_format is None:
+        try:
+            output_format = stream.guess_format(args.output) if args.output != '-' else format
+        except ValueError:
+            output_format = format
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    started = time.perf_counter()
+    try:
+        reading = _Timer(_chunks(args.designs, format, args.chunksize))
+        evaluating = _Timer(stream.evaluate_chunks(
+            reading, format, args.mach, processes=args.jobs or None,
+            extra=tuple(args.coefficients), Re=args.reynolds))
+        writing = time.perf_counter()
+        rows = stream.write_results(evaluating, out, output_format)
+        writing = time.perf_counter() - writing - evaluating.seconds
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.profile:
+        total = time.perf_counter() - started
+        phases = (('read', reading.seconds),
+                  ('evaluate', evaluating.seconds - reading.seconds),
+                  ('write', writing))
+        for name, seconds in phases:
+            sys.stderr.write('{0:<9} {1:10.4f} s\n'.format(name, seconds))
+        sys.stderr.write('{0:<9} {1:10.4f} s  {2} rows, {3:.0f} rows/s\n'.format(
+            'total', total, rows, rows / total if total else 0.0))
+    return 0
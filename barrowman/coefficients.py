@@ -0,0 +1,276 @@
+"""
+Aerodynamic Coefficients
+========================
+
+The rest of the coefficients the paper sets out to find, beyond the center of
+pressure and normal force: the drag coefficient C_D, the roll forcing moment
+coefficient derivative C_ls, the roll damping moment coefficient derivative
+C_lp and the pitch damping moment coefficient derivative C_mq. They work on
+designs in a `batch.RocketBatch` (a single design is a batch of one).
+
+Every coefficient needs the same handful of geometry terms (fin area, mean
+aerodynamic chord, wetted areas, ...), so those are computed once per batch, in
+a `Geometry`, and passed to each coefficient. `coefficient_table` evaluates all
+of them over a whole grid of designs x Mach numbers x Reynolds numbers at once.
+
+Coefficients are referenced to the body cross-section A_r and, for moments, to
+the body diameter d. Rates are made dimensionless as p d / 2V and q d / 2V.
+"""
+# -*- coding: utf-8 -*-
+import numpy
+from barrowman import Nose, _shape_parameter
+from barrowman.batch import rocket_C_P
+from barrowman.original import _tail_terms, _tail_C_Na
+
+#: Coefficients of `coefficient_table`
+COEFFICIENTS = ('C_P', 'C_Na', 'C_D', 'C_lp', 'C_ls', 'C_mq')
+
+#: Reynolds number of the change from a laminar to a turbulent boundary layer
+RE_CRITICAL = 5e5
+
+
+def _nose_radius(shape, R, L, p, x):
+    """Radius of a nosecone at a distance x from the tip, see `barrowman.nose_volume`"""
+    z = x / L
+    if shape == Nose.CONE:
+        return R * z
+    if shape == Nose.ELLIPSOID:
+        return R * numpy.sqrt(numpy.maximum(1 - (1 - z)**2, 0))
+    if shape == Nose.PARABOLIC:
+        return R * (2 * z - p * z**2) / (2 - p)
+    if shape == Nose.POWER:
+        return R * z**p
+    if shape == Nose.HAACK:
+        t = numpy.arccos(1 - 2 * z)
+        return R / numpy.sqrt(numpy.pi) * numpy.sqrt(t - numpy.sin(2 * t) / 2 + p * numpy.sin(t)**3)
+    if shape == Nose.OGIVE:
+        rho = (R**2 + L**2) / (2 * R)
+        return numpy.sqrt(numpy.maximum(rho**2 - (L - x)**2, 0)) + R - rho
+    if shape == Nose.SECANT_OGIVE:
+        alpha = numpy.arctan(R / L) - numpy.arccos(numpy.sqrt(L**2 + R**2) / (2 * p))
+        a, b = p * numpy.cos(alpha), -p * numpy.sin(alpha)
+        return numpy.sqrt(numpy.maximum(p**2 - (a - x)**2, 0)) - b
+    raise ValueError("Unknown nose shape: {0!r}".format(shape))
+
+
+def nose_wetted_area(shape, width, length, parameter=None, segments=64):
+    """Surface area of the side of a nosecone, from its profile as a chain of
+    conical frustums (closer together towards the tip, where profiles curve
+    the most). Works on floats or on arrays of widths, lengths and parameters.
+
+    :param str shape: The type of nosecone, one of `Nose.SHAPES`
+    :param width: The diameter of the nose [meters]
+    :param length: The length of the nose [meters]
+    :param parameter: (Optional, default=None) The shape parameter, see
+                      `barrowman.nose_volume`
+    :param int segments: (Optional, default=64) Number of frustums
+    :returns: the wetted area [meters^2]
+
+    """
+    R = numpy.multiply(width, 0.5)[..., None]
+    L = numpy.asarray(length, dtype=float)[..., None]
+    if parameter is not None:
+        parameter = numpy.asarray(parameter, dtype=float)[..., None]
+    p = _shape_parameter(shape, parameter, R, L)
+    if shape == Nose.CONE:
+        return (numpy.pi * R * numpy.sqrt(R**2 + L**2))[..., 0]
+
+    x = L * (1 - numpy.cos(numpy.linspace(0, numpy.pi / 2, segments + 1)))
+    y = _nose_radius(shape, R, L, p, x)
+    side = numpy.hypot(numpy.diff(x, axis=-1), numpy.diff(y, axis=-1))
+    return (numpy.pi * ((y[..., 1:] + y[..., :-1]) * side).sum(axis=-1))
+
+
+def skin_friction(Re, Mach):
+    """Flat plate skin friction coefficient.
+
+    Laminar (Blasius, 1.328/sqrt(Re)) below `RE_CRITICAL`, and above it the
+    Prandtl-Schlichting formula for a turbulent boundary layer that starts
+    laminar, 0.074/Re^0.2 - 1740/Re (which meets the laminar value at
+    RE_CRITICAL). Both are corrected for compressibility by the same factor,
+    (1 + 0.144 M^2)^-0.65, so they still meet at any Mach number.
+
+    :param Re: Reynolds number on the length of the plate [dimensionless]
+    :param Mach: Mach number [dimensionless]
+    :returns: the skin friction coefficient, on the wetted area
+
+    """
+    Re = numpy.asarray(Re, dtype=float)
+    laminar = 1.328 / numpy.sqrt(Re)
+    turbulent = 0.074 / Re**0.2 - 1740.0 / Re
+    compressibility = (1 + 0.144 * numpy.square(Mach))**-0.65
+    return numpy.where(Re < RE_CRITICAL, laminar, turbulent) * compressibility
+
+
+def base_drag(Mach):
+    """Base drag coefficient, on the base area: 0.12 + 0.13 M^2 subsonic and
+    0.25/M supersonic.
+
+    :param Mach: Mach number [dimensionless]
+    :returns: the base drag coefficient
+    """
+    Mach = numpy.asarray(Mach, dtype=float)
+    return numpy.where(Mach < 1, 0.12 + 0.13 * Mach**2, 0.25 / numpy.maximum(Mach, 1))
+
+
+class Geometry(object):
+    """The Mach and Reynolds number independent terms of a batch of designs,
+    shared by all the coefficients.
+
+    :param batch.RocketBatch batch: The designs
+    :param int dims: (Optional, default=0) Extra trailing axes to give every
+                     term, so they broadcast against grids of flight
+                     conditions (e.g. 2 for Mach x Re)
+    """
+
+    def __init__(self, batch, dims=0):
+        def column(values):
+            return numpy.reshape(values, numpy.shape(values) + (1,) * dims)
+
+        c_r, c_t, s = batch.root, batch.tip, batch.span
+        self.N = column(batch.N)                  #: Number of fins
+        self.d = column(batch.width)              #: Body diameter [meters]
+        self.r = self.d / 2.0                     #: Body radius at the fins [meters]
+        self.A_r = column(batch.A_r)              #: Reference area [meters^2]
+        self.A_base = column(batch.A_B)           #: Base area [meters^2]
+        self.l_0 = column(batch.l_0)              #: Body length [meters]
+
+        #: Center of pressure of the body and of the tail [meters] (tip of nose = 0)
+        self.X_B = column(batch.body_C_P(0.0))
+        self.X_T = column(batch.l_0 - c_r + batch.tail_C_P(0.0))
+        self.C_NaB = column(batch.body_C_Na(0.0))  #: Body C_Na
+
+        a, b, c, k = _tail_terms(c_r, c_t, s, batch.sweep, batch.N, batch.width)
+        self._tail = tuple(column(term) for term in (a, b, c, k / batch.A_r))
+        self._fin = self._tail[:3]
+
+        A_fin = s * (c_r + c_t) / 2.0
+        self.A_fin = column(A_fin)                #: Area of one fin [meters^2]
+        self.c_mean = column(A_fin / s)           #: Mean chord of the fins [meters]
+        #: Spanwise position of the fin mean aerodynamic chord, from the root [meters]
+        self.y_MA = column(s / 3.0 * (c_r + 2 * c_t) / (c_r + c_t))
+
+        """Spanwise second moment of fin area about the body axis,
+        integral of c(y) y^2 dy from r to r + s for a chord that changes
+        linearly from c_r to c_t (the roll damping integral of the paper)
+        """
+        r = batch.width / 2.0
+        self.I_roll = column((c_r + c_t) * r**2 * s / 2.0 + (c_r + 2 * c_t) * r * s**2 / 3.0
+                             + (c_r + 3 * c_t) * s**3 / 12.0)
+
+        S_nose = nose_wetted_area(batch.nose_shape, batch.width, batch.nose_length,
+                                  batch.nose_parameter)
+        #: Wetted area of the body [meters^2]
+        self.S_body = column(S_nose + numpy.pi * batch.width * batch.tube_length)
+        self.fineness = self.l_0 / self.d         #: Body length over diameter
+
+    def fin_C_Na(self, Mach):
+        """Normal force coefficient derivative of one fin on its own, on A_r"""
+        a, b, c = self._fin
+        return _tail_C_Na(Mach, a, b, c, 1.0 / self.A_r)
+
+    def tail_C_Na(self, Mach):
+        """Normal force coefficient derivative of the tail, with fin-body interference"""
+        return _tail_C_Na(Mach, *self._tail)
+
+
+def C_D(geometry, Mach, Re):
+    """Zero-lift drag coefficient: skin friction of the body and fins, and base
+    drag.
+
+        C_D = C_f(Re) (1 + 1/2f) S_body/A_r + C_f(Re c/l_0) 2 N A_fin/A_r + C_Db A_base/A_r
+
+    with f the fineness ratio of the body and c the mean chord of the fins.
+
+    :param Geometry geometry: The designs
+    :param Mach: Mach number [dimensionless]
+    :param Re: Reynolds number on the body length [dimensionless]
+    :returns: C_D
+
+    """
+    g = geometry
+    body = skin_friction(Re, Mach) * (1 + 0.5 / g.fineness) * g.S_body
+    fins = skin_friction(Re * (g.c_mean / g.l_0), Mach) * 2 * g.N * g.A_fin
+    return (body + fins) / g.A_r + base_drag(Mach) * (g.A_base / g.A_r)
+
+
+def C_ls(geometry, Mach):
+    """Roll forcing moment coefficient derivative, per radian of fin cant.
+    Each fin's normal force acts at its mean aerodynamic chord:
+
+        C_ls = N (y_MA + r_t) C_Na1 / d
+
+    :param Geometry geometry: The designs
+    :param Mach: Mach number [dimensionless]
+    :returns: C_ls [1/rad]
+
+    """
+    g = geometry
+    return g.N * (g.y_MA + g.r) * g.fin_C_Na(Mach) / g.d
+
+
+def C_lp(geometry, Mach):
+    """Roll damping moment coefficient derivative. Rolling at a rate p gives a
+    strip of fin at a distance y from the axis an angle of attack p y / V; by
+    strip theory, with the fin normal force spread evenly over its area:
+
+        C_lp = -2 N C_Na1 (integral of c(y) y^2 dy) / (A_fin d^2)
+
+    :param Geometry geometry: The designs
+    :param Mach: Mach number [dimensionless]
+    :returns: C_lp, per unit of p d / 2V
+
+    """
+    g = geometry
+    return -2 * g.N * g.fin_C_Na(Mach) * g.I_roll / (g.A_fin * g.d**2)
+
+
+def C_mq(geometry, Mach, cg):
+    """Pitch damping moment coefficient derivative. Pitching at a rate q gives
+    the body and the tail an angle of attack q (X - cg) / V at their centers
+    of pressure, so
+
+        C_mq = -2 [C_Na(B) (X_B - cg)^2 + C_Na(T) (X_T - cg)^2] / d^2
+
+    :param Geometry geometry: The designs
+    :param Mach: Mach number [dimensionless]
+    :param cg: Center of gravity [meters] (tip of nose = 0), one or one per design
+    :returns: C_mq, per unit of q d / 2V
+
+    """
+    g = geometry
+    if numpy.ndim(cg):
+        cg = numpy.reshape(cg, numpy.shape(cg) + (1,) * (numpy.ndim(g.d) - 1))
+    return -2 * (g.C_NaB * (g.X_B - cg)**2 + g.tail_C_Na(Mach) * (g.X_T - cg)**2) / g.d**2
+
+
+def coefficient_table(batch, Mach, Re, cg=None):
+    """Every coefficient of every design over a grid of Mach and Reynolds
+    numbers.
+
+    :param batch.RocketBatch batch: The designs
+    :param Mach: Mach numbers [dimensionless]
+    :param Re: Reynolds numbers on the body length [dimensionless]
+    :param cg: (Optional, default=None) Center of gravity [meters] (tip of
+               nose = 0), one or one per design; C_mq is left out without it
+    :returns: dict of arrays of shape (designs, Mach numbers, Reynolds
+              numbers), by coefficient name (see `COEFFICIENTS`)
+
+    """
+    geometry = Geometry(batch, dims=2)
+    Mach = numpy.atleast_1d(numpy.asarray(Mach, dtype=float))[:, None]
+    Re = numpy.atleast_1d(numpy.asarray(Re, dtype=float))[None, :]
+    shape = (len(batch), Mach.shape[0], Re.shape[1])
+
+    C_NaT = geometry.tail_C_Na(Mach)
+    table = {
+        'C_P': rocket_C_P(geometry.X_B, geometry.C_NaB, geometry.X_T, C_NaT),
+        'C_Na': geometry.C_NaB + C_NaT,
+        'C_D': C_D(geometry, Mach, Re),
+        'C_lp': C_lp(geometry, Mach),
+        'C_ls': C_ls(geometry, Mach),
+    }
+    if cg is not None:
+        table['C_mq'] = C_mq(geometry, Mach, cg)
+
+    return dict((name, numpy.broadcast_to(values, shape).copy()) for name, values in table.items())
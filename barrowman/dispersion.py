@@ -0,0 +1,297 @@
+"""
+Dispersion Analysis
+===================
+
+Monte Carlo analysis of manufacturing tolerances: draw random variations of a
+nominal rocket, and find the distribution of its center of pressure, normal
+force coefficient derivative and stability margin.
+
+Samples are drawn and evaluated in chunks, as a `batch.RocketBatch`, and each
+chunk is reduced to running statistics (`Statistics`) before the next is drawn,
+so the number of samples is not limited by memory. Chunks can run in a pool of
+worker processes, a few per worker at a time. Every chunk has its own random stream, spawned from one seed,
+so a seeded run gives the same answer however many processes it runs in.
+"""
+# -*- coding: utf-8 -*-
+from collections import deque
+import multiprocessing
+import numpy
+from barrowman import Nose, Tube
+from barrowman.batch import RocketBatch
+
+#: The parameters that can be dispersed
+PARAMETERS = ('width', 'nose_length', 'tube_length', 'root', 'tip', 'span', 'sweep', 'cg')
+
+
+class Normal(object):
+    """Normally distributed about the nominal value.
+
+    :param float sigma: Standard deviation [units of the parameter]
+    """
+
+    def __init__(self, sigma):
+        self.sigma = sigma
+
+    def sample(self, rng, nominal, size):
+        """Draw samples.
+
+        :param numpy.random.Generator rng: Random number generator
+        :param float nominal: The nominal value
+        :param int size: Number of samples
+        :returns: array of samples
+        """
+        return nominal + self.sigma * rng.standard_normal(size)
+
+
+class Uniform(object):
+    """Uniformly distributed within a tolerance of the nominal value.
+
+    :param float tolerance: Largest deviation from nominal [units of the parameter]
+    """
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+
+    def sample(self, rng, nominal, size):
+        """Draw samples.
+
+        :param numpy.random.Generator rng: Random number generator
+        :param float nominal: The nominal value
+        :param int size: Number of samples
+        :returns: array of samples
+        """
+        return nominal + rng.uniform(-self.tolerance, self.tolerance, size)
+
+
+class Statistics(object):
+    """Running statistics of a stream of values, updated a chunk at a time.
+
+    Keeps the count, mean and sum of squared deviations (merged with Chan et
+    al.'s pairwise update, which stays accurate over many chunks), the range,
+    and a uniform random sample of at most ``reservoir`` values for quantiles.
+
+    :param int reservoir: (Optional, default=100000) Size of the sample kept
+                          for quantiles
+    """
+
+    def __init__(self, reservoir=100000):
+        self.reservoir = reservoir
+        self.count = 0              #: Number of values seen
+        self.mean = 0.0             #: Mean of the values
+        self.minimum = numpy.inf    #: Smallest value
+        self.maximum = -numpy.inf   #: Largest value
+        self._M2 = 0.0
+        self._sample = numpy.empty(0)
+
+    @classmethod
+    def of(cls, values, rng, reservoir=100000):
+        """Statistics of one chunk of values.
+
+        :param values: Array of values
+        :param numpy.random.Generator rng: Picks the kept sample
+        :param int reservoir: (Optional, default=100000) Size of the kept sample
+        :returns: a `Statistics`
+        """
+        values = numpy.ravel(values)
+        stats = cls(reservoir)
+        stats.count = len(values)
+        if stats.count:
+            stats.mean = float(values.mean())
+            stats._M2 = float(((values - stats.mean)**2).sum())
+            stats.minimum = float(values.min())
+            stats.maximum = float(values.max())
+        if stats.count > reservoir:
+            values = rng.choice(values, reservoir, replace=False)
+        stats._sample = values.copy()
+        return stats
+
+    def merge(self, other, rng):
+        """Fold the statistics of more values into these.
+
+        :param Statistics other: Statistics of the other values
+        :param numpy.random.Generator rng: Picks the kept sample
+        """
+        count = self.count + other.count
+        if not other.count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._M2 += other._M2 + delta**2 * self.count * other.count / count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+        # Each kept sample stands for all the values it was drawn from; take
+        # from each in proportion, so the merged sample is uniform over both
+        size = min(self.reservoir, len(self._sample) + len(other._sample))
+        if size < len(self._sample) + len(other._sample):
+            mine = rng.hypergeometric(self.count, other.count, size)
+            mine = min(max(mine, size - len(other._sample)), len(self._sample))
+            self._sample = numpy.concatenate((
+                rng.choice(self._sample, mine, replace=False),
+                rng.choice(other._sample, size - mine, replace=False)))
+        else:
+            self._sample = numpy.concatenate((self._sample, other._sample))
+        self.count = count
+
+    @property
+    def variance(self):
+        """Sample variance of the values"""
+        return self._M2 / (self.count - 1) if self.count > 1 else numpy.nan
+
+    @property
+    def std(self):
+        """Sample standard deviation of the values"""
+        return numpy.sqrt(self.variance)
+
+    def quantile(self, q):
+        """Estimate quantiles of the values from the kept sample.
+
+        :param q: Quantile or array of quantiles, between 0 and 1
+        :returns: the estimated quantiles
+        """
+        return numpy.quantile(self._sample, q)
+
+
+def nominal(rocket):
+    """The dispersable parameters (see `PARAMETERS`) of a rocket.
+
+    :param original.Rocket rocket: A rocket whose body is a nosecone followed
+                                   by tubes of the same width, with a tail
+                                   built with that width (the samples are
+                                   evaluated as a `batch.RocketBatch`, which
+                                   always includes fin-body interference)
+    :returns: dict of nominal values by parameter name, and the fixed
+              'N', 'nose_shape' and 'nose_parameter'
+    """
+    components = rocket.body.components
+    nose = components[0]
+    if not isinstance(nose, Nose) or not all(isinstance(c, Tube) for c in components[1:]):
+        raise ValueError("The body must be a nosecone followed by tubes")
+    if any(tube._width != nose._width for tube in components[1:]):
+        raise ValueError("The tubes must have the width of the nosecone")
+    if rocket.tail.width != nose._width:
+        raise ValueError("The tail must be built with the width of the body, not {0}".format(
+            rocket.tail.width))
+    fin = rocket.tail._fin
+    return {
+        'width': nose._width,
+        'nose_length': nose.length,
+        'tube_length': sum(tube.length for tube in components[1:]),
+        'root': fin.root,
+        'tip': fin.tip,
+        'span': fin.span,
+        'sweep': fin.sweep,
+        'N': rocket.tail.N,
+        'nose_shape': nose.shape,
+        'nose_parameter': nose.parameter,
+    }
+
+
+def _evaluate_chunk(job):
+    """Draw and evaluate one chunk of samples, and reduce it to `Statistics`"""
+    values, distributions, cg, Mach, size, seed, reservoir = job
+    rng = numpy.random.default_rng(seed)
+
+    samples = {}
+    for name in PARAMETERS:
+        if name in distributions:
+            samples[name] = distributions[name].sample(rng, values[name], size)
+        else:
+            samples[name] = values[name]
+
+    batch = RocketBatch(samples['width'], samples['nose_length'], samples['tube_length'],
+                        samples['root'], samples['tip'], samples['span'], samples['sweep'],
+                        N=values['N'], nose_shape=values['nose_shape'],
+                        nose_parameter=values['nose_parameter'])
+    C_P = numpy.broadcast_to(batch.C_P(Mach), (size,))
+    results = {
+        'C_P': C_P,
+        'C_Na': numpy.broadcast_to(batch.C_Na(Mach), (size,)),
+    }
+    if cg is not None:
+        results['margin'] = (C_P - samples['cg']) / samples['width']
+
+    return dict((name, Statistics.of(v, rng, reservoir)) for name, v in results.items())
+
+
+def dispersion(rocket, distributions, samples, cg=None, Mach=0.3, seed=None,
+               chunksize=65536, processes=1, reservoir=100000, pending=2):
+    """Monte Carlo dispersion of the center of pressure, normal force
+    coefficient derivative and (given a center of gravity) stability margin.
+
+    :param original.Rocket rocket: The nominal rocket, a nosecone followed by
+                                   tubes of one width (see `nominal`)
+    :param dict distributions: Distribution of each dispersed parameter, by
+                               name (see `PARAMETERS`), e.g.
+                               ``{'span': Normal(0.0005)}``. Parameters not
+                               given stay nominal.
+    :param int samples: Number of samples
+    :param float cg: (Optional, default=None) Nominal center of gravity
+                     [meters] (tip of nose = 0); needed for the margin and to
+                     disperse 'cg'
+    :param float Mach: (Optional, default=0.3) Mach number [dimensionless]
+    :param seed: (Optional, default=None) Seed of the random numbers; None
+                 for a fresh one every run
+    :param int chunksize: (Optional, default=65536) Samples drawn and
+                          evaluated at a time; bounds the memory used per worker
+    :param int processes: (Optional, default=1) Number of worker processes,
+                          None for one per CPU, 1 to run in this process
+    :param int reservoir: (Optional, default=100000) Size of the sample kept
+                          for quantiles (see `Statistics`)
+    :param int pending: (Optional, default=2) Chunks in flight per worker
+    :returns: dict of `Statistics`, by name: 'C_P' [meters], 'C_Na' [1/rad]
+              and, given cg, 'margin' [calibers]
+
+    """
+    if samples < 1:
+        raise ValueError("Need at least one sample, not {0}".format(samples))
+    unknown = set(distributions) - set(PARAMETERS)
+    if unknown:
+        raise ValueError("Can't disperse {0}".format(', '.join(sorted(unknown))))
+    if cg is None and 'cg' in distributions:
+        raise ValueError("Give the nominal cg to disperse it")
+
+    values = nominal(rocket)
+    values['cg'] = cg
+
+    root = numpy.random.SeedSequence(seed)
+    jobs = ((values, distributions, cg, Mach, min(chunksize, samples - start),
+             numpy.random.SeedSequence(root.entropy, spawn_key=(0, i)), reservoir)
+            for i, start in enumerate(range(0, samples, chunksize)))
+    merge_rng = numpy.random.default_rng(numpy.random.SeedSequence(root.entropy, spawn_key=(1,)))
+
+    chunks = _evaluate_chunks(jobs, processes, pending)
+    try:
+        results = None
+        for chunk in chunks:
+            if results is None:
+                results = chunk
+                continue
+            for name, stats in chunk.items():
+                results[name].merge(stats, merge_rng)
+    finally:
+        chunks.close()
+    return results
+
+
+def _evaluate_chunks(jobs, processes, pending):
+    """Evaluate jobs in order, with no more than ``pending`` per worker
+    submitted ahead of the merge"""
+    if processes == 1:
+        for job in jobs:
+            yield _evaluate_chunk(job)
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        limit = pending * (processes or multiprocessing.cpu_count())
+        queue = deque()
+        for job in jobs:
+            queue.append(pool.apply_async(_evaluate_chunk, (job,)))
+            if len(queue) >= limit:
+                yield queue.popleft().get()
+        while queue:
+            yield queue.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
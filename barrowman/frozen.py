@@ -0,0 +1,277 @@
+"""
+Frozen Models
+=============
+
+Immutable counterparts of the components (`barrowman.Nose`, `barrowman.Tube`,
+`barrowman.Fin`) and models (`original.Body`, `original.Tail`,
+`original.Rocket`), for sharing one model between threads.
+
+The mutable classes cache their derived terms lazily, on first use, and tell
+each other about changes. The frozen ones work everything out when they are
+made and can't be changed afterwards, so evaluating them only ever reads: any
+number of threads can use one model without locks or copies. They keep their
+attributes in ``__slots__``, so they are also smaller.
+
+Use `freeze` to convert a model, and ``replace`` to derive a new model with
+some values changed. Frozen models give the same answers as the mutable ones,
+and frozen components can also be used in the mutable models.
+"""
+# -*- coding: utf-8 -*-
+from math import atan, fsum, pi, radians, tan
+from barrowman import Nose, Tube, Fin, nose_volume
+from barrowman import original
+
+
+class _Frozen(object):
+    """Base of the frozen classes: attributes are set once, in __init__, and
+    ``_arguments`` are the constructor arguments that rebuild the object."""
+
+    __slots__ = ()
+    _arguments = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{0} is frozen, use replace()".format(type(self).__name__))
+
+    __delattr__ = __setattr__
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def _values(self):
+        return dict((name, getattr(self, name)) for name in self._arguments)
+
+    def replace(self, **changes):
+        """A copy with some values changed.
+
+        :param changes: New values, by constructor argument name
+        :returns: a new object of the same class
+        """
+        return type(self)(**dict(self._values(), **changes))
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), self._values()))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self),) + tuple(self._values().values()))
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(name, getattr(self, name)) for name in self._arguments))
+
+
+def _rebuild(cls, values):
+    return cls(**values)
+
+
+class _FrozenComponent(_Frozen):
+    """Base of the frozen components, see `barrowman.Component`"""
+
+    __slots__ = ('_width', '_length', 'volume', 'area')
+
+    @property
+    def width(self):
+        """The diameter of the component"""
+        return self._width
+
+    @property
+    def length(self):
+        """The length of the component"""
+        return self._length
+
+    @property
+    def _radius(self):
+        return self._width / 2.0
+
+    def _listen(self, listener):
+        """Nothing to tell listeners: a frozen component never changes"""
+
+
+class FrozenNose(_FrozenComponent):
+    """An immutable `barrowman.Nose`.
+
+    :param str shape: The type of nosecone, one of `Nose.SHAPES`
+    :param float width: The diameter of the nose [meters]
+    :param float length: The length of the nose [meters]
+    :param float parameter: (Optional, default=None) The shape parameter
+    """
+
+    __slots__ = ('shape', 'parameter')
+    _arguments = ('shape', 'width', 'length', 'parameter')
+
+    def __init__(self, shape, width, length, parameter=None):
+        if shape not in Nose.SHAPES:
+            raise ValueError("Unknown nose shape: {0!r}".format(shape))
+        self._set(shape=shape, parameter=parameter, _width=width, _length=length,
+                  volume=float(nose_volume(shape, width, length, parameter)),
+                  area=pi * (width / 2.0)**2)
+
+    _geometry = Nose._geometry
+
+
+class FrozenTube(_FrozenComponent):
+    """An immutable `barrowman.Tube`.
+
+    :param float width: The diameter of the section [meters]
+    :param float length: The length of the section [meters]
+    """
+
+    __slots__ = ()
+    _arguments = ('width', 'length')
+
+    def __init__(self, width, length):
+        self._set(_width=width, _length=length, volume=pi * (width / 2.0)**2 * length,
+                  area=pi * (width / 2.0)**2)
+
+    _geometry = Tube._geometry
+
+
+class FrozenFin(_Frozen):
+    """An immutable `barrowman.Fin`.
+
+    :param float root: Length of the root chord of the fin [meters]
+    :param float tip: Length of the tip chord of the fin  [meters]
+    :param float span: Length of the span of the fin [meters]
+    :param float sweep: (Optional, default=None) The length of the sweep portion [meters]
+    :param float sweepangle: (Optional, default=45.0) The angle of the sweep [degrees]
+    """
+
+    __slots__ = ('root', 'tip', 'span', 'sweep', 'sweepangle', '_length')
+    _arguments = ('root', 'tip', 'span', 'sweep')
+
+    def __init__(self, root, tip, span, sweep=None, sweepangle=45.0):
+        if sweep is not None:
+            angle = atan(sweep / span)
+        else:
+            sweep = span * tan(radians(sweepangle))
+            angle = radians(sweepangle)
+        self._set(root=root, tip=tip, span=span, sweep=sweep, sweepangle=angle, _length=root)
+
+    @property
+    def length(self):
+        """The length of the fin (its root chord)"""
+        return self._length
+
+    def replace(self, **changes):
+        """A copy with some values changed. Give ``sweepangle`` (in degrees)
+        to set the sweep from the new angle.
+
+        :param changes: New values, by constructor argument name
+        :returns: a new `FrozenFin`
+        """
+        values = self._values()
+        if 'sweepangle' in changes and 'sweep' not in changes:
+            del values['sweep']
+        values.update(changes)
+        return FrozenFin(**values)
+
+    def _listen(self, listener):
+        """Nothing to tell listeners: a frozen fin never changes"""
+
+    _geometry = Fin._geometry
+
+
+class FrozenBody(_Frozen):
+    """An immutable `original.Body`, with its terms summed when it is made.
+
+    :param list components: The body components, nose first
+    """
+
+    __slots__ = ('components', 'l_0', 'V_B', 'A_B', 'A_r')
+    _arguments = ('components',)
+
+    def __init__(self, components):
+        components = tuple(components)
+        self._set(components=components,
+                  l_0=fsum(c.length for c in components),
+                  V_B=fsum(c.volume for c in components),
+                  A_B=components[0].area,
+                  A_r=max(c.area for c in components))
+
+    C_P = original.Body.C_P
+    C_Na = original.Body.C_Na
+
+
+class FrozenTail(_Frozen):
+    """An immutable `original.Tail`, with its terms worked out when it is made.
+
+    :param fin: A fin, frozen when made
+    :param int N: The number of fins on the tail
+    :param float width: (Optional, default=None) The diameter of the body at
+                        the fins [meters]
+    """
+
+    __slots__ = ('_fin', 'N', 'width', '_X', '_C_Na_terms')
+    _arguments = ('fin', 'N', 'width')
+
+    def __init__(self, fin, N, width=None):
+        fin = freeze(fin)
+        c_r, c_t, x_t = fin.root, fin.tip, fin.sweep
+        X = ((x_t / 3.0) * ((c_r + (2 * c_t)) / (c_r + c_t)))
+        X += (1 / 6.0) * (c_r + c_t - (c_r * c_t)/(c_r + c_t))
+        self._set(_fin=fin, N=N, width=width, _X=X,
+                  _C_Na_terms=original._tail_terms(c_r, c_t, fin.span, x_t, N, width))
+
+    @property
+    def fin(self):
+        """The fin"""
+        return self._fin
+
+    def _terms(self):
+        return self._C_Na_terms
+
+    K_TB = original.Tail.K_TB
+    K_BT = original.Tail.K_BT
+    C_P = original.Tail.C_P
+    C_Na = original.Tail.C_Na
+
+
+class FrozenRocket(_Frozen):
+    """An immutable `original.Rocket`.
+
+    :param body: The body of the rocket, frozen when made
+    :param tail: The tail of the rocket, frozen when made
+    """
+
+    __slots__ = ('body', 'tail')
+    _arguments = ('body', 'tail')
+
+    def __init__(self, body, tail):
+        self._set(body=freeze(body), tail=freeze(tail))
+
+    l_T = original.Rocket.l_T
+    C_P = original.Rocket.C_P
+    C_Na = original.Rocket.C_Na
+    compile = original.Rocket.compile
+
+
+def freeze(model):
+    """The frozen counterpart of a component or model. Parts of a model are
+    frozen too; frozen objects are returned as they are.
+
+    :param model: A `barrowman.Nose`, `barrowman.Tube`, `barrowman.Fin`,
+                  `original.Body`, `original.Tail` or `original.Rocket`
+    :returns: a `FrozenNose`, `FrozenTube`, `FrozenFin`, `FrozenBody`,
+              `FrozenTail` or `FrozenRocket`
+    """
+    if isinstance(model, _Frozen):
+        return model
+    if isinstance(model, Nose):
+        return FrozenNose(model.shape, model._width, model._length, model.parameter)
+    if isinstance(model, Tube):
+        return FrozenTube(model._width, model._length)
+    if isinstance(model, Fin):
+        return FrozenFin(model.root, model.tip, model.span, sweep=model.sweep)
+    if isinstance(model, original.Body):
+        return FrozenBody([freeze(c) for c in model.components])
+    if isinstance(model, original.Tail):
+        return FrozenTail(model._fin, model.N, model.width)
+    if isinstance(model, original.Rocket):
+        return FrozenRocket(model.body, model.tail)
+    raise TypeError("Can't freeze a {0}".format(type(model).__name__))
@@ -0,0 +1,185 @@
+"""
+Geometry Gradients
+==================
+
+Exact derivatives of the `original` equations with respect to the geometry of
+a rocket, for gradient-based design optimization. The derivatives are worked
+out by hand from the same equations `batch.RocketBatch` evaluates (eq. 3-10,
+3-66, 3-89 and 3-107 and the tail C_Na), and are computed for every design of a
+batch at once, together with the values, sharing all the intermediate terms.
+
+The geometry parameters are the columns of a `batch.RocketBatch`:
+`PARAMETERS`. The fin count and the nose shape parameter are held fixed.
+"""
+# -*- coding: utf-8 -*-
+import numpy
+from barrowman import Nose, nose_volume
+from barrowman.original import TRANSONIC
+
+#: The parameters derivatives are taken with respect to
+PARAMETERS = ('width', 'nose_length', 'tube_length', 'root', 'tip', 'span', 'sweep')
+
+
+def _nose_volume_gradient(shape, R, L, p):
+    """Nose volume and its derivatives with respect to base radius and length"""
+    V = nose_volume(shape, 2 * R, L, p)
+
+    if shape not in (Nose.OGIVE, Nose.SECANT_OGIVE):
+        # every other shape is (a constant) * pi R^2 L
+        return V, 2 * V / R, V / L
+
+    rho = (R**2 + L**2) / (2 * R)
+    drho = ((R**2 - L**2) / (2 * R**2), L / R)
+    dV = _ogive_volume_gradient(R, L, rho, L, rho - R, drho, (0, 1), (drho[0] - 1, drho[1]))
+    if shape == Nose.OGIVE or p is None:
+        return (V,) + dV
+
+    # a secant ogive of given radius: rho stays, the arc turns through alpha
+    rho = numpy.where(numpy.isnan(p), rho, p)
+    hyp = numpy.sqrt(L**2 + R**2)
+    q = hyp / (2 * rho)
+    alpha = numpy.arctan(R / L) - numpy.arccos(q)
+    root = numpy.sqrt(1 - q**2)
+    dalpha = (L / hyp**2 + R / (2 * rho * hyp * root),
+              -R / hyp**2 + L / (2 * rho * hyp * root))
+    da = tuple(-rho * numpy.sin(alpha) * d for d in dalpha)
+    db = tuple(-rho * numpy.cos(alpha) * d for d in dalpha)
+    secant = _ogive_volume_gradient(R, L, rho, rho * numpy.cos(alpha), -rho * numpy.sin(alpha),
+                                    (0, 0), da, db)
+    tangent = numpy.isnan(p)
+    return (V,) + tuple(numpy.where(tangent, t, s) for t, s in zip(dV, secant))
+
+
+def _ogive_volume_gradient(R, L, rho, a, b, drho, da, db):
+    """Derivatives of `barrowman._ogive_volume` with respect to R and L, given
+    the derivatives of rho, a and b (pairs, with respect to R and L).
+
+    The volume is pi (F(a) - F(a - L)) and dF/du is the profile squared, 0 at
+    the tip and R^2 at the base, so
+
+        dV = pi [-R^2 (da - dL) + dF/drho|(a-L..a) drho + dF/db|(a-L..a) db]
+
+    with dF/drho = 2 rho (u - b asin(u/rho)) and
+    dF/db = 2 b u - u sqrt(rho^2 - u^2) - rho^2 asin(u/rho).
+    """
+    def dF_drho(u):
+        return 2 * rho * (u - b * numpy.arcsin(u / rho))
+
+    def dF_db(u):
+        return 2 * b * u - u * numpy.sqrt(rho**2 - u**2) - rho**2 * numpy.arcsin(u / rho)
+
+    F_rho = dF_drho(a) - dF_drho(a - L)
+    F_b = dF_db(a) - dF_db(a - L)
+
+    dV_dR = numpy.pi * (-R**2 * da[0] + F_rho * drho[0] + F_b * db[0])
+    dV_dL = numpy.pi * (-R**2 * (da[1] - 1) + F_rho * drho[1] + F_b * db[1])
+    return dV_dR, dV_dL
+
+
+def gradient(batch, Mach):
+    """Values and derivatives of the coefficients of every design in a batch.
+
+    :param batch.RocketBatch batch: The designs
+    :param Mach: Mach number, a float or an array that broadcasts against the
+                 designs [dimensionless]
+    :returns: dict by coefficient name ('body_C_P', 'body_C_Na', 'tail_C_P',
+              'tail_C_Na', 'C_P' and 'C_Na', as in `batch.RocketBatch`) of
+              (value, derivatives), where derivatives is a dict of arrays by
+              parameter name (see `PARAMETERS`)
+
+    """
+    shape = numpy.broadcast(batch.width, Mach).shape
+
+    def grad(**derivatives):
+        """Fill in zero derivatives, and spread every one to the full shape"""
+        return dict((name, numpy.broadcast_to(derivatives.get(name, 0.0), shape) + 0.0)
+                    for name in PARAMETERS)
+
+    results = {}
+
+    # Body (eq. 3-89, 3-66): X_B = l_0 - V_B/A_B = L_n - V_N/A, C_Na(B) = 2
+    R = batch.width / 2.0
+    A = numpy.pi * R**2
+    V_N, dV_dR, dV_dL = _nose_volume_gradient(batch.nose_shape, R, batch.nose_length,
+                                              batch.nose_parameter)
+    X_B = batch.nose_length - V_N / A
+    dX_B = grad(width=-(dV_dR / 2.0) / A + V_N / A**2 * (numpy.pi * R),
+                nose_length=1 - dV_dL / A)
+    results['body_C_P'] = (numpy.broadcast_to(X_B, shape) + 0.0, dX_B)
+
+    C_NaB = batch.body_C_Na(Mach)
+    results['body_C_Na'] = (C_NaB, grad())
+
+    # Tail center of pressure (eq. 3-10), placed at l_T = l_0 - c_r
+    x_t, c_r, c_t, s = batch.sweep, batch.root, batch.tip, batch.span
+    S = c_r + c_t
+    X_f = (x_t / 3.0) * (c_r + 2*c_t) / S + (1 / 6.0) * (S - c_r*c_t / S)
+    dX_f = dict(
+        sweep=(c_r + 2*c_t) / (3.0 * S),
+        root=-(x_t / 3.0) * c_t / S**2 + (1 / 6.0) * (1 - c_t**2 / S**2),
+        tip=(x_t / 3.0) * c_r / S**2 + (1 / 6.0) * (1 - c_r**2 / S**2),
+    )
+    results['tail_C_P'] = (numpy.broadcast_to(X_f, shape) + 0.0, grad(**dX_f))
+
+    X_T = batch.l_0 - c_r + X_f
+    dX_T = grad(nose_length=1.0, tube_length=1.0, root=dX_f['root'] - 1,
+                tip=dX_f['tip'], sweep=dX_f['sweep'])
+
+    """Tail C_Na = (k/A) f, with f the faired single fin term (see
+    original._tail_C_Na) and k = N/2 (K_T(B) + K_B(T)) = N/2 (1 + u)^2,
+    u = r/(s + r). The single fin terms reduce to
+
+        a = 2 pi s^2,  b = 2 l_m/(c_r + c_t),  c = 2 s (c_r + c_t)
+
+    with l_m = sqrt(s^2 + m^2) the length of the mid-chord line and
+    m = x_t + (c_t - c_r)/2 its sweep.
+    """
+    u = R / (s + R)
+    k = (batch.N / 2.0) * (1 + u)**2
+    dk_du = batch.N * (1 + u)
+    dk = dict(width=dk_du * (s / (s + R)**2) / 2.0, span=dk_du * (-R / (s + R)**2))
+
+    m = x_t + (c_t - c_r) / 2.0
+    l_m = numpy.sqrt(s**2 + m**2)
+    a = 2 * numpy.pi * s**2
+    b = 2 * l_m / S
+    c = 2 * s * S
+    db = dict(span=2 * (s / l_m) / S, sweep=2 * (m / l_m) / S,
+              root=-(m / l_m) / S - 2 * l_m / S**2, tip=(m / l_m) / S - 2 * l_m / S**2)
+
+    M_0, M_1 = TRANSONIC
+    w = numpy.clip((Mach - M_0) / (M_1 - M_0), 0.0, 1.0)
+    beta2 = 1 - numpy.minimum(Mach, M_0)**2
+    beta_s = numpy.sqrt(numpy.maximum(Mach, M_1)**2 - 1)
+    Q = numpy.sqrt(1 + beta2 * b**2)
+    sub = a / (1 + Q)
+    dsub_da = 1 / (1 + Q)
+    dsub_db = -a / (1 + Q)**2 * (beta2 * b / Q)
+    sup = c / beta_s
+    f = (1 - w) * sub + w * sup
+    df = dict(
+        span=(1 - w) * (dsub_da * 4 * numpy.pi * s + dsub_db * db['span']) + w * (2 * S) / beta_s,
+        sweep=(1 - w) * dsub_db * db['sweep'],
+        root=(1 - w) * dsub_db * db['root'] + w * (2 * s) / beta_s,
+        tip=(1 - w) * dsub_db * db['tip'] + w * (2 * s) / beta_s,
+    )
+
+    C_NaT = k / A * f
+    dC_NaT = grad(
+        width=dk['width'] * f / A - k * f / A**2 * (numpy.pi * R),
+        span=(dk['span'] * f + k * df['span']) / A,
+        sweep=k * df['sweep'] / A,
+        root=k * df['root'] / A,
+        tip=k * df['tip'] / A,
+    )
+    results['tail_C_Na'] = (numpy.broadcast_to(C_NaT, shape) + 0.0, dC_NaT)
+
+    # Whole rocket (eq. 3-107)
+    C_Na = C_NaB + C_NaT
+    C_P = (X_B*C_NaB + X_T*C_NaT) / C_Na
+    dC_P = dict((name, (C_NaB * dX_B[name] + C_NaT * dX_T[name]
+                        + (X_T - C_P) * dC_NaT[name]) / C_Na) for name in PARAMETERS)
+    results['C_P'] = (C_P, dC_P)
+    results['C_Na'] = (C_Na, dict(dC_NaT))
+
+    return results
@@ -0,0 +1,184 @@
+"""
+Instrumentation
+===============
+
+Find out where the time of a workload goes: how often the components and
+models (`barrowman`, `original`) are built and evaluated, how long that takes,
+and how often their caches answer instead of working a value out.
+
+Instrumentation is off unless asked for, and then costs nothing: the methods
+are only wrapped while an `Instrumentation` is active, and put back as they
+were when it ends. ::
+
+    from barrowman.instrument import Instrumentation
+
+    with Instrumentation() as profile:
+        run_sweep()
+    print(profile.report())
+
+Cumulative times include the time of the instrumented calls made inside them
+(``Rocket.C_P`` includes ``Tail.C_P``). The methods are wrapped on their
+classes, so every thread is counted while an instrumentation is active, and
+only one can be active at a time. The frozen models (`frozen`) and the compiled
+evaluators share only the functions they were made from, and are not counted.
+"""
+# -*- coding: utf-8 -*-
+import functools
+import time
+import barrowman
+from barrowman import Component, Nose, Tube, Fin
+from barrowman import original
+
+#: What is instrumented: (owner, name, cache probe). The probe, if any, is
+#: called with the arguments of a call, before it, and tells whether the
+#: call will be answered from a cache.
+TARGETS = (
+    (Nose, '__init__', None),
+    (Tube, '__init__', None),
+    (Fin, '__init__', None),
+    (barrowman, 'nose_volume', None),
+    (Component, '_cached', lambda self, key, compute: key in self.__dict__.get('_cache', ())),
+    (Component, '_invalidate', None),
+    (original.Body, '__init__', None),
+    (original.Body, '_sum', lambda self: self._terms is not None),
+    (original.Body, '_component_changed', None),
+    (original.Body, '_stack_index', lambda self: self._index is not None),
+    (original.Body, 'C_P', None),
+    (original.Body, 'C_Na', None),
+    (original.Tail, '__init__', None),
+    (original.Tail, '_terms', lambda self: self._C_Na_terms is not None),
+    (original.Tail, 'C_P', lambda self, Mach: self._X is not None),
+    (original.Tail, 'C_Na', None),
+    (original.Rocket, 'C_P', None),
+    (original.Rocket, 'C_Na', None),
+    (original.Rocket, 'compile', None),
+)
+
+_active = []
+
+
+class Counter(object):
+    """Counts of one instrumented method"""
+
+    __slots__ = ('calls', 'time', 'hits', 'misses')
+
+    def __init__(self):
+        self.calls = 0      #: Number of calls
+        self.time = 0.0     #: Cumulative time of the calls [seconds]
+        self.hits = 0       #: Calls answered from a cache
+        self.misses = 0     #: Calls that had to work the value out
+
+    @property
+    def hit_rate(self):
+        """Fraction of the calls answered from a cache, None for a method
+        without one (or not yet called)"""
+        if not self.hits + self.misses:
+            return None
+        return self.hits / float(self.hits + self.misses)
+
+    def as_dict(self):
+        return dict(calls=self.calls, time=self.time, hits=self.hits, misses=self.misses,
+                    hit_rate=self.hit_rate)
+
+
+def _name(owner, name):
+    return '{0}.{1}'.format(getattr(owner, '__qualname__', owner.__name__), name)
+
+
+class Instrumentation(object):
+    """Counts the calls of the `TARGETS` while active, as a context manager
+    or between `start` and `stop`. The counts are kept after it stops, and add
+    up over repeated runs until `reset`.
+
+    :param targets: (Optional, default=TARGETS) The methods to instrument, as
+                    (owner, name, cache probe)
+    """
+
+    def __init__(self, targets=TARGETS):
+        self.targets = tuple(targets)
+        self.counters = dict((_name(owner, name), Counter())
+                             for owner, name, probe in self.targets)  #: `Counter` by method name
+        self._saved = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def active(self):
+        """Whether the methods are instrumented now"""
+        return bool(self._saved)
+
+    def start(self):
+        """Wrap the methods."""
+        if _active:
+            raise RuntimeError("Instrumentation is already active")
+        _active.append(self)
+        for owner, name, probe in self.targets:
+            function = owner.__dict__[name]
+            self._saved.append((owner, name, function))
+            setattr(owner, name, self._wrap(function, self.counters[_name(owner, name)], probe))
+
+    def stop(self):
+        """Put the methods back as they were."""
+        while self._saved:
+            owner, name, function = self._saved.pop()
+            setattr(owner, name, function)
+        if self in _active:
+            _active.remove(self)
+
+    def reset(self):
+        """Zero the counts."""
+        for name in self.counters:
+            self.counters[name] = Counter()
+
+    @staticmethod
+    def _wrap(function, counter, probe):
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def instrumented(*args, **kwargs):
+            if probe is not None:
+                if probe(*args, **kwargs):
+                    counter.hits += 1
+                else:
+                    counter.misses += 1
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                counter.time += clock() - start
+                counter.calls += 1
+        return instrumented
+
+    def as_dict(self):
+        """The counts of the methods that were called.
+
+        :returns: dict by method name (e.g. 'Body._sum') of dicts of calls,
+                  time [seconds], hits, misses and hit_rate (None for methods
+                  without a cache)
+        """
+        return dict((name, counter.as_dict())
+                    for name, counter in self.counters.items() if counter.calls)
+
+    def report(self, sort='time'):
+        """The counts as a table, for printing.
+
+        :param str sort: (Optional, default='time') Column to sort by, largest
+                         first: 'calls', 'time' or 'hit_rate'; or 'name'
+        :returns: str
+        """
+        rows = sorted(self.as_dict().items(), key=lambda item: (
+            item[0] if sort == 'name' else -(item[1][sort] or 0)))
+        width = max([len(name) for name, counts in rows] + [len('method')])
+        lines = ['{0:<{w}} {1:>10} {2:>12} {3:>12} {4:>8}'.format(
+            'method', 'calls', 'time [s]', 'per call [s]', 'hits', w=width)]
+        for name, counts in rows:
+            hit_rate = counts['hit_rate']
+            lines.append('{0:<{w}} {1:>10d} {2:>12.6f} {3:>12.3e} {4:>8}'.format(
+                name, counts['calls'], counts['time'], counts['time'] / counts['calls'],
+                '-' if hit_rate is None else '{0:.1%}'.format(hit_rate), w=width))
+        return '\n'.join(lines)
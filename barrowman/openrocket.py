@@ -0,0 +1,270 @@
+"""
+OpenRocket Files
+================
+
+Read rockets from `OpenRocket`_ design files (.ork) into `barrowman.Nose`,
+`barrowman.Tube` and `barrowman.Fin` components and `original` models, and
+evaluate whole directories of them in a pool of worker processes.
+
+.. _OpenRocket: http://openrocket.info/
+
+An .ork file is XML, usually zipped (older versions gzip it). The XML is read
+as a stream: each component is turned into a `barrowman` component as soon as
+it has been read and then thrown away, and reading stops at the end of the
+rocket, so the simulations (and their flight data) after it are never parsed.
+
+Only the parts the Barrowman method models are read: nosecones, body tubes
+and one set of trapezoidal fins, at the bottom of the rocket. Components
+inside the body (motor mounts, recovery gear, ...) and launch lugs are
+ignored. Rockets with other external parts (transitions, other fin shapes,
+more than one fin set, fins anywhere but the aft end of the last body tube)
+can't be modeled and raise `ValueError`.
+"""
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+from contextlib import contextmanager
+import fnmatch
+import gzip
+import multiprocessing
+import os
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from barrowman import Nose, Tube, Fin
+from barrowman import original
+
+#: Nose shapes by OpenRocket name
+SHAPES = {
+    'conical': Nose.CONE,
+    'ogive': Nose.OGIVE,
+    'ellipsoid': Nose.ELLIPSOID,
+    'power': Nose.POWER,
+    'parabolic': Nose.PARABOLIC,
+    'haack': Nose.HAACK,
+}
+
+#: External components that can't be modeled
+UNSUPPORTED = ('transition', 'ellipticalfinset', 'freeformfinset', 'tubefinset')
+
+#: A rocket read from a file: its name, body components (nose first), fin and number of fins
+Design = namedtuple('Design', ('name', 'components', 'fin', 'N'))
+
+#: One file of `evaluate_directory`: C_P and C_Na are None, and error is the
+#: reason, if it couldn't be read
+Result = namedtuple('Result', ('path', 'name', 'C_P', 'C_Na', 'error'))
+
+
+@contextmanager
+def _open(path):
+    """The rocket XML inside an .ork file, as a binary stream"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [name for name in archive.namelist() if name.endswith('.ork')]
+            with archive.open(names[0] if names else archive.namelist()[0]) as stream:
+                yield stream
+        return
+    with open(path, 'rb') as stream:
+        if stream.read(2) == b'\x1f\x8b':
+            with gzip.open(path) as stream:
+                yield stream
+            return
+        stream.seek(0)
+        yield stream
+
+
+def _number(element, tag):
+    """A number from a child of an element, None for 'auto' (or missing)"""
+    text = element.findtext(tag)
+    if text is None or text.strip() == 'auto':
+        return None
+    return float(text)
+
+
+def _nose(element):
+    shape = element.findtext('shape', 'conical')
+    if shape not in SHAPES:
+        raise ValueError("Unknown OpenRocket nose shape: {0!r}".format(shape))
+    return (SHAPES[shape], _number(element, 'shapeparameter'),
+            _number(element, 'aftradius'), _number(element, 'length'))
+
+
+def _position(element):
+    """How a component is placed on its parent, and its offset [meters]:
+    newer files say so in ``axialoffset``, older ones in ``position``"""
+    for tag, attribute in (('axialoffset', 'method'), ('position', 'type')):
+        child = element.find(tag)
+        if child is not None:
+            return child.get(attribute, 'top'), float(child.text)
+    return 'bottom', 0.0
+
+
+def _at_aft_end(method, offset, root, length, total):
+    """Whether fins of a root chord, placed on a tube of a length, end at the
+    bottom of the tube (and so of the rocket, of a total length)"""
+    end = {
+        'bottom': offset,
+        'top': offset + root - length,
+        'middle': offset - (length - root) / 2.0,
+        'absolute': offset + root - total,
+    }.get(method)
+    return end is not None and abs(end) <= 1e-6
+
+
+def _ogive(radius, length, parameter):
+    """An OpenRocket ogive: tangent for a shape parameter of 1, secant below
+    that, with the radius OpenRocket gives it"""
+    if parameter is None or parameter == 1:
+        return Nose(Nose.OGIVE, 2 * radius, length)
+    if parameter == 0:
+        return Nose(Nose.CONE, 2 * radius, length)
+    L, R, p = length, radius, parameter
+    rho = ((L**2 + R**2) * ((2 - p)**2 * L**2 + (p * R)**2) / (4 * (p * R)**2))**0.5
+    return Nose(Nose.SECANT_OGIVE, 2 * radius, length, rho)
+
+
+def read(path):
+    """Read the rocket in an OpenRocket file.
+
+    :param str path: Name of the .ork file
+    :returns: a `Design`
+
+    """
+    name = None
+    parts = []      # (kind, nose shape, shape parameter, radius, length)
+    fins = []
+    tags = []
+
+    with _open(path) as stream:
+        for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                tags.append(element.tag)
+                continue
+            tags.pop()
+            tag = element.tag
+            parent = tags[-1] if tags else None
+
+            if tag == 'name' and parent == 'rocket':
+                name = element.text
+            elif tag == 'nosecone':
+                parts.append(('nose',) + _nose(element))
+            elif tag == 'bodytube':
+                parts.append(('tube', None, None, _number(element, 'radius'),
+                              _number(element, 'length')))
+            elif tag == 'trapezoidfinset':
+                sweep = _number(element, 'sweeplength')
+                fin = Fin(_number(element, 'rootchord'), _number(element, 'tipchord'),
+                          _number(element, 'height'), sweep=sweep if sweep is not None else 0.0)
+                fins.append((fin, int(_number(element, 'fincount')), len(parts),
+                             _position(element)))
+            elif tag in UNSUPPORTED:
+                raise ValueError("{0}: can't model a {1}".format(path, tag))
+            elif tag == 'rocket':
+                break
+
+            if parent == 'subcomponents':
+                element.clear()
+
+    if not parts or parts[0][0] != 'nose':
+        raise ValueError("{0}: the rocket must start with a nosecone".format(path))
+    if len(fins) != 1:
+        raise ValueError("{0}: need one set of fins, found {1}".format(path, len(fins)))
+
+    # 'auto' radii take the radius of the component before, or else after
+    radii = [part[3] for part in parts]
+    for i in range(1, len(radii)):
+        if radii[i] is None:
+            radii[i] = radii[i - 1]
+    for i in range(len(radii) - 2, -1, -1):
+        if radii[i] is None:
+            radii[i] = radii[i + 1]
+    if None in radii:
+        raise ValueError("{0}: can't find the radius of the body".format(path))
+
+    # the fins belong to the component read after them (their parent)
+    fin, N, parent, (method, offset) = fins[0]
+    if parent != len(parts) - 1 or parts[parent][0] != 'tube':
+        raise ValueError("{0}: the fins must be on the last body tube".format(path))
+    if not _at_aft_end(method, offset, fin.root, parts[parent][4],
+                       sum(part[4] for part in parts)):
+        raise ValueError("{0}: the fins must be at the aft end of the body".format(path))
+
+    components = []
+    for (kind, shape, parameter, _, length), radius in zip(parts, radii):
+        if kind == 'tube':
+            components.append(Tube(2 * radius, length))
+        elif shape == Nose.OGIVE:
+            components.append(_ogive(radius, length, parameter))
+        else:
+            components.append(Nose(shape, 2 * radius, length, parameter))
+
+    return Design(name, components, fin, N)
+
+
+def load(path):
+    """Read the rocket in an OpenRocket file as a model.
+
+    :param str path: Name of the .ork file
+    :returns: an `original.Rocket`, with the fins on the last body component
+
+    """
+    return _rocket(read(path))
+
+
+def _rocket(design):
+    width = design.components[-1]._width
+    return original.Rocket(original.Body(design.components),
+                           original.Tail(design.fin, design.N, width))
+
+
+def evaluate_file(path, Mach=0.3):
+    """Read and evaluate one OpenRocket file. Problems with the file are
+    reported in the result instead of raised.
+
+    :param str path: Name of the .ork file
+    :param Mach: (Optional, default=0.3) Mach number or numbers [dimensionless]
+    :returns: a `Result`
+
+    """
+    try:
+        design = read(path)
+        rocket = _rocket(design)
+        return Result(path, design.name, rocket.C_P(Mach), rocket.C_Na(Mach), None)
+    except (ValueError, KeyError, TypeError, OSError, ElementTree.ParseError,
+            zipfile.BadZipFile) as error:
+        return Result(path, None, None, None, str(error))
+
+
+def _evaluate(job):
+    return evaluate_file(*job)
+
+
+def evaluate_directory(directory, Mach=0.3, pattern='*.ork', processes=None, chunksize=16):
+    """Read and evaluate every OpenRocket file in a directory (and the
+    directories in it).
+
+    :param str directory: The directory
+    :param Mach: (Optional, default=0.3) Mach number or numbers [dimensionless]
+    :param str pattern: (Optional, default='*.ork') Names of the files to read
+    :param int processes: (Optional, default=None) Number of worker processes,
+                          None for one per CPU, 1 to read in this process
+    :param int chunksize: (Optional, default=16) Files sent to a worker at a time
+    :returns: a generator of `Result`, one per file, in sorted order of path
+
+    """
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(fnmatch.filter(files, pattern)))
+    jobs = [(path, Mach) for path in paths]
+
+    if processes == 1:
+        for job in jobs:
+            yield _evaluate(job)
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap(_evaluate, jobs, chunksize):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
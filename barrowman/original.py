@@ -38,20 +38,206 @@ From the paper:
 
 """
 # -*- coding: utf-8 -*-
+from math import fsum, sqrt
+import numpy
+
+#: Version of the equations: raised whenever a change to this module (or to
+#: the component volumes and areas it uses) changes any result, so results
+#: kept from older equations (see `cache.ResultCache`) are not used again.
+#: 2: fin-body interference; 3: exact nose volumes of every shape.
+EQUATIONS_VERSION = 3
+
+#: Mach numbers between which the fin normal force is faired linearly from
+#: the subsonic to the supersonic solution. Neither is valid near Mach 1.
+TRANSONIC = (0.9, 1.5)
+
+
+def _broadcast(value, Mach):
+    """Shape a Mach-independent result like the Mach argument it was asked
+    for: a scalar for a scalar Mach number, otherwise an array with one entry
+    per Mach number.
+    """
+    if numpy.ndim(Mach) == 0:
+        return value
+    return numpy.full(numpy.shape(Mach), value, dtype=float)
+
+
+def interference(span, width):
+    """Fin-body interference factors of slender body theory, used by the paper
+    to add the effect of the body on the fins (and of the fins on the body).
+
+    Works on floats or arrays.
+
+    :param span: Span of the fins [meters]
+    :param width: Diameter of the body at the fins [meters]
+    :returns: (K_T(B), K_B(T)), the normal force on the fins in presence of the
+              body, and on the body in presence of the fins, as fractions of
+              the normal force on the fins alone
+
+    """
+
+    """With tau = (s + r_t)/r_t, the ratio of fin semispan (from the body
+    axis) to body radius:
+
+        K_T(B) = 2/pi [(1 + 1/tau^4)(1/2 atan(1/2 (tau - 1/tau)) + pi/4)
+                      - 1/tau^2 ((tau - 1/tau) + 2 atan(1/tau))] / (1 - 1/tau)^2
+
+        K_B(T) = (1 + 1/tau)^2 - K_T(B)
+
+    Written here in terms of u = 1/tau so a body of zero width (u = 0, fins
+    alone) gives K_T(B) = 1 and K_B(T) = 0 without dividing by zero.
+    """
+    r_t = numpy.multiply(width, 0.5)
+    u = r_t / (span + r_t)
+    uu = u * u
+
+    K_TB = (1 + uu*uu) * (0.5 * numpy.arctan2(1 - uu, 2*u) + numpy.pi/4)
+    K_TB -= u * (1 - uu) + 2 * uu * numpy.arctan(u)
+    K_TB *= (2 / numpy.pi) / (1 - u)**2
+
+    return K_TB, (1 + u)**2 - K_TB
+
+
+def _tail_terms(root, tip, span, sweep, N, width):
+    """Geometry-only terms of the tail C_Na, for `_tail_C_Na`. Works on floats
+    or arrays.
+    """
+    A_fin = span * (root + tip) / 2.0
+    tan_mid = (sweep + tip / 2.0 - root / 2.0) / span   # sweep of the mid-chord line
+    cos_mid = 1.0 / numpy.sqrt(1 + tan_mid**2)
+
+    a = 2 * numpy.pi * span**2
+    b = span**2 / (A_fin * cos_mid)
+    c = 4 * A_fin
+
+    K_TB, K_BT = interference(span, 0 if width is None else width)
+    k = (N / 2.0) * (K_TB + K_BT)
+
+    return a, b, c, k
+
+
+def _tail_C_Na(Mach, a, b, c, k, out=None, work=None):
+    """Mach-dependent part of the tail C_Na, from the terms of `_tail_terms`
+    (with k divided by the reference area).
+
+    The array path writes into ``out`` using the two arrays in ``work`` as
+    scratch space, so it allocates nothing when they are given.
+    """
+
+    """Per fin, referenced to the area A_r, with beta = sqrt(|1 - M^2|):
+
+        subsonic:    C_Na1 = 2 pi s^2 / A_r / (1 + sqrt(1 + (beta s^2 / (A_fin cos G_c))^2))
+        supersonic:  C_Na1 = 4 A_fin / (beta A_r)
+
+    where G_c is the sweep angle of the mid-chord line. The supersonic term is
+    the linear (first order) term of the paper's Busemann expansion. Between
+    the two the result is faired linearly over TRANSONIC.
+    """
+
+    M_0, M_1 = TRANSONIC
+
+    if out is None and numpy.ndim(Mach) == 0 and numpy.ndim(a) == 0:
+        w = min(max((Mach - M_0) / (M_1 - M_0), 0.0), 1.0)
+        M = min(Mach, M_0)
+        sub = a / (1 + sqrt(1 + ((1 - M*M) * b*b)))
+        M = max(Mach, M_1)
+        sup = c / sqrt(M*M - 1)
+        return k * (sub + w * (sup - sub))
+
+    shape = numpy.broadcast(Mach, a).shape
+    if out is None:
+        out = numpy.empty(shape)
+    if work is None:
+        work = (numpy.empty(shape), numpy.empty(shape))
+    w, t = work
+
+    numpy.subtract(Mach, M_0, out=w)
+    w /= (M_1 - M_0)
+    numpy.clip(w, 0.0, 1.0, out=w)
+
+    numpy.minimum(Mach, M_0, out=t)
+    t *= t
+    numpy.subtract(1.0, t, out=t)
+    t *= b*b
+    t += 1.0
+    numpy.sqrt(t, out=t)
+    t += 1.0
+    numpy.divide(a, t, out=out)
+
+    numpy.maximum(Mach, M_1, out=t)
+    t *= t
+    t -= 1.0
+    numpy.sqrt(t, out=t)
+    numpy.divide(c, t, out=t)
+
+    t -= out
+    t *= w
+    out += t
+    out *= k
+    return out
+
+
+class _ExactSum(object):
+    """A running sum of floats with no rounding error: values can be added
+    (or taken away, by adding their negative) one at a time and the value is
+    always the correctly rounded total, the same as `math.fsum` of every value
+    added so far.
+
+    Keeps the total as a short list of non-overlapping partial sums
+    (Shewchuk's algorithm, as used by math.fsum).
+    """
+
+    def __init__(self, values=()):
+        self._partials = []
+        for x in values:
+            self.add(x)
+
+    def add(self, x):
+        partials = self._partials
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                partials[i] = lo
+                i += 1
+            x = hi
+        partials[i:] = [x]
+
+    @property
+    def value(self):
+        return fsum(self._partials)
 
 
 class Rocket(object):
-    """Full solution for a rocket"""
+    """Full solution for a rocket.
+
+    The tail is assumed to sit at the bottom of the body: the bottom of the fin
+    root chord is the bottom of the rocket. Build the tail with the width of
+    the body to include fin-body interference.
+
+    :param Body body: The body of the rocket
+    :param Tail tail: The tail of the rocket
+    """
 
     def __init__(self, body, tail):
         self.body = body
         self.tail = tail
 
+    @property
+    def l_T(self):
+        """Location of the leading edge of the fin root chord [meters] (tip of nose = 0)"""
+        return self.body.l_0 - self.tail._fin.root
+
     def C_P(self, Mach):
         """Center of Pressure.
 
-        :param float Mach: Mach number of the air-stream over the rocket [dimensionless]
-        :returns: the center of pressure of the rocket body in [meters] (tip of nose = 0)
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
+        :returns: the center of pressure of the rocket body in [meters] (tip of nose = 0),
+                  one per Mach number if given an array
 
         """
 
@@ -67,12 +253,162 @@ class Rocket(object):
             C_Na: Normal coef.
             subscripts: _B: body, _T(B): tail in presence of body, _B(T): body in
                         presence of tail, _T: tail.
+
+        The fins are always in presence of the body here, so there is no
+        separate X_T*C_Na(T) term, and the lift carried over onto the body by
+        the fins is placed at the fin center of pressure (X_B(T) = X_T(B)).
+        Tail.C_Na gives C_Na(T(B)) + C_Na(B(T)).
         """
 
         X_B = self.body.C_P(Mach)
         C_NaB = self.body.C_Na(Mach)
+        X_T = self.l_T + self.tail.C_P(Mach)
+        C_NaT = self.tail.C_Na(Mach, self.body.A_r)
+
+        return (X_B*C_NaB + X_T*C_NaT)/(C_NaB + C_NaT)
+
+    def C_Na(self, Mach):
+        """Normal Force Coefficient Derivative of the whole rocket, referenced
+        to the body reference area.
+
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
+        :returns: the aerodynamic normal coefficient (C_Na) for the rocket
+
+        """
+        return self.body.C_Na(Mach) + self.tail.C_Na(Mach, self.body.A_r)
+
+    def compile(self):
+        """Fold the geometry of the rocket into a fast evaluator.
+
+        The evaluator is a snapshot: changing a component afterwards does not
+        change it, call `compile` again instead.
+
+        :returns: a `CompiledRocket`
+        """
+        return CompiledRocket(self)
+
 
-        return (X_B*C_NaB + self.tail.C_P(Mach))/1.0
+class CompiledRocket(object):
+    """A `Rocket` reduced to the constants its equations need, for calling
+    from tight loops (e.g. every step of a trajectory integrator). Only the
+    Mach-dependent part of the solution (the fin C_Na) is evaluated per call.
+
+    Use `Rocket.compile` to build one. `C_P_into` reuses scratch space kept on
+    the evaluator, so share one evaluator between threads only for scalar
+    calls.
+
+    :param Rocket rocket: The rocket to compile
+    """
+
+    __slots__ = ('_XC_B', '_C_NaB', '_X_T', '_terms', '_work')
+
+    def __init__(self, rocket):
+        # The body terms and the tail center of pressure do not depend on Mach
+        # number; only the fin C_Na does.
+        X_B = rocket.body.C_P(0.0)
+        self._C_NaB = float(rocket.body.C_Na(0.0))
+        self._XC_B = float(X_B * self._C_NaB)
+        self._X_T = float(rocket.l_T + rocket.tail.C_P(0.0))
+        a, b, c, k = rocket.tail._terms()
+        self._terms = (float(a), float(b), float(c), float(k / rocket.body.A_r))
+        self._work = None
+
+    def C_P(self, Mach):
+        """Center of Pressure, same as `Rocket.C_P`.
+
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
+        :returns: the center of pressure of the rocket in [meters] (tip of nose = 0)
+
+        """
+        if numpy.ndim(Mach) == 0:
+            C_NaT = _tail_C_Na(Mach, *self._terms)
+            return (self._XC_B + self._X_T*C_NaT)/(self._C_NaB + C_NaT)
+        return self.C_P_into(Mach, numpy.empty(numpy.shape(Mach)))
+
+    __call__ = C_P
+
+    def C_P_into(self, Mach, out):
+        """Center of Pressure for an array of Mach numbers, written into a
+        caller-provided array instead of a new one.
+
+        The scratch arrays are cached on the compiled rocket, so one compiled
+        rocket must not be used by several threads at once.
+
+        :param Mach: array of Mach numbers [dimensionless]
+        :param out: array, the same shape as Mach and not overlapping it, to
+                    write the results into
+        :returns: out
+        :raises ValueError: if out shares memory with Mach
+
+        """
+        if numpy.may_share_memory(Mach, out):
+            raise ValueError("out must not share memory with Mach")
+
+        work = self._work
+        if work is None or work[0].shape != out.shape:
+            work = self._work = (numpy.empty(out.shape), numpy.empty(out.shape))
+
+        _tail_C_Na(Mach, *self._terms, out=out, work=work)
+
+        numerator = work[0]
+        numpy.multiply(out, self._X_T, out=numerator)
+        numerator += self._XC_B
+        out += self._C_NaB
+        numpy.divide(numerator, out, out=out)
+        return out
+
+
+class _StackIndex(object):
+    """Prefix sums of the lengths and volumes of a stack of components, and a
+    sparse table of their areas, for the terms of any run of consecutive
+    components in O(1).
+
+    The prefix sums are kept exactly, as the partials of an `_ExactSum`, so
+    the sum over a run is correctly rounded: the same, to the last bit, as
+    the `Body` made of just those components.
+
+    :param parts: (length, volume, area) of each component, in order
+    """
+
+    def __init__(self, parts):
+        lengths, volumes, areas = zip(*parts)
+        self.x = self._prefix(lengths)
+        self.volume = self._prefix(volumes)
+        self.area = list(areas)
+
+        # max_area[k][i] is the largest area of components i .. i + 2^k - 1
+        self.max_area = [self.area]
+        width = 1
+        while 2 * width <= len(areas):
+            row = self.max_area[-1]
+            self.max_area.append([max(row[i], row[i + width])
+                                  for i in range(len(row) - width)])
+            width *= 2
+
+    @staticmethod
+    def _prefix(values):
+        total = _ExactSum()
+        sums = [()]
+        for value in values:
+            total.add(value)
+            sums.append(tuple(total._partials))
+        return sums
+
+    @staticmethod
+    def between(sums, start, stop):
+        """Correctly rounded sum of the values start .. stop - 1, from the
+        prefix sums ``x`` or ``volume``"""
+        return fsum(sums[stop] + tuple(-partial for partial in sums[start]))
+
+    def terms(self, start, stop):
+        """(l_0, V_B, A_B, A_r) of components start .. stop - 1"""
+        level = (stop - start).bit_length() - 1
+        row = self.max_area[level]
+        A_r = max(row[start], row[stop - (1 << level)])
+        return (self.between(self.x, start, stop), self.between(self.volume, start, stop),
+                self.area[start], A_r)
 
 
 class Body(object):
@@ -86,28 +422,121 @@ class Body(object):
 
     :param list body: A list of body components (Nose, tube, transition, etc.)
 
+    The body terms (l_0, V_B, A_B, A_r) are summed over the components the first
+    time they are needed. After that, a change to one component only updates
+    the terms by the difference it made, rather than summing the whole body
+    again. The sums are kept exactly (see `_ExactSum`), so an updated body
+    gives the same answer, to the last bit, as a body built from scratch.
+
     Members:
     """
 
     def __init__(self, body):
-        length = 0
-        volume = 0
-        area_r = 0
-        for component in body:
-            length += component.length
-            volume += component.volume
-            if component.area > area_r:
-                area_r = component.area
-
-        self.l_0 = length
-        self.V_B = volume
-        self.A_B = body[0].area
-        self.A_r = area_r
+        self.components = tuple(body)  #: The body components, nose first
+        self._terms = None
+        self._index = None
+        self._listen()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._listen()
+
+    def _listen(self):
+        self._positions = {}
+        for i, component in enumerate(self.components):
+            self._positions.setdefault(id(component), []).append(i)
+            component._listen(self)
+
+    def _component_changed(self, component):
+        self._index = None
+        if self._terms is None:
+            return
+
+        for i in self._positions[id(component)]:
+            old_length, old_volume, old_area = self._parts[i]
+            length, volume, area = self._parts[i] = (
+                component.length, component.volume, component.area)
+
+            if length != old_length:
+                self._length.add(length)
+                self._length.add(-old_length)
+            if volume != old_volume:
+                self._volume.add(volume)
+                self._volume.add(-old_volume)
+            if area >= self._area_r:
+                self._area_r = area
+            elif old_area == self._area_r:
+                # the largest component shrank, look for the new largest
+                self._area_r = max(part[2] for part in self._parts)
+
+        self._terms = (self._length.value, self._volume.value, self._parts[0][2], self._area_r)
+
+    def _sum(self):
+        if self._terms is None:
+            self._parts = [(c.length, c.volume, c.area) for c in self.components]
+            self._length = _ExactSum(part[0] for part in self._parts)
+            self._volume = _ExactSum(part[1] for part in self._parts)
+            self._area_r = max(part[2] for part in self._parts)
+            self._terms = (self._length.value, self._volume.value, self._parts[0][2], self._area_r)
+        return self._terms
+
+    def _stack_index(self):
+        if self._index is None:
+            self._index = _StackIndex([(c.length, c.volume, c.area) for c in self.components])
+        return self._index
+
+    def station(self, i):
+        """Axial position of the front of a component.
+
+        :param int i: Index of the component; ``len(components)`` for the
+                      bottom of the body
+        :returns: distance from the tip of the nose [meters]
+        :raises IndexError: if there is no such component
+        """
+        if not 0 <= i <= len(self.components):
+            raise IndexError("No station {0} in a body of {1} components".format(
+                i, len(self.components)))
+        index = self._stack_index()
+        return index.between(index.x, 0, i)
+
+    def stack(self, start=0, stop=None):
+        """A run of consecutive components as a body of its own, e.g. the
+        stage left after staging. Answered from an index of the whole body
+        (built once, and again after a component changes) instead of summing
+        the components again.
+
+        :param int start: (Optional, default=0) Index of the first component
+        :param int stop: (Optional, default=None) Index one past the last
+                         component; None for the bottom of the body
+        :returns: a `BodyStack`
+        """
+        return BodyStack(self, start, stop)
+
+    @property
+    def l_0(self):
+        """Body length [meters]"""
+        return self._sum()[0]
+
+    @property
+    def V_B(self):
+        """Body volume [meters^3]"""
+        return self._sum()[1]
+
+    @property
+    def A_B(self):
+        """Nose base area [meters^2]"""
+        return self._sum()[2]
+
+    @property
+    def A_r(self):
+        """Reference area, the largest cross-section of the body [meters^2]"""
+        return self._sum()[3]
 
     def C_P(self, Mach):
         """Center of Pressure.
 
-        :param float Mach: Mach number of the air-stream over the rocket [dimensionless]
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
         :returns: the center of pressure of the rocket body in [meters] (tip of nose = 0)
 
         """
@@ -124,12 +553,13 @@ class Body(object):
          - A: Base Area
         """
 
-        return self.l_0 - (self.V_B/self.A_B)
+        return _broadcast(self.l_0 - (self.V_B/self.A_B), Mach)
 
     def C_Na(self, Mach):
         """Normal Force Coefficient Derivative.
 
-        :param float Mach: Mach number of the air-stream over the rocket [dimensionless]
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
         :returns: the aerodynamic normal coefficient (C_Na) for the body
 
         """
@@ -147,7 +577,60 @@ class Body(object):
                 larger transition below)
         """
 
-        return 2.0 * (self.A_B / self.A_r)
+        return _broadcast(2.0 * (self.A_B / self.A_r), Mach)
+
+
+class BodyStack(Body):
+    """Part of a `Body`: the components from ``start`` up to (not including)
+    ``stop``, made with `Body.stack`. Has all the terms and coefficients of a
+    `Body`, with lengths measured from the front of the first component; add
+    ``body.station(start)`` to place them on the whole body. The first
+    component stands in for the nose (its area is A_B). Follows changes to the
+    components of the body.
+
+    :param Body body: The whole body
+    :param int start: Index of the first component
+    :param int stop: Index one past the last component; None for the bottom
+                     of the body
+    """
+
+    def __init__(self, body, start, stop=None):
+        count = len(body.components)
+        start, stop, step = slice(start, stop).indices(count)
+        if start >= stop:
+            raise ValueError("Empty stack: components {0} to {1} of {2}".format(start, stop, count))
+        self.body = body    #: The whole body
+        self.start = start  #: Index of the first component
+        self.stop = stop    #: Index one past the last component
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    @property
+    def components(self):
+        """The components of the stack"""
+        return self.body.components[self.start:self.stop]
+
+    def _sum(self):
+        return self.body._stack_index().terms(self.start, self.stop)
+
+    def station(self, i):
+        """Axial position of the front of a component of the stack.
+
+        :param int i: Index of the component in the stack; the number of
+                      components for the bottom of the stack
+        :returns: distance from the front of the stack [meters]
+        :raises IndexError: if there is no such component
+        """
+        if not 0 <= i <= self.stop - self.start:
+            raise IndexError("No station {0} in a stack of {1} components".format(
+                i, self.stop - self.start))
+        index = self.body._stack_index()
+        return index.between(index.x, self.start, self.start + i)
+
+    def stack(self, start=0, stop=None):
+        start, stop, step = slice(start, stop).indices(self.stop - self.start)
+        return BodyStack(self.body, self.start + start, self.start + stop)
 
 
 class Tail(object):
@@ -160,19 +643,60 @@ class Tail(object):
     .. figure:: images/barrowman_nomenclature.svg
        :alt: Diagram of Barrowman's rocket parts nomenclature.
 
-    Takes a fin definition and the number of fins.
+    Takes a fin definition and the number of fins, and the width of the body
+    the fins are attached to.
 
     :param Fin fin: A Fin object
     :param int N: The number of fins on the tail
+    :param float width: (Optional, default=None) The diameter of the body at
+                        the fins [meters]. None treats the fins on their own,
+                        without fin-body interference.
     """
 
-    def __init__(self, fin, N):
+    def __init__(self, fin, N, width=None):
         self._fin = fin
+        self.N = N          #: Number of fins
+        self.width = width  #: Diameter of the body at the fins
+        self._component_changed(fin)
+        fin._listen(self)
+
+    def __setattr__(self, name, value):
+        super(Tail, self).__setattr__(name, value)
+        if name in ('N', 'width'):
+            self._component_changed(self._fin)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._fin._listen(self)
+
+    def _component_changed(self, component):
+        self.__dict__['_X'] = None
+        self.__dict__['_C_Na_terms'] = None
+
+    def _terms(self):
+        if self._C_Na_terms is None:
+            fin = self._fin
+            self.__dict__['_C_Na_terms'] = _tail_terms(
+                fin.root, fin.tip, fin.span, fin.sweep, self.N, self.width)
+        return self._C_Na_terms
+
+    @property
+    def K_TB(self):
+        """Interference factor K_T(B): normal force on the fins in presence of
+        the body relative to the fins alone"""
+        return interference(self._fin.span, self.width or 0)[0]
+
+    @property
+    def K_BT(self):
+        """Interference factor K_B(T): normal force carried over onto the body
+        relative to the fins alone"""
+        return interference(self._fin.span, self.width or 0)[1]
 
     def C_P(self, Mach):
         """Center of Pressure.
 
-        :param float Mach: Mach number of the air-stream over the rocket [dimensionless]
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
         :returns: the center of pressure of the rocket body in [meters] (tip of nose = 0)
 
         """
@@ -193,11 +717,47 @@ class Tail(object):
         In this case we want to return the partial X, so we ignore l_T (we don't know it yet anyway)
         """
 
-        x_t = self._fin.sweep
-        c_r = self._fin.root
-        c_t = self._fin.tip
+        if self._X is None:
+            x_t = self._fin.sweep
+            c_r = self._fin.root
+            c_t = self._fin.tip
+
+            X = ((x_t / 3.0) * ((c_r + (2 * c_t)) / (c_r + c_t)))
+            X += (1 / 6.0) * (c_r + c_t  - (c_r * c_t)/(c_r + c_t))
+            self.__dict__['_X'] = X
+
+        return _broadcast(self._X, Mach)
+
+    def C_Na(self, Mach, A_r=None):
+        """Normal Force Coefficient Derivative.
+
+        :param Mach: Mach number of the air-stream over the rocket, a float or an
+                     array of Mach numbers [dimensionless]
+        :param float A_r: (Optional, default=None) Reference area [meters^2].
+                          Defaults to the cross-section of the body at the fins.
+        :returns: the aerodynamic normal coefficient of the fins in presence of
+                  the body, C_Na(T(B)) + C_Na(B(T))
+
+        """
+
+        """For N evenly spaced fins the paper sums the single fin result over
+        the roll angle of each fin:
+
+            C_Na(T) = (N/2) C_Na1          (N = 3 or 4, close for N = 6)
+
+        and the body raises the normal force on the fins, and carries some of
+        it over onto itself:
+
+            C_Na(T(B)) = K_T(B) C_Na(T)
+            C_Na(B(T)) = K_B(T) C_Na(T)
+
+        See `interference` for K_T(B) and K_B(T), and `_tail_C_Na` for C_Na1.
+        """
 
-        X = ((x_t / 3.0) * ((c_r + (2 * c_t)) / (c_r + c_t)))
-        X += (1 / 6.0) * (c_r + c_t  - (c_r * c_t)/(c_r + c_t))
+        if A_r is None:
+            if not self.width:
+                raise ValueError("A reference area is needed for a tail without a body width")
+            A_r = numpy.pi * (self.width / 2.0)**2
 
-        return X
+        a, b, c, k = self._terms()
+        return _tail_C_Na(Mach, a, b, c, k / A_r)
@@ -0,0 +1,145 @@
+"""
+Shared Memory Evaluation
+========================
+
+Evaluate a very large `batch.RocketBatch` in a pool of worker processes
+without sending the designs or the results through pipes.
+
+The geometry columns, the Mach numbers and the C_P and C_Na results all live
+in one block of `multiprocessing.shared_memory`. Each worker maps the block
+once, when it starts; a task is just the bounds of a slice, and the worker
+writes the results of its slice straight into the shared output. Nothing but
+the slice bounds is pickled, so the work grows with the number of designs
+and the number of workers adds to the speed.
+"""
+# -*- coding: utf-8 -*-
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy
+from barrowman.batch import RocketBatch
+
+#: Rows of the shared block: the geometry columns, then the Mach numbers,
+#: then the results
+COLUMNS = ('width', 'nose_length', 'tube_length', 'root', 'tip', 'span', 'sweep', 'N',
+           'nose_parameter', 'Mach', 'C_P', 'C_Na')
+
+_INPUTS = COLUMNS[:8]
+_worker = None
+
+
+class _Block(object):
+    """Views of the rows of a shared block (see `COLUMNS`)"""
+
+    def __init__(self, memory, size, nose_shape):
+        self.memory = memory
+        self.size = size
+        self.nose_shape = nose_shape
+        self.rows = numpy.ndarray((len(COLUMNS), size), dtype=float, buffer=memory.buf)
+        self.columns = dict(zip(COLUMNS, self.rows))
+        self.results = self.rows[COLUMNS.index('C_P'):]
+
+    def evaluate(self, start, stop):
+        c = self.columns
+        batch = RocketBatch(*[c[name][start:stop] for name in _INPUTS[:7]],
+                            N=c['N'][start:stop], nose_shape=self.nose_shape,
+                            nose_parameter=c['nose_parameter'][start:stop])
+        Mach = c['Mach'][start:stop]
+        c['C_P'][start:stop] = batch.C_P(Mach)
+        c['C_Na'][start:stop] = batch.C_Na(Mach)
+        return stop - start
+
+
+def _attach(name, size, nose_shape):
+    """Start a worker: map the shared block"""
+    global _worker
+    _worker = _Block(shared_memory.SharedMemory(name=name), size, nose_shape)
+
+
+def _evaluate(bounds):
+    return _worker.evaluate(*bounds)
+
+
+class SharedExecutor(object):
+    """A batch of designs in shared memory, and a pool of workers to evaluate
+    them. The designs are copied in once; evaluate them at as many Mach
+    numbers as needed, then `close` the executor (or use it as a context
+    manager) to stop the workers and free the memory.
+
+    :param batch.RocketBatch batch: The designs
+    :param int processes: (Optional, default=None) Number of worker processes,
+                          None for one per CPU, 1 to evaluate in this process
+    :param int chunksize: (Optional, default=65536) Designs evaluated per
+                          task; bounds the temporary memory used per worker
+    """
+
+    def __init__(self, batch, processes=None, chunksize=65536):
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1, not {0}".format(chunksize))
+        self.size = len(batch)
+        self.chunksize = chunksize
+        memory = shared_memory.SharedMemory(
+            create=True, size=max(1, len(COLUMNS) * self.size * numpy.dtype(float).itemsize))
+        self._block = _Block(memory, self.size, batch.nose_shape)
+        for name in _INPUTS + ('nose_parameter',):
+            self._block.columns[name][:] = getattr(batch, name)
+
+        self._pool = None
+        if processes != 1:
+            self._pool = multiprocessing.Pool(processes, initializer=_attach,
+                                              initargs=(memory.name, self.size, batch.nose_shape))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def evaluate(self, Mach=0.3):
+        """Evaluate every design.
+
+        :param Mach: (Optional, default=0.3) Mach number, a float or an array
+                     with one per design [dimensionless]
+        :returns: a new (2, designs) array: the C_P [meters] (tip of nose = 0)
+                  and C_Na of each design
+
+        """
+        if self._block is None:
+            raise ValueError("The executor is closed")
+        self._block.columns['Mach'][:] = Mach
+        tasks = [(start, min(start + self.chunksize, self.size))
+                 for start in range(0, self.size, self.chunksize)]
+        if self._pool is None:
+            for task in tasks:
+                self._block.evaluate(*task)
+        else:
+            self._pool.map(_evaluate, tasks, chunksize=1)
+        return self._block.results.copy()
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._block is not None:
+            memory = self._block.memory
+            self._block = None
+            memory.close()
+            memory.unlink()
+
+
+def evaluate(batch, Mach=0.3, processes=None, chunksize=65536):
+    """Evaluate a batch of designs in a pool of workers sharing memory.
+
+    :param batch.RocketBatch batch: The designs
+    :param Mach: (Optional, default=0.3) Mach number, a float or an array with
+                 one per design [dimensionless]
+    :param int processes: (Optional, default=None) Number of worker processes,
+                          None for one per CPU, 1 to evaluate in this process
+    :param int chunksize: (Optional, default=65536) Designs evaluated per task
+    :returns: a (2, designs) array: the C_P [meters] (tip of nose = 0) and
+              C_Na of each design
+
+    """
+    with SharedExecutor(batch, processes, chunksize) as executor:
+        return executor.evaluate(Mach)
@@ -0,0 +1,152 @@
+"""
+Design Records
+==============
+
+A compact binary format for large sets of designs and their results.
+
+Each design is one fixed-size record (`RECORD`): the geometry columns of a
+`batch.RocketBatch` (with its nose shape, as a number, see `SHAPE_CODES`), the
+Mach number to evaluate at, and the results. Files
+are NumPy ``.npy`` files, a short header followed by the raw records, so they
+can be memory-mapped: opening a file reads nothing, the operating system pages
+records in as they are used, and every process that opens the same file shares
+the same pages. `batch.RocketBatch.from_records` evaluates straight from the
+mapped fields without copying them.
+"""
+# -*- coding: utf-8 -*-
+import multiprocessing
+import numpy
+from numpy.lib.format import open_memmap
+from barrowman import Nose
+from barrowman.batch import RocketBatch
+
+#: Code of each nose shape in the nose_shape field: its position in `Nose.SHAPES`
+SHAPE_CODES = dict((shape, float(i)) for i, shape in enumerate(Nose.SHAPES))
+
+#: Layout of one design record. Every field is a little-endian float64 (even
+#: the fin count N and the nose shape) so batches can use the fields without
+#: conversion.
+RECORD = numpy.dtype([
+    ('width', '<f8'),         # Diameter of the body [meters]
+    ('nose_length', '<f8'),   # Length of the nosecone [meters]
+    ('tube_length', '<f8'),   # Length of the tubes [meters]
+    ('root', '<f8'),          # Root chord of the fins [meters]
+    ('tip', '<f8'),           # Tip chord of the fins [meters]
+    ('span', '<f8'),          # Span of the fins [meters]
+    ('sweep', '<f8'),         # Sweep length of the fins [meters]
+    ('N', '<f8'),             # Number of fins
+    ('nose_shape', '<f8'),    # Shape of the nosecone, see SHAPE_CODES
+    ('nose_parameter', '<f8'),  # Shape parameter of the nosecone (NaN: the shape's default)
+    ('Mach', '<f8'),          # Mach number to evaluate at
+    ('C_P', '<f8'),           # Result: center of pressure [meters]
+    ('C_Na', '<f8'),          # Result: normal force coefficient derivative
+])
+
+
+def create(path, size):
+    """Create a design file, filled with zeros.
+
+    :param str path: Name of the file
+    :param int size: Number of records
+    :returns: the records, memory-mapped for writing
+
+    """
+    return open_memmap(path, mode='w+', dtype=RECORD, shape=(size,))
+
+
+def load(path, mode='r'):
+    """Memory-map a design file.
+
+    :param str path: Name of the file
+    :param str mode: (Optional, default='r') 'r' to read, 'r+' to also write
+    :returns: the records
+
+    """
+    records = numpy.load(path, mmap_mode=mode)
+    if records.dtype != RECORD:
+        raise ValueError("{0!r} does not hold design records".format(path))
+    return records
+
+
+def from_batch(batch, Mach=0.0):
+    """Copy the geometry of a batch into new records.
+
+    :param batch.RocketBatch batch: The designs
+    :param Mach: (Optional, default=0.0) Mach number(s) to evaluate at
+    :returns: a record array, with the results set to NaN
+
+    """
+    records = numpy.empty(len(batch), dtype=RECORD)
+    for name in RECORD.names[:8]:
+        records[name] = getattr(batch, name)
+    records['nose_shape'] = SHAPE_CODES[batch.nose_shape]
+    records['nose_parameter'] = batch.nose_parameter
+    records['Mach'] = Mach
+    records['C_P'] = numpy.nan
+    records['C_Na'] = numpy.nan
+    return records
+
+
+def evaluate(records, chunksize=65536):
+    """Evaluate records in place: fill in the C_P and C_Na of each design at
+    its Mach number. Works a chunk at a time, so the temporary arrays stay
+    small however many records there are. Records with different nose
+    shapes are evaluated a shape at a time.
+
+    :param records: Records (e.g. from `load` with mode 'r+')
+    :param int chunksize: (Optional, default=65536) Records evaluated at a time
+    :returns: records
+
+    """
+    for start in range(0, len(records), chunksize):
+        chunk = records[start:start + chunksize]
+        codes = numpy.unique(chunk['nose_shape'])
+        if len(codes) > 1:
+            for code in codes:
+                index = numpy.flatnonzero(chunk['nose_shape'] == code)
+                part = chunk[index]
+                batch = RocketBatch.from_records(part)
+                chunk['C_P'][index] = batch.C_P(part['Mach'])
+                chunk['C_Na'][index] = batch.C_Na(part['Mach'])
+            continue
+        batch = RocketBatch.from_records(chunk)
+        chunk['C_P'] = batch.C_P(chunk['Mach'])
+        chunk['C_Na'] = batch.C_Na(chunk['Mach'])
+    return records
+
+
+def _evaluate_slice(task):
+    path, start, stop, chunksize = task
+    records = load(path, 'r+')
+    evaluate(records[start:stop], chunksize)
+    records.flush()
+
+
+def evaluate_file(path, processes=1, chunksize=65536):
+    """Evaluate every record of a design file in place.
+
+    With several processes, each worker maps the file itself and evaluates
+    its own slices of it; no records are sent between processes.
+
+    :param str path: Name of the file
+    :param int processes: (Optional, default=1) Number of worker processes,
+                          None for one per CPU, 1 to evaluate in this process
+    :param int chunksize: (Optional, default=65536) Records per task
+    :returns: the number of records evaluated
+
+    """
+    size = len(load(path))
+    tasks = [(path, start, min(start + chunksize, size), chunksize)
+             for start in range(0, size, chunksize)]
+
+    if processes == 1:
+        for task in tasks:
+            _evaluate_slice(task)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            pool.map(_evaluate_slice, tasks)
+        finally:
+            pool.terminate()
+            pool.join()
+    return size
@@ -0,0 +1,156 @@
+"""
+Fin Search
+==========
+
+Size the fins of a rocket by brute force: sweep the `barrowman.Fin` parameters
+(root, tip, span and sweep or sweep angle) over a grid, and keep the designs
+that give the wanted stability margin.
+
+The grid is never built in memory. It is cut into chunks of consecutive grid
+indices, each chunk is evaluated as a `batch.TailBatch` (in a pool of worker
+processes if asked), and only the qualifying designs are sent back. Only a few
+chunks per worker are handed to the pool ahead of the caller, so a slow
+consumer holds back the search instead of piling up results.
+"""
+# -*- coding: utf-8 -*-
+from collections import deque
+import multiprocessing
+import numpy
+from barrowman.batch import TailBatch, rocket_C_P
+
+#: Record layout of the designs returned by `fin_grid_search`
+DESIGN = numpy.dtype([
+    ('root', float),
+    ('tip', float),
+    ('span', float),
+    ('sweep', float),
+    ('margin', float),
+])
+
+
+class _Grid(object):
+    """Everything a worker needs to evaluate any chunk of the grid"""
+
+    def __init__(self, body, cg, margin, tolerance, Mach, N, root, tip, span, sweep, sweepangle):
+        self.X_B = body.C_P(Mach)
+        self.C_NaB = body.C_Na(Mach)
+        self.l_0 = body.l_0
+        self.A_r = body.A_r
+        self.diameter = numpy.sqrt(4 * body.A_r / numpy.pi)
+        self.width = numpy.sqrt(4 * body.components[-1].area / numpy.pi)
+        self.cg = cg
+        self.margin = margin
+        self.tolerance = tolerance
+        self.Mach = Mach
+        self.N = N
+
+        self.axes = [numpy.atleast_1d(numpy.asarray(a, dtype=float))
+                     for a in (root, tip, span, sweep if sweep is not None else sweepangle)]
+        self.by_angle = sweep is None
+        self.shape = tuple(len(a) for a in self.axes)
+        self.size = int(numpy.prod(self.shape))
+
+    def evaluate(self, start, stop):
+        index = numpy.unravel_index(numpy.arange(start, stop), self.shape)
+        root, tip, span, sweep = [a[i] for a, i in zip(self.axes, index)]
+        if self.by_angle:
+            sweep = span * numpy.tan(numpy.radians(sweep))
+
+        tail = TailBatch(root, tip, span, sweep, N=self.N, width=self.width)
+        X_T = (self.l_0 - root) + tail.C_P(self.Mach)
+        X = rocket_C_P(self.X_B, self.C_NaB, X_T, tail.C_Na(self.Mach, self.A_r))
+        margin = (X - self.cg) / self.diameter
+
+        keep = numpy.abs(margin - self.margin) <= self.tolerance
+        designs = numpy.empty(numpy.count_nonzero(keep), dtype=DESIGN)
+        designs['root'] = root[keep]
+        designs['tip'] = tip[keep]
+        designs['span'] = span[keep]
+        designs['sweep'] = sweep[keep]
+        designs['margin'] = margin[keep]
+        return designs
+
+
+_grid = None
+
+
+def _set_grid(grid):
+    global _grid
+    _grid = grid
+
+
+def _evaluate(bounds):
+    return _grid.evaluate(*bounds)
+
+
+def fin_grid_search(body, cg, margin, root, tip, span, sweep=None, sweepangle=None,
+                    N=4, tolerance=0.1, Mach=0.3, processes=None, chunksize=65536, pending=2):
+    """Search every combination of fin parameters for designs whose stability
+    margin is within ``tolerance`` of ``margin``.
+
+    The fins are searched over the grid of all combinations of the ``root``,
+    ``tip``, ``span`` and ``sweep`` (or ``sweepangle``) values, each attached
+    to the bottom of ``body`` (see `original.Rocket`). Give one of sweep or
+    sweepangle; with neither, every fin has a 45 degree sweep angle like
+    `barrowman.Fin`.
+
+    :param original.Body body: The body the fins are attached to
+    :param float cg: Center of gravity of the rocket [meters] (tip of nose = 0)
+    :param float margin: Wanted stability margin [calibers]
+    :param root: Root chord values to search [meters]
+    :param tip: Tip chord values to search [meters]
+    :param span: Span values to search [meters]
+    :param sweep: (Optional) Sweep length values to search [meters]
+    :param sweepangle: (Optional) Sweep angle values to search [degrees]
+    :param int N: (Optional, default=4) Number of fins
+    :param float tolerance: (Optional, default=0.1) Largest accepted distance
+                            from the wanted margin [calibers]
+    :param float Mach: (Optional, default=0.3) Mach number to evaluate the
+                       center of pressure at [dimensionless]
+    :param int processes: (Optional, default=None) Number of worker processes,
+                          None for one per CPU, 1 to search in this process
+    :param int chunksize: (Optional, default=65536) Number of grid points
+                          evaluated per chunk; bounds the memory used per worker
+    :param int pending: (Optional, default=2) Chunks in flight per worker
+    :returns: a generator of `DESIGN` arrays, one per chunk with any
+              qualifying designs, in grid order
+
+    """
+    if sweep is None and sweepangle is None:
+        sweepangle = 45.0
+    elif sweep is not None and sweepangle is not None:
+        raise ValueError("Give either sweep or sweepangle, not both")
+
+    grid = _Grid(body, cg, margin, tolerance, Mach, N, root, tip, span, sweep, sweepangle)
+    return _search(grid, processes, chunksize, pending)
+
+
+def _search(grid, processes, chunksize, pending):
+    """Evaluate the grid a chunk at a time, see `fin_grid_search`"""
+    chunks = ((start, min(start + chunksize, grid.size))
+              for start in range(0, grid.size, chunksize))
+
+    if processes == 1:
+        for bounds in chunks:
+            designs = grid.evaluate(*bounds)
+            if len(designs):
+                yield designs
+        return
+
+    pool = multiprocessing.Pool(processes, initializer=_set_grid, initargs=(grid,))
+    try:
+        limit = pending * (processes or multiprocessing.cpu_count())
+        queue = deque()
+        for bounds in chunks:
+            queue.append(pool.apply_async(_evaluate, (bounds,)))
+            while len(queue) >= limit:
+                designs = queue.popleft().get()
+                if len(designs):
+                    yield designs
+        while queue:
+            designs = queue.popleft().get()
+            if len(designs):
+                yield designs
+    finally:
+        pool.terminate()
+        pool.join()
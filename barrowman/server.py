@@ -0,0 +1,266 @@
+"""
+Evaluation Server
+=================
+
+A small asyncio server that answers one design at a time, but evaluates them
+many at a time. Requests that arrive within a short latency window of each
+other are gathered into one `batch.RocketBatch`, evaluated together in a
+thread pool, off the event loop, and the answers sent back to each client.
+
+The protocol is JSON lines over TCP. Each request is a design, as one JSON
+object on a line, with the fields of `stream` plus ``Mach`` (default 0.3). The
+answer is a line with the ``id`` of the request (if it had one), ``C_P`` and
+``C_Na`` (null if not finite, e.g. for a NaN Mach number), or ``error``. A connection can send many requests without waiting;
+answers come back in the order of the requests. The request
+``{"metrics": true}`` answers with the server's `Batcher.metrics`.
+
+Run a server with ``python -m barrowman.server --port 8642``.
+"""
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import json
+import time
+import numpy
+from barrowman import Nose
+from barrowman.batch import RocketBatch
+from barrowman.stream import design_columns, json_value
+
+
+class Batcher(object):
+    """Gathers designs evaluated one at a time into batches.
+
+    The first design to arrive opens a batch; the batch is evaluated when the
+    latency window has passed since then, or as soon as it is full.
+
+    :param float window: (Optional, default=0.002) Longest time a design waits
+                         for others to join its batch [seconds]
+    :param int max_batch: (Optional, default=4096) Most designs in a batch
+    :param executor: (Optional, default=None) A `concurrent.futures.Executor`
+                     to evaluate batches in, None for the event loop's default
+    """
+
+    def __init__(self, window=0.002, max_batch=4096, executor=None):
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor
+        self._pending = []
+        self._running = set()
+        self._timer = None
+        self._started = time.perf_counter()
+        self._counts = dict(requests=0, errors=0, batches=0, designs=0, max_queue_depth=0)
+        self._busy = 0.0
+
+    async def evaluate(self, design):
+        """Evaluate one design, together with any others that arrive within
+        the window.
+
+        :param dict design: The design, see `stream`, and its ``Mach`` number
+        :returns: (C_P, C_Na)
+        """
+        self._counts['requests'] += 1
+        try:
+            Mach = float(design.get('Mach', 0.3))
+            if design.get('nose_shape') not in Nose.SHAPES + ('', None):
+                raise ValueError("Unknown nose shape: {0!r}".format(design['nose_shape']))
+            design_columns([design])
+        except (KeyError, TypeError, ValueError) as error:
+            self._counts['errors'] += 1
+            raise ValueError("Bad design: {0}".format(error))
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((design, Mach, future))
+        self._counts['max_queue_depth'] = max(self._counts['max_queue_depth'], len(self._pending))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, pending):
+        # The batch is evaluated in the executor, so the event loop goes on
+        # reading requests meanwhile; the futures are set back on the loop.
+        designs, Mach, futures = zip(*pending)
+        try:
+            results, busy = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _evaluate, designs, Mach)
+        except Exception as error:
+            results, busy = [ValueError("Can't evaluate: {0}".format(error))] * len(designs), 0.0
+
+        self._busy += busy
+        self._counts['batches'] += 1
+        self._counts['designs'] += len(designs)
+        for future, result in zip(futures, results):
+            if isinstance(result, Exception):
+                self._counts['errors'] += 1
+                if not future.cancelled():
+                    future.set_exception(result)
+            elif not future.cancelled():
+                future.set_result(result)
+
+    def metrics(self):
+        """Counters of the work done so far.
+
+        :returns: dict of: requests, errors, batches, designs (evaluated),
+                  queue_depth (designs waiting now), max_queue_depth,
+                  mean_batch (designs per batch), throughput (designs per
+                  second since the start), busy (fraction of time spent
+                  evaluating)
+        """
+        elapsed = time.perf_counter() - self._started
+        metrics = dict(self._counts)
+        metrics['queue_depth'] = len(self._pending)
+        metrics['mean_batch'] = metrics['designs'] / float(metrics['batches'] or 1)
+        metrics['throughput'] = metrics['designs'] / elapsed
+        metrics['busy'] = self._busy / elapsed
+        return metrics
+
+
+def _evaluate(designs, Mach):
+    """Evaluate a batch of designs, grouped by nose shape.
+
+    :returns: ((C_P, C_Na) or the error, for each design), and the time spent
+              [seconds]
+    """
+    start = time.perf_counter()
+    Mach = numpy.array(Mach)
+    columns = design_columns(designs)
+    shapes = numpy.array(columns.pop('nose_shape'))
+    del columns['id'], columns['cg']
+
+    results = [None] * len(designs)
+    for shape in set(shapes):
+        rows = numpy.flatnonzero(shapes == shape)
+        try:
+            batch = RocketBatch(nose_shape=shape, **dict((name, column[rows])
+                                                         for name, column in columns.items()))
+            C_P, C_Na = batch.C_P(Mach[rows]), batch.C_Na(Mach[rows])
+        except (ArithmeticError, ValueError) as error:
+            for i in rows:
+                results[i] = ValueError("Can't evaluate: {0}".format(error))
+            continue
+        for i, c_p, c_na in zip(rows, C_P, C_Na):
+            results[i] = (float(c_p), float(c_na))
+    return results, time.perf_counter() - start
+
+
+class EvaluationServer(object):
+    """JSON lines over TCP in front of a `Batcher`.
+
+    :param str host: (Optional, default='127.0.0.1') Address to listen on
+    :param int port: (Optional, default=0) Port to listen on, 0 for any free one
+    :param float window: (Optional, default=0.002) Latency window, see `Batcher`
+    :param int max_batch: (Optional, default=4096) Largest batch, see `Batcher`
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, window=0.002, max_batch=4096):
+        self.host = host
+        self.port = port
+        self.batcher = Batcher(window, max_batch)  #: The `Batcher` shared by every connection
+        self._server = None
+
+    async def start(self):
+        """Start listening.
+
+        :returns: the (host, port) listened on
+        """
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def close(self):
+        """Stop listening and wait for the server to close."""
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        """Start, if not started, and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def _answer(self, line):
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                request = {}
+                raise ValueError("A request must be a JSON object")
+            if request.get('metrics'):
+                return self.batcher.metrics()
+            C_P, C_Na = await self.batcher.evaluate(request)
+            answer = {'C_P': json_value(C_P), 'C_Na': json_value(C_Na)}
+        except ValueError as error:
+            answer = {'error': str(error)}
+        if 'id' in request:
+            answer['id'] = request['id']
+        return answer
+
+    async def _connection(self, reader, writer):
+        # Each line is answered by its own task, so requests sent together
+        # join the same batch; the answers are written back in order.
+        answers = asyncio.Queue()
+
+        async def write():
+            while True:
+                answer = await answers.get()
+                if answer is None:
+                    break
+                try:
+                    line = json.dumps(await answer, allow_nan=False)
+                except Exception as error:
+                    line = json.dumps({'error': "Internal error: {0}".format(error)})
+                writer.write((line + '\n').encode('utf-8'))
+                await writer.drain()
+
+        writing = asyncio.ensure_future(write())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    answers.put_nowait(asyncio.ensure_future(self._answer(line)))
+            answers.put_nowait(None)
+            await writing
+        except ConnectionError:
+            writing.cancel()
+        finally:
+            writer.close()
+
+
+def main(argv=None):
+    """Run a server until interrupted.
+
+    :param list argv: (Optional, default=None) Arguments, by default from the
+                      command line
+    """
+    parser = argparse.ArgumentParser(prog='python -m barrowman.server',
+                                     description="Serve Barrowman evaluations over TCP.")
+    parser.add_argument('--host', default='127.0.0.1', help="address (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8642, help="port (default: 8642)")
+    parser.add_argument('--window', type=float, default=0.002,
+                        help="latency window [seconds] (default: 0.002)")
+    parser.add_argument('--max-batch', type=int, default=4096,
+                        help="largest batch (default: 4096)")
+    args = parser.parse_args(argv)
+
+    server = EvaluationServer(args.host, args.port, args.window, args.max_batch)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Fin Sizing
+==========
+
+The inverse of the Barrowman equations: find the value of one fin parameter
+(the span, say) that gives each of many designs a wanted stability margin.
+
+Every design is solved at once, as a `batch.RocketBatch`. Each iteration takes
+a Newton step on the margin, with the exact derivative from `gradient`, and
+falls back to bisection whenever the step would leave the bracket known to hold
+the root or is not shrinking fast enough, so every bracketed design converges.
+Designs drop out of the batch as they converge, so the later iterations only
+work on the designs that still need them.
+"""
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+import numpy
+from barrowman.batch import RocketBatch
+from barrowman.gradient import gradient
+from barrowman.search import DESIGN
+
+#: The fin parameters that can be solved for
+PARAMETERS = ('root', 'tip', 'span', 'sweep')
+
+#: Result of `size_fins`: the fins (a `search.DESIGN` array, NaN where the
+#: wanted margin is not within the bounds), the number of iterations each
+#: design took and whether it converged
+Solution = namedtuple('Solution', ('fins', 'iterations', 'converged'))
+
+
+class _Problem(object):
+    """The designs, with the solved parameter replaced by a trial value"""
+
+    def __init__(self, batch, parameter, cg, margin, Mach, sweepangle):
+        size = len(batch)
+        self.batch = batch
+        self.parameter = parameter
+        self.cg = numpy.broadcast_to(numpy.asarray(cg, dtype=float), (size,))
+        self.margin = numpy.broadcast_to(numpy.asarray(margin, dtype=float), (size,))
+        self.Mach = numpy.broadcast_to(numpy.asarray(Mach, dtype=float), (size,))
+        self.tan_sweep = None
+        if sweepangle is not None:
+            self.tan_sweep = numpy.broadcast_to(numpy.tan(numpy.radians(sweepangle)), (size,))
+
+    def columns(self, index, x):
+        """The fin columns of some designs, at trial values x"""
+        columns = dict((name, getattr(self.batch, name)[index]) for name in PARAMETERS)
+        columns[self.parameter] = x
+        if self.tan_sweep is not None:
+            columns['sweep'] = columns['span'] * self.tan_sweep[index]
+        return columns
+
+    def designs(self, index, x):
+        b = self.batch
+        return RocketBatch(b.width[index], b.nose_length[index], b.tube_length[index],
+                           N=b.N[index], nose_shape=b.nose_shape,
+                           nose_parameter=b.nose_parameter[index], **self.columns(index, x))
+
+    def error(self, index, x):
+        """Distance from the wanted margin [calibers]"""
+        C_P = self.designs(index, x).C_P(self.Mach[index])
+        return (C_P - self.cg[index]) / self.batch.width[index] - self.margin[index]
+
+    def error_gradient(self, index, x):
+        """Distance from the wanted margin [calibers], and its derivative"""
+        C_P, dC_P = gradient(self.designs(index, x), self.Mach[index])['C_P']
+        slope = dC_P[self.parameter]
+        if self.tan_sweep is not None and self.parameter == 'span':
+            slope = slope + self.tan_sweep[index] * dC_P['sweep']
+        width = self.batch.width[index]
+        return (C_P - self.cg[index]) / width - self.margin[index], slope / width
+
+
+def size_fins(batch, cg, margin, lower, upper, parameter='span', sweepangle=None,
+              Mach=0.3, tolerance=1e-9, max_iterations=100):
+    """Solve for the fin parameter that gives every design the wanted margin.
+
+    :param batch.RocketBatch batch: The designs. The other fin parameters are
+                                    kept; the solved parameter is the first
+                                    guess (the middle of the bounds if it is
+                                    outside them)
+    :param cg: Center of gravity of each design [meters] (tip of nose = 0)
+    :param margin: Wanted stability margin of each design [calibers]
+    :param lower: Smallest value of the parameter to consider [meters]
+    :param upper: Largest value of the parameter to consider [meters]
+    :param str parameter: (Optional, default='span') The parameter to solve
+                          for, one of `PARAMETERS`
+    :param sweepangle: (Optional, default=None) Keep this sweep angle (so the
+                       sweep follows the span) instead of the sweep length of
+                       the designs [degrees]
+    :param Mach: (Optional, default=0.3) Mach number [dimensionless]
+    :param float tolerance: (Optional, default=1e-9) Largest accepted distance
+                            from the wanted margin [calibers]
+    :param int max_iterations: (Optional, default=100) Most iterations for
+                               any design
+    :returns: a `Solution`
+
+    """
+    if parameter not in PARAMETERS:
+        raise ValueError("Can't solve for {0!r}, only one of {1}".format(
+            parameter, ', '.join(PARAMETERS)))
+    if sweepangle is not None and parameter == 'sweep':
+        raise ValueError("Can't solve for the sweep with a fixed sweep angle")
+
+    size = len(batch)
+    problem = _Problem(batch, parameter, cg, margin, Mach, sweepangle)
+    everything = numpy.arange(size)
+    lo = numpy.broadcast_to(numpy.asarray(lower, dtype=float), (size,)).copy()
+    hi = numpy.broadcast_to(numpy.asarray(upper, dtype=float), (size,)).copy()
+
+    # Only designs whose error changes sign over the bounds have a root
+    f_lo, f_hi = problem.error(everything, lo), problem.error(everything, hi)
+    converged = (f_lo == 0) | (f_hi == 0)
+    x = numpy.where(f_lo == 0, lo, numpy.where(f_hi == 0, hi, numpy.nan))
+    active = (numpy.sign(f_lo) * numpy.sign(f_hi) < 0) & ~converged
+    rising = f_lo < 0
+
+    guess = getattr(batch, parameter)
+    inside = (guess > lo) & (guess < hi)
+    x = numpy.where(active, numpy.where(inside, guess, 0.5 * (lo + hi)), x)
+    step = hi - lo
+    iterations = numpy.zeros(size, dtype=int)
+
+    for i in range(max_iterations):
+        index = numpy.flatnonzero(active)
+        if not len(index):
+            break
+        xi, old_step = x[index], step[index]
+        f, slope = problem.error_gradient(index, xi)
+        iterations[index] += 1
+
+        # Keep the root bracketed
+        below = (f < 0) == rising[index]
+        lo_i = numpy.where(below, xi, lo[index])
+        hi_i = numpy.where(below, hi[index], xi)
+        lo[index], hi[index] = lo_i, hi_i
+
+        # Newton, unless it leaves the bracket or isn't halving the step
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            newton = xi - f / slope
+        bisect = ~((newton > lo_i) & (newton < hi_i)) | (numpy.abs(newton - xi) > 0.5 * old_step)
+        new = numpy.where(bisect, 0.5 * (lo_i + hi_i), newton)
+
+        done = numpy.abs(f) <= tolerance
+        stuck = (hi_i - lo_i) <= 4 * numpy.finfo(float).eps * numpy.abs(xi)
+        x[index] = numpy.where(done | stuck, xi, new)
+        step[index] = numpy.abs(new - xi)
+        converged[index[done]] = True
+        active[index[done | stuck]] = False
+
+    fins = numpy.full(size, numpy.nan, dtype=DESIGN)
+    solved = numpy.flatnonzero(~numpy.isnan(x))
+    columns = problem.columns(solved, x[solved])
+    for name in PARAMETERS:
+        fins[name][solved] = columns[name]
+    fins['margin'][solved] = problem.error(solved, x[solved]) + problem.margin[solved]
+    return Solution(fins, iterations, converged)
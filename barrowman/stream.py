@@ -0,0 +1,316 @@
+"""
+Streaming Evaluation
+====================
+
+Evaluate files of rocket designs that are too big to load at once. Designs are
+read a chunk of lines at a time, each chunk is evaluated as a
+`batch.RocketBatch` (optionally in a pool of worker processes), and the results
+are written out before the next chunks are read, so memory use does not grow
+with the size of the input.
+
+Designs are stored one per line, either as CSV with a header row or as JSON
+lines (one JSON object per line). Each design uses the parameters of
+`barrowman.Nose`, `barrowman.Tube` and `barrowman.Fin`:
+
+============== ======== =====================================================
+Field          Required Meaning
+============== ======== =====================================================
+id             no       Name of the design (default: its 0-based number)
+width          yes      Diameter of the body [meters]
+nose_shape     no       Shape of the nosecone (default: Nose.CONE)
+nose_parameter no       Shape parameter of the nosecone (default: the shape's)
+nose_length    yes      Length of the nosecone [meters]
+tube_length    yes      Length of the tube [meters]; in JSON, may be a list
+                        of tube lengths
+root           yes      Root chord of the fins [meters]
+tip            yes      Tip chord of the fins [meters]
+span           yes      Span of the fins [meters]
+sweep          no       Sweep length of the fins [meters]
+sweepangle     no       Sweep angle of the fins if no sweep (default: 45) [degrees]
+N              no       Number of fins (default: 4)
+cg             no       Center of gravity [meters] (tip of nose = 0), for C_mq
+============== ======== =====================================================
+
+Results have one row per design and Mach number, with the fields ``id``,
+``Mach``, ``C_P`` and ``C_Na`` of the rocket (`original.Rocket`), and
+``body_C_Na`` of the body alone. Any of the other coefficients of
+`coefficients` can be asked for as well; they follow in extra fields.
+"""
+# -*- coding: utf-8 -*-
+from collections import deque
+import csv
+import io
+import json
+import math
+import multiprocessing
+import warnings
+import numpy
+from barrowman import Nose
+from barrowman import coefficients as extra_coefficients
+from barrowman.batch import RocketBatch
+
+CSV = 'csv'       #: Format name of CSV files
+JSONL = 'jsonl'   #: Format name of JSON lines files
+
+#: Fields of each result row
+RESULT_FIELDS = ('id', 'Mach', 'C_P', 'C_Na', 'body_C_Na')
+
+#: Coefficients that can be added to the results
+EXTRA_FIELDS = ('C_D', 'C_lp', 'C_ls', 'C_mq')
+
+_EXTENSIONS = {'.csv': CSV, '.jsonl': JSONL, '.ndjson': JSONL, '.json': JSONL}
+
+
+def guess_format(path):
+    """Find the format of a design or result file from its name.
+
+    :param str path: Name of the file
+    :returns: `CSV` or `JSONL`
+    """
+    for extension, format in _EXTENSIONS.items():
+        if str(path).lower().endswith(extension):
+            return format
+    raise ValueError("Can't tell the format of {0!r}, give it explicitly".format(path))
+
+
+def read_chunks(lines, format, chunksize=10000, start=0):
+    """Split an iterable of lines (e.g. an open file) into chunks of designs.
+    Nothing is parsed here, so workers can do it in parallel.
+
+    :param lines: Lines of a design file
+    :param str format: `CSV` or `JSONL`
+    :param int chunksize: (Optional, default=10000) Designs per chunk
+    :param int start: (Optional, default=0) Number of the first design, e.g.
+                      the number of designs in the files read before this one
+    :returns: a generator of (start, header, lines) chunks, where start is
+              the number of the first design in the chunk (and the default
+              id of the designs counts on from it)
+
+    """
+    lines = iter(lines)
+    header = next(lines, None) if format == CSV else None
+
+    chunk = []
+    for line in lines:
+        if not line.strip():
+            continue
+        chunk.append(line)
+        if len(chunk) == chunksize:
+            yield start, header, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, header, chunk
+
+
+def _parse(start, header, lines, format):
+    """Columns of a chunk of design lines"""
+    if format == CSV:
+        rows = csv.DictReader(io.StringIO(header + ''.join(lines)))
+    else:
+        rows = (json.loads(line) for line in lines)
+    return design_columns(rows, start)
+
+
+def design_columns(rows, start=0):
+    """Turn designs into columns, filling in the defaults.
+
+    :param rows: Designs, as dicts of the fields in the table above
+    :param int start: (Optional, default=0) Number of the first design, for
+                      the default ids
+    :returns: dict of columns by field name: lists of the ids and nose
+              shapes, and arrays of the rest (with the sweep worked out from
+              the sweep angle where it was not given)
+
+    """
+    columns = dict((name, []) for name in (
+        'id', 'width', 'nose_shape', 'nose_parameter', 'nose_length', 'tube_length',
+        'root', 'tip', 'span', 'sweep', 'sweepangle', 'N', 'cg'))
+    for i, row in enumerate(rows):
+        tube_length = row['tube_length']
+        if isinstance(tube_length, list):
+            tube_length = sum(float(length) for length in tube_length)
+
+        name = row.get('id')
+        columns['id'].append(str(start + i) if name in (None, '') else name)
+        columns['nose_shape'].append(row.get('nose_shape') or Nose.CONE)
+        columns['tube_length'].append(float(tube_length))
+        for name in ('width', 'nose_length', 'root', 'tip', 'span'):
+            columns[name].append(float(row[name]))
+        for name, default in (('sweep', 'nan'), ('sweepangle', 45.0), ('N', 4),
+                              ('nose_parameter', 'nan'), ('cg', 'nan')):
+            value = row.get(name)
+            columns[name].append(float(default if value in (None, '') else value))
+
+    for name in columns:
+        if name not in ('id', 'nose_shape'):
+            columns[name] = numpy.array(columns[name])
+
+    missing = numpy.isnan(columns['sweep'])
+    columns['sweep'][missing] = (columns['span'] * numpy.tan(numpy.radians(columns['sweepangle'])))[missing]
+    del columns['sweepangle']
+    return columns
+
+
+def evaluate_chunk(chunk, format, Mach, extra=(), Re=None):
+    """Parse and evaluate one chunk of designs from `read_chunks`.
+
+    :param chunk: A (start, header, lines) chunk
+    :param str format: `CSV` or `JSONL`
+    :param Mach: Mach numbers to evaluate each design at [dimensionless]
+    :param extra: (Optional, default=()) Names of other coefficients to add,
+                  from `EXTRA_FIELDS`
+    :param float Re: (Optional, default=None) Reynolds number on the body
+                     length, needed for C_D [dimensionless]
+    :returns: dict of result columns (see `RESULT_FIELDS`), one entry per
+              design and Mach number, designs first
+
+    """
+    unknown = set(extra) - set(EXTRA_FIELDS)
+    if unknown:
+        raise ValueError("Unknown coefficients: {0}".format(', '.join(sorted(unknown))))
+    if 'C_D' in extra and Re is None:
+        raise ValueError("C_D needs a Reynolds number")
+
+    columns = _parse(chunk[0], chunk[1], chunk[2], format)
+    ids = columns.pop('id')
+    shapes = numpy.array(columns.pop('nose_shape'))
+    cg = columns.pop('cg')
+    if 'C_mq' in extra and numpy.isnan(cg).any():
+        warnings.warn("{0} of {1} designs have no cg: their C_mq is NaN".format(
+            numpy.isnan(cg).sum(), len(cg)), RuntimeWarning)
+    Mach = numpy.atleast_1d(numpy.asarray(Mach, dtype=float))
+
+    size = (len(ids), len(Mach))
+    results = dict((name, numpy.empty(size)) for name in RESULT_FIELDS[2:] + tuple(extra))
+    for shape in set(shapes):
+        rows = shapes == shape
+        batch = RocketBatch(nose_shape=shape, **dict((name, column[rows])
+                                                     for name, column in columns.items()))
+        results['C_P'][rows] = batch.C_P(Mach[:, None]).T
+        results['C_Na'][rows] = batch.C_Na(Mach[:, None]).T
+        results['body_C_Na'][rows] = batch.body_C_Na(Mach[:, None]).T
+        if extra:
+            geometry = extra_coefficients.Geometry(batch, dims=1)
+            for name in extra:
+                if name == 'C_D':
+                    values = extra_coefficients.C_D(geometry, Mach, Re)
+                elif name == 'C_mq':
+                    values = extra_coefficients.C_mq(geometry, Mach, cg[rows])
+                else:
+                    values = getattr(extra_coefficients, name)(geometry, Mach)
+                results[name][rows] = values
+
+    columns = {
+        'id': [i for i in ids for m in Mach],
+        'Mach': numpy.tile(Mach, len(ids)),
+    }
+    for name, values in results.items():
+        columns[name] = values.ravel()
+    return columns
+
+
+def evaluate_chunks(chunks, format, Mach, processes=1, pending=2, extra=(), Re=None):
+    """Evaluate chunks of designs, in order.
+
+    :param chunks: Chunks from `read_chunks`
+    :param str format: `CSV` or `JSONL`
+    :param Mach: Mach numbers to evaluate each design at [dimensionless]
+    :param int processes: (Optional, default=1) Number of worker processes,
+                          None for one per CPU, 1 to evaluate in this process
+    :param int pending: (Optional, default=2) Chunks in flight per worker;
+                        bounds how far reading runs ahead of writing
+    :param extra: (Optional, default=()) Other coefficients, see `evaluate_chunk`
+    :param float Re: (Optional, default=None) Reynolds number, see `evaluate_chunk`
+    :returns: a generator of result dicts from `evaluate_chunk`
+
+    """
+    if processes == 1:
+        for chunk in chunks:
+            yield evaluate_chunk(chunk, format, Mach, extra, Re)
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        limit = pending * (processes or multiprocessing.cpu_count())
+        queue = deque()
+        for chunk in chunks:
+            queue.append(pool.apply_async(evaluate_chunk, (chunk, format, Mach, extra, Re)))
+            if len(queue) >= limit:
+                yield queue.popleft().get()
+        while queue:
+            yield queue.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def json_value(value):
+    """A float as JSON has it: None (null) for NaN and infinity, which
+    strict JSON has no numbers for.
+
+    :param float value: The value to write
+    :returns: value, or None if it isn't finite
+
+    """
+    return value if math.isfinite(value) else None
+
+
+def write_results(results, out, format):
+    """Write result chunks to a file as they arrive. JSON lines write a value
+    that isn't finite, such as C_mq without a cg, as null.
+
+    :param results: Result dicts, e.g. from `evaluate_chunks`
+    :param out: An open text file
+    :param str format: `CSV` or `JSONL`
+    :returns: the number of rows written
+
+    """
+    count = 0
+    fields = None
+    for result in results:
+        if fields is None:
+            fields = RESULT_FIELDS + tuple(name for name in result if name not in RESULT_FIELDS)
+            if format == CSV:
+                writer = csv.writer(out, lineterminator='\n')
+                writer.writerow(fields)
+        columns = [result[name] for name in fields[1:]]
+        for i, name in enumerate(result['id']):
+            values = [float(column[i]) for column in columns]
+            if format == CSV:
+                writer.writerow([name] + [repr(value) for value in values])
+            else:
+                row = dict(zip(fields, [name] + [json_value(value) for value in values]))
+                out.write(json.dumps(row, sort_keys=True, allow_nan=False) + '\n')
+        count += len(result['id'])
+    if fields is None and format == CSV:
+        csv.writer(out, lineterminator='\n').writerow(RESULT_FIELDS)
+    return count
+
+
+def evaluate_file(source, destination, Mach, chunksize=10000, processes=1,
+                  format=None, output_format=None, extra=(), Re=None):
+    """Evaluate every design in a file and write the results to another.
+
+    :param str source: Name of the design file
+    :param str destination: Name of the result file
+    :param Mach: Mach number or numbers to evaluate each design at [dimensionless]
+    :param int chunksize: (Optional, default=10000) Designs read and evaluated at a time
+    :param int processes: (Optional, default=1) Number of worker processes,
+                          None for one per CPU
+    :param str format: (Optional) Format of the design file, by default from
+                       its name
+    :param str output_format: (Optional) Format of the result file, by
+                              default from its name
+    :param extra: (Optional, default=()) Other coefficients, see `evaluate_chunk`
+    :param float Re: (Optional, default=None) Reynolds number, see `evaluate_chunk`
+    :returns: the number of result rows written
+
+    """
+    format = format or guess_format(source)
+    output_format = output_format or guess_format(destination)
+
+    with open(source) as lines, open(destination, 'w') as out:
+        chunks = read_chunks(lines, format, chunksize)
+        results = evaluate_chunks(chunks, format, Mach, processes, extra=extra, Re=Re)
+        return write_results(results, out, output_format)
@@ -0,0 +1,133 @@
+"""
+Mach Tables
+===========
+
+Answer Mach-dependent questions about a model (`original.Rocket`, `Body` or
+`Tail`) from a table instead of the equations. The coefficients are evaluated
+once over a uniform grid of Mach numbers, and each query finds its grid cell by
+arithmetic (no search) and interpolates linearly inside it.
+"""
+# -*- coding: utf-8 -*-
+from functools import partial
+import numpy
+from barrowman.original import TRANSONIC
+
+
+class MachTable(object):
+    """Tabulated coefficients of a model over a uniform grid of Mach numbers.
+
+    The table stands in for the model: ``table.C_P(Mach)`` interpolates what
+    ``model.C_P(Mach)`` would return, for a float or an array of Mach numbers.
+    Outside the grid the end cells are extrapolated.
+
+    With a tolerance, the grid spacing is halved until interpolating at the
+    middle of every cell (where linear interpolation is furthest from a smooth
+    curve) is within the tolerance of the model. The coefficients have kinks
+    where their slope jumps (`BREAKPOINTS`), which fall inside cells, so those
+    cells are also checked at the kink and either side of it.
+
+    :param model: The model to tabulate, e.g. an `original.Rocket`
+    :param float start: Lowest Mach number of the grid [dimensionless]
+    :param float stop: Highest Mach number of the grid [dimensionless]
+    :param float step: (Optional, default=0.01) Spacing of the grid [dimensionless]
+    :param float tolerance: (Optional, default=None) Largest accepted
+                            interpolation error of any coefficient
+    :param methods: (Optional, default=('C_P', 'C_Na')) Names of the model
+                    methods to tabulate; ones the model lacks are skipped
+    :param int max_points: (Optional, default=1000000) Largest grid to try
+                           when refining for the tolerance
+
+    """
+
+    #: Mach numbers where the slope of the coefficients jumps: the ends of the
+    #: transonic fairing of the fin normal force (see `original.TRANSONIC`)
+    BREAKPOINTS = TRANSONIC
+
+    def __init__(self, model, start, stop, step=0.01, tolerance=None,
+                 methods=('C_P', 'C_Na'), max_points=1000000):
+        if not stop > start:
+            raise ValueError("The grid must end after it starts: {0} to {1}".format(start, stop))
+        self.model = model
+        self.methods = tuple(m for m in methods if hasattr(model, m))
+        if not self.methods:
+            raise ValueError("The model has none of the methods {0}".format(', '.join(methods)))
+        self.tolerance = tolerance
+        self.start = float(start)
+
+        points = int(numpy.ceil((stop - start) / step)) + 1
+        while True:
+            self._build(stop, points)
+            if tolerance is None or max(self.error().values()) <= tolerance:
+                break
+            points = 2 * points - 1
+            if points > max_points:
+                raise ValueError("Could not reach a tolerance of {0} within {1} points".format(
+                    tolerance, max_points))
+
+    def _build(self, stop, points):
+        self.Mach = numpy.linspace(self.start, stop, points)  #: The grid of Mach numbers
+        self.step = self.Mach[1] - self.Mach[0]
+        self._last = points - 2
+        self.values = {}   #: Tabulated values, by method name
+        self._slopes = {}
+        for name in self.methods:
+            values = numpy.asarray(getattr(self.model, name)(self.Mach), dtype=float)
+            self.values[name] = values
+            self._slopes[name] = numpy.diff(values)
+
+    def __getattr__(self, name):
+        if name in self.__dict__.get('values', ()):
+            return partial(self.interpolate, name)
+        raise AttributeError(name)
+
+    def interpolate(self, name, Mach):
+        """Interpolate one tabulated coefficient.
+
+        :param str name: Name of the coefficient, e.g. 'C_P'
+        :param Mach: Mach number, a float or an array [dimensionless]
+        :returns: the interpolated coefficient, one per Mach number, NaN for
+                  a Mach number that is NaN or infinite
+
+        """
+        values = self.values[name]
+        slopes = self._slopes[name]
+
+        if numpy.ndim(Mach) == 0:
+            x = (Mach - self.start) / self.step
+            if not numpy.isfinite(x):
+                return numpy.nan
+            i = int(min(max(x, 0), self._last))
+            return float(values[i] + (x - i) * slopes[i])
+
+        x = (numpy.asarray(Mach, dtype=float) - self.start) / self.step
+        finite = numpy.isfinite(x)
+        x = numpy.where(finite, x, 0.0)
+        # clip before the cast, so a huge Mach never overflows it
+        i = numpy.clip(x, 0, self._last).astype(int)
+        return numpy.where(finite, values[i] + (x - i) * slopes[i], numpy.nan)
+
+    def error(self, Mach=None):
+        """Compare the table against the model.
+
+        :param Mach: (Optional, default=None) Mach numbers to check at. By
+                     default, the middle of every grid cell, and each of
+                     the `BREAKPOINTS` inside the grid with the middles of
+                     the cell either side of it.
+        :returns: dict of the largest absolute error, by coefficient name
+
+        """
+        if Mach is None:
+            Mach = [self.Mach[:-1] + self.step / 2.0]
+            for kink in self.BREAKPOINTS:
+                if self.Mach[0] < kink < self.Mach[-1]:
+                    i = min(int((kink - self.start) / self.step), self._last)
+                    low, high = self.Mach[i], self.Mach[i + 1]
+                    Mach.append([kink, (low + kink) / 2.0, (kink + high) / 2.0])
+            Mach = numpy.concatenate(Mach)
+        Mach = numpy.asarray(Mach, dtype=float)
+
+        errors = {}
+        for name in self.methods:
+            exact = getattr(self.model, name)(Mach)
+            errors[name] = float(numpy.max(numpy.abs(self.interpolate(name, Mach) - exact)))
+        return errors
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for `barrowman`, run with airspeed velocity (asv)::
+
+    $ asv run
+
+Each ``time_*`` method is timed, with ``setup`` run first (not timed). Results
+are kept per commit in ``.asv/results`` so slowdowns show up across versions.
+"""
+
+import numpy
+import barrowman
+from barrowman import original
+from barrowman import parallel
+from barrowman.batch import RocketBatch
+
+
+def standard_rocket(tubes=1):
+    nose = barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3)
+    body = original.Body([nose] + [barrowman.Tube(0.1, 1.0 / tubes) for i in range(tubes)])
+    tail = original.Tail(barrowman.Fin(0.2, 0.05, 0.1, sweepangle=45.0), 4)
+    return original.Rocket(body, tail)
+
+
+class Construction(object):
+    """Building (and summing) a body from a long list of components"""
+
+    params = [10, 1000, 100000]
+    param_names = ['components']
+
+    def setup(self, n):
+        self.components = [barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3)]
+        self.components += [barrowman.Tube(0.1, 1.0) for i in range(n - 1)]
+
+    def time_components(self, n):
+        [barrowman.Tube(0.1, 1.0) for i in range(n)]
+
+    def time_body(self, n):
+        original.Body(self.components).C_P(0.3)
+
+
+class SinglePoint(object):
+    """One Mach number at a time, as called from a trajectory integrator"""
+
+    def setup(self):
+        self.rocket = standard_rocket()
+        self.compiled = self.rocket.compile()
+
+    def time_rocket_C_P(self):
+        self.rocket.C_P(0.3)
+
+    def time_compiled_C_P(self):
+        self.compiled.C_P(0.3)
+
+
+class MachSweep(object):
+    """One rocket over an array of Mach numbers, e.g. building an aero table"""
+
+    params = [100, 10000, 1000000]
+    param_names = ['points']
+
+    def setup(self, n):
+        self.rocket = standard_rocket()
+        self.compiled = self.rocket.compile()
+        self.mach = numpy.linspace(0.0, 2.0, n)
+        self.out = numpy.empty(n)
+
+    def time_rocket_C_P(self, n):
+        self.rocket.C_P(self.mach)
+
+    def time_compiled_C_P_into(self, n):
+        self.compiled.C_P_into(self.mach, self.out)
+
+
+class Batch(object):
+    """Many designs evaluated column-wise"""
+
+    params = [1000, 1000000]
+    param_names = ['designs']
+
+    def setup(self, n):
+        random = numpy.random.RandomState(0)
+        self.columns = dict(
+            width=random.uniform(0.05, 0.2, n),
+            nose_length=random.uniform(0.2, 0.6, n),
+            tube_length=random.uniform(0.5, 2.0, n),
+            root=random.uniform(0.1, 0.3, n),
+            tip=random.uniform(0.02, 0.1, n),
+            span=random.uniform(0.05, 0.2, n),
+            sweep=random.uniform(0.0, 0.2, n),
+        )
+        self.batch = RocketBatch(**self.columns)
+
+    def time_build(self, n):
+        RocketBatch(**self.columns)
+
+    def time_C_P(self, n):
+        self.batch.C_P(0.3)
+
+    def peakmem_C_P(self, n):
+        self.batch.C_P(0.3)
+
+
+class SharedMemory(object):
+    """A large batch split between workers sharing its memory"""
+
+    params = [1, 2, 4]
+    param_names = ['processes']
+    timeout = 120
+
+    def setup(self, processes):
+        n = 4000000
+        random = numpy.random.RandomState(0)
+        batch = RocketBatch(random.uniform(0.05, 0.2, n), random.uniform(0.2, 0.6, n),
+                            random.uniform(0.5, 2.0, n), random.uniform(0.1, 0.3, n),
+                            random.uniform(0.02, 0.1, n), random.uniform(0.05, 0.2, n),
+                            sweep=random.uniform(0.0, 0.2, n))
+        self.executor = parallel.SharedExecutor(batch, processes, chunksize=65536)
+
+    def teardown(self, processes):
+        self.executor.close()
+
+    def time_evaluate(self, processes):
+        self.executor.evaluate(0.3)
@@ -15,7 +15,7 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
 requirements = [
-    # TODO: put package requirements here
+    'numpy',
 ]
 
 test_requirements = [
@@ -37,6 +37,11 @@ setup(
                  'barrowman'},
     include_package_data=True,
     install_requires=requirements,
+    entry_points={
+        'console_scripts': [
+            'barrowman=barrowman.cli:main',
+        ],
+    },
     license="GPL",
     zip_safe=False,
     keywords='barrowman',
@@ -6,7 +6,9 @@ Tests for `barrowman.__init__` module.
 """
 
 import unittest
+import numpy
 import barrowman
+from barrowman import Nose
 from math import degrees
 
 
@@ -39,6 +41,61 @@ class TestBase(unittest.TestCase):
         self.assertAlmostEqual(fin.sweep, 0.1, 8)
         self.assertAlmostEqual(degrees(fin.sweepangle), 45.0, 8)
 
+    def test_cache_invalidation(self):
+        """Derived geometry is cached, and recomputed after a change"""
+        tube = barrowman.Tube(0.1, 1.0)
+        calls = []
+        compute = tube._volume
+        tube._volume = lambda: calls.append(1) or compute()
+
+        volume = tube.volume
+        self.assertEqual(tube.volume, volume)
+        self.assertEqual(len(calls), 1)
+
+        tube._length = 2.0
+        self.assertAlmostEqual(tube.volume, 2 * volume, 12)
+        self.assertEqual(len(calls), 2)
+
+        tube._width = 0.2
+        self.assertAlmostEqual(tube.area, 4 * barrowman.Tube(0.1, 1.0).area, 12)
+
+    def test_nose_volume(self):
+        """Closed form volumes against integrating the nose profile"""
+        R, L = 0.05, 0.3
+        x = numpy.linspace(0, L, 100001)
+        t = numpy.arccos(1 - 2 * x / L)
+        rho = (R**2 + L**2) / (2 * R)
+        alpha = numpy.arctan(R / L) - numpy.arccos(numpy.sqrt(L**2 + R**2) / (2 * 0.4))
+        profiles = [
+            (Nose.CONE, None, R * x / L),
+            (Nose.OGIVE, None, numpy.sqrt(rho**2 - (L - x)**2) + R - rho),
+            (Nose.SECANT_OGIVE, 0.4,
+             numpy.sqrt(0.4**2 - (0.4 * numpy.cos(alpha) - x)**2) + 0.4 * numpy.sin(alpha)),
+            (Nose.ELLIPSOID, None, R * numpy.sqrt(1 - (1 - x / L)**2)),
+            (Nose.PARABOLIC, 0.5, R * (2 * x / L - 0.5 * (x / L)**2) / 1.5),
+            (Nose.POWER, 0.75, R * (x / L)**0.75),
+            (Nose.HAACK, 1 / 3.0, R / numpy.sqrt(numpy.pi) * numpy.sqrt(
+                numpy.maximum(t - numpy.sin(2 * t) / 2 + numpy.sin(t)**3 / 3.0, 0))),
+        ]
+        for shape, parameter, y in profiles:
+            nose = Nose(shape, 2 * R, L, parameter)
+            y2 = numpy.pi * y**2
+            volume = numpy.sum((y2[1:] + y2[:-1]) / 2 * numpy.diff(x))
+            self.assertAlmostEqual(nose.volume / volume, 1.0, 7)
+
+        # defaults: tangent ogive radius, Von Karman
+        self.assertAlmostEqual(Nose(Nose.SECANT_OGIVE, 0.1, 0.3).volume, Nose(Nose.OGIVE, 0.1, 0.3).volume, 12)
+        self.assertAlmostEqual(Nose(Nose.HAACK, 0.1, 0.3).volume, numpy.pi * R**2 * L / 2, 12)
+
+        # many noses at once
+        lengths = numpy.linspace(0.1, 1.0, 10)
+        volumes = barrowman.nose_volume(Nose.OGIVE, 0.1, lengths)
+        for length, volume in zip(lengths, volumes):
+            self.assertAlmostEqual(Nose(Nose.OGIVE, 0.1, length).volume, volume, 12)
+
+        with self.assertRaises(ValueError):
+            Nose('spike', 0.1, 0.3)
+
 
 if __name__ == '__main__':
     import sys
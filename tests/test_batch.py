@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+test_batch
+----------------------------------
+
+Tests for `barrowman.batch` module.
+"""
+
+import unittest
+import numpy
+import barrowman
+from barrowman import original
+from barrowman.batch import RocketBatch
+
+
+class TestBatch(unittest.TestCase):
+
+    width = numpy.array([0.1, 0.08, 0.15])
+    nose_length = numpy.array([0.3, 0.25, 0.6])
+    tube_length = numpy.array([1.0, 0.7, 2.2])
+    root = numpy.array([0.2, 0.15, 0.3])
+    tip = numpy.array([0.05, 0.07, 0.1])
+    span = numpy.array([0.1, 0.08, 0.2])
+    sweep = numpy.array([0.1, 0.05, 0.22])
+    N = numpy.array([4, 3, 6])
+
+    def rockets(self):
+        """The same designs built one object at a time"""
+        for i in range(len(self.width)):
+            body = original.Body([
+                barrowman.Nose(barrowman.Nose.CONE, self.width[i], self.nose_length[i]),
+                barrowman.Tube(self.width[i], self.tube_length[i]),
+            ])
+            fin = barrowman.Fin(self.root[i], self.tip[i], self.span[i], sweep=self.sweep[i])
+            yield original.Rocket(body, original.Tail(fin, self.N[i], self.width[i]))
+
+    def test_matches_original(self):
+        batch = RocketBatch(self.width, self.nose_length, self.tube_length,
+                            self.root, self.tip, self.span, sweep=self.sweep, N=self.N)
+        self.assertEqual(len(batch), 3)
+
+        for i, rocket in enumerate(self.rockets()):
+            self.assertAlmostEqual(batch.body_C_P(0.3)[i], rocket.body.C_P(0.3), places=10)
+            self.assertAlmostEqual(batch.body_C_Na(0.3)[i], rocket.body.C_Na(0.3), places=10)
+            self.assertAlmostEqual(batch.tail_C_P(0.3)[i], rocket.tail.C_P(0.3), places=10)
+            for mach in (0.3, 1.2, 2.0):
+                self.assertAlmostEqual(batch.tail_C_Na(mach)[i], rocket.tail.C_Na(mach, rocket.body.A_r), places=10)
+                self.assertAlmostEqual(batch.C_Na(mach)[i], rocket.C_Na(mach), places=10)
+                self.assertAlmostEqual(batch.C_P(mach)[i], rocket.C_P(mach), places=10)
+
+    def test_shared_and_split_columns(self):
+        """Scalars are shared by every design, and a 2-D tube_length is a
+        stack of tubes per design.
+        """
+        batch = RocketBatch(0.1, 0.3, [[0.4, 0.6], [0.5, 0.5]], 0.2, 0.05, 0.1)
+        numpy.testing.assert_allclose(batch.l_0, [1.3, 1.3])
+        numpy.testing.assert_allclose(batch.C_P(0.3), [1.0407, 1.0407], atol=1e-4)
+
+    def test_mach_table(self):
+        batch = RocketBatch(self.width, self.nose_length, self.tube_length,
+                            self.root, self.tip, self.span, sweep=self.sweep)
+        mach = numpy.linspace(0.1, 0.8, 5)[:, None]
+        self.assertEqual(batch.C_P(mach).shape, (5, 3))
+
+    def test_nose_shapes(self):
+        for shape in barrowman.Nose.SHAPES:
+            batch = RocketBatch(self.width, self.nose_length, self.tube_length,
+                                self.root, self.tip, self.span, sweep=self.sweep, nose_shape=shape)
+            for i in range(len(batch)):
+                body = original.Body([
+                    barrowman.Nose(shape, self.width[i], self.nose_length[i]),
+                    barrowman.Tube(self.width[i], self.tube_length[i]),
+                ])
+                self.assertAlmostEqual(batch.V_B[i], body.V_B, places=12)
+                self.assertAlmostEqual(batch.body_C_P(0.3)[i], body.C_P(0.3), places=10)
+
+        batch = RocketBatch(0.1, 0.3, 1.0, 0.2, 0.05, 0.1, nose_shape=barrowman.Nose.POWER,
+                            nose_parameter=[0.25, 1.0])
+        self.assertEqual(len(batch), 2)
+        self.assertAlmostEqual(batch.body_C_P(0.3)[1], 0.2, places=10)
+
+        with self.assertRaises(ValueError):
+            RocketBatch(0.1, 0.3, 1.0, 0.2, 0.05, 0.1, nose_shape='spike')
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
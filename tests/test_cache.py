@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+test_cache
+----------------------------------
+
+Tests for `barrowman.cache` module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+import barrowman
+from barrowman import original
+from barrowman.batch import RocketBatch
+from barrowman.cache import GeometryCache, ResultCache, geometry_key, model_key, batch_keys
+
+
+def nose():
+    return barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3)
+
+
+def fin(span=0.1):
+    return barrowman.Fin(0.2, 0.05, span, sweepangle=45.0)
+
+
+class TestCache(unittest.TestCase):
+
+    def test_key(self):
+        self.assertEqual(geometry_key(nose(), barrowman.Tube(0.1, 1.0)),
+                         geometry_key(nose(), barrowman.Tube(0.1, 1.0)))
+        self.assertNotEqual(geometry_key(nose()), geometry_key(barrowman.Nose('ogive', 0.1, 0.3)))
+        self.assertNotEqual(geometry_key(barrowman.Tube(0.1, 1.0), barrowman.Tube(0.1, 0.5)),
+                            geometry_key(barrowman.Tube(0.1, 0.5), barrowman.Tube(0.1, 1.0)))
+        self.assertNotEqual(geometry_key(fin()), geometry_key(fin(0.1 + 1e-15)))
+        self.assertNotEqual(geometry_key(fin(), 3), geometry_key(fin(), 4))
+
+    def test_reuse(self):
+        cache = GeometryCache()
+        spans = [0.08, 0.1, 0.12]
+        rockets = [cache.rocket([nose(), barrowman.Tube(0.1, 1.0)], fin(s), 4) for s in spans]
+        self.assertTrue(rockets[0].body is rockets[1].body is rockets[2].body)
+        self.assertEqual(cache.info(), (2, 4, 0, 1024, 4))
+
+        again = cache.rocket([nose(), barrowman.Tube(0.1, 1.0)], fin(0.1), 4)
+        self.assertTrue(again.tail is rockets[1].tail)
+        self.assertEqual(cache.hits, 4)
+
+        body = original.Body([nose(), barrowman.Tube(0.1, 1.0)])
+        direct = original.Rocket(body, original.Tail(fin(0.1), 4, 0.1))
+        self.assertEqual(again.C_P(0.3), direct.C_P(0.3))
+
+        # later changes to the caller's parts don't reach the cache
+        parts = [nose(), barrowman.Tube(0.1, 1.0)]
+        body = cache.body(parts)
+        parts[1]._length = 2.0
+        self.assertEqual(body.l_0, 1.3)
+
+    def test_eviction(self):
+        cache = GeometryCache(maxsize=2)
+        a = cache.tail(fin(0.1), 4)
+        cache.tail(fin(0.2), 4)
+        cache.tail(fin(0.1), 4)   # a is now the most recently used
+        cache.tail(fin(0.3), 4)   # so 0.2 goes
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(cache.tail(fin(0.1), 4) is a)
+        self.assertEqual(cache.info().evictions, 1)
+        cache.tail(fin(0.2), 4)
+        self.assertEqual(cache.info(), (2, 4, 2, 2, 2))
+
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 0, 2, 0))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'results.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rocket(self, span=0.1):
+        return original.Rocket(original.Body([nose(), barrowman.Tube(0.1, 1.0)]),
+                               original.Tail(fin(span), 4, 0.1))
+
+    def test_keys(self):
+        self.assertEqual(model_key(self.rocket()), model_key(self.rocket()))
+        self.assertNotEqual(model_key(self.rocket()), model_key(self.rocket(0.2)))
+        self.assertNotEqual(model_key(self.rocket().body), model_key(self.rocket()))
+        self.assertEqual(model_key(self.rocket().tail), model_key(original.Tail(fin(), 4, 0.1)))
+
+        batch = RocketBatch(0.1, 0.3, [1.0, 1.0, 2.0], 0.2, 0.05, 0.1, sweep=[0.0, -0.0, 0.0])
+        keys = batch_keys(batch)
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+        other = RocketBatch(0.1, 0.3, 1.0, 0.2, 0.05, 0.1, sweep=0.0, nose_shape='ogive')
+        self.assertNotEqual(keys[0], batch_keys(other)[0])
+
+    def test_models(self):
+        with ResultCache(self.path) as cache:
+            rocket = self.rocket()
+            self.assertEqual(cache.evaluate(rocket, 0.3), (rocket.C_P(0.3), rocket.C_Na(0.3)))
+            cache.evaluate(rocket.body, 0.3)
+            cache.evaluate(rocket.tail, 0.3)
+            cache.evaluate(rocket, 0.5)
+            self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+        # a later run finds them, for an identical (not the same) rocket
+        with ResultCache(self.path) as cache:
+            self.assertEqual(len(cache), 4)
+            self.assertEqual(cache.evaluate(self.rocket(), 0.3), (rocket.C_P(0.3), rocket.C_Na(0.3)))
+            self.assertEqual(cache.hits, 1)
+
+        # but not a new version
+        with ResultCache(self.path, version='new') as cache:
+            self.assertEqual(len(cache), 0)
+            cache.evaluate(rocket, 0.3)
+            self.assertEqual(cache.misses, 1)
+            cache.purge()
+            self.assertEqual(len(cache), 1)
+        with ResultCache(self.path) as cache:
+            self.assertEqual(len(cache), 0)
+
+    def test_equations_version(self):
+        """A change to the equations misses everything cached before it"""
+        rocket = self.rocket()
+        with ResultCache(self.path) as cache:
+            cache.evaluate(rocket, 0.3)
+        saved = original.EQUATIONS_VERSION
+        original.EQUATIONS_VERSION = saved + 1
+        try:
+            with ResultCache(self.path) as cache:
+                self.assertEqual(len(cache), 0)
+                cache.evaluate(rocket, 0.3)
+                self.assertEqual((cache.hits, cache.misses), (0, 1))
+        finally:
+            original.EQUATIONS_VERSION = saved
+        with ResultCache(self.path) as cache:
+            cache.evaluate(rocket, 0.3)
+            self.assertEqual(cache.hits, 1)
+
+    def test_batch(self):
+        random = numpy.random.RandomState(0)
+        batch = RocketBatch(0.1, 0.3, random.uniform(0.5, 2.0, 1000), 0.2, 0.05,
+                            random.uniform(0.05, 0.2, 1000))
+        with ResultCache(self.path) as cache:
+            C_P, C_Na = cache.evaluate_batch(batch.take(slice(0, 600)), 0.3)
+            self.assertEqual((cache.hits, cache.misses), (0, 600))
+
+            C_P, C_Na = cache.evaluate_batch(batch, 0.3)
+            self.assertEqual((cache.hits, cache.misses), (600, 1000))
+            numpy.testing.assert_array_equal(C_P, batch.C_P(0.3))
+            numpy.testing.assert_array_equal(C_Na, batch.C_Na(0.3))
+
+            C_P, C_Na, found = cache.lookup(batch_keys(batch) + ['missing'], 0.3)
+            self.assertEqual(found.sum(), 1000)
+            self.assertTrue(numpy.isnan(C_P[-1]))
+            self.assertFalse(cache.lookup(batch_keys(batch), 0.4)[2].any())
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
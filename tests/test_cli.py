@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+test_cli
+----------------------------------
+
+Tests for `barrowman.cli` module.
+"""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from barrowman import cli
+from tests.test_stream import DESIGNS, rocket
+
+
+@contextlib.contextmanager
+def standard(stdin=''):
+    """Swap standard input, output and error for strings"""
+    saved = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(stdin), io.StringIO(), io.StringIO()
+    try:
+        yield sys.stdout, sys.stderr
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved
+
+
+def strict(constant):
+    """Refuse the NaN and Infinity that strict JSON doesn't have"""
+    raise ValueError("Not JSON: {0}".format(constant))
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.designs = os.path.join(self.directory, 'designs.jsonl')
+        with open(self.designs, 'w') as f:
+            for design in DESIGNS:
+                f.write(json.dumps(design) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_file_to_file(self):
+        output = os.path.join(self.directory, 'results.csv')
+        with standard() as (out, err):
+            status = cli.main([self.designs, '-o', output, '--mach', '0.3', '2.0',
+                               '--jobs', '2', '--chunksize', '1', '--profile'])
+        self.assertEqual(status, 0)
+        self.assertIn('evaluate', err.getvalue())
+        self.assertIn('rows/s', err.getvalue())
+
+        with open(output) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 2 * len(DESIGNS))
+        for i, design in enumerate(DESIGNS):
+            self.assertAlmostEqual(float(rows[2 * i + 1]['C_P']), rocket(design).C_P(2.0), places=12)
+
+    def test_stdin_to_stdout(self):
+        with open(self.designs) as f:
+            designs = f.read()
+        with standard(designs) as (out, err), self.assertWarns(RuntimeWarning):
+            cli.main(['--format', 'jsonl', '-c', 'C_D', 'C_lp', 'C_ls', 'C_mq',
+                      '--reynolds', '2e6'])
+        rows = [json.loads(line, parse_constant=strict) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), len(DESIGNS))
+        self.assertEqual(sorted(rows[0]), ['C_D', 'C_Na', 'C_P', 'C_lp', 'C_ls', 'C_mq', 'Mach',
+                                           'body_C_Na', 'id'])
+        self.assertAlmostEqual(rows[0]['C_Na'], rocket(DESIGNS[0]).C_Na(0.3), places=12)
+        self.assertTrue(rows[0]['C_D'] > 0 and rows[0]['C_lp'] < 0)
+        self.assertIsNone(rows[0]['C_mq'])   # no cg given, written as null
+
+    def test_files(self):
+        """Default ids count on across design files"""
+        with standard() as (out, err):
+            cli.main([self.designs, self.designs, '--output-format', 'jsonl', '--chunksize', '3'])
+        ids = [json.loads(line)['id'] for line in out.getvalue().splitlines()]
+        self.assertEqual(len(ids), 2 * len(DESIGNS))
+        self.assertEqual(ids, ['standard', '1', '2', '3', 'standard', '5', '6', '7'])
+
+    def test_errors(self):
+        for argv in (['-c', 'C_D', self.designs],           # no --reynolds
+                     [],                                     # stdin without --format
+                     [os.path.join(self.directory, 'designs.txt')],
+                     ['-c', 'C_X', self.designs]):
+            with standard() as (out, err), self.assertRaises(SystemExit):
+                cli.main(argv)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
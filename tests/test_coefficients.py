@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+test_coefficients
+----------------------------------
+
+Tests for `barrowman.coefficients` module.
+"""
+
+import unittest
+import numpy
+from barrowman import Nose
+from barrowman.batch import RocketBatch
+from barrowman.coefficients import (Geometry, coefficient_table, nose_wetted_area,
+                                    skin_friction, C_lp, C_ls, C_mq, RE_CRITICAL)
+
+
+class TestCoefficients(unittest.TestCase):
+
+    batch = RocketBatch(width=[0.1, 0.08], nose_length=0.3, tube_length=[1.0, 1.5],
+                        root=0.2, tip=[0.05, 0.1], span=0.1, sweepangle=45.0, N=[4, 3])
+
+    def test_nose_wetted_area(self):
+        R, L = 0.05, 0.3
+        self.assertAlmostEqual(nose_wetted_area(Nose.CONE, 2 * R, L),
+                               numpy.pi * R * numpy.hypot(R, L), places=12)
+        e = numpy.sqrt(1 - R**2 / L**2)
+        half_spheroid = numpy.pi * R**2 * (1 + L / (R * e) * numpy.arcsin(e))
+        self.assertAlmostEqual(nose_wetted_area(Nose.ELLIPSOID, 2 * R, L) / half_spheroid, 1, places=3)
+
+        for shape in Nose.SHAPES:
+            fine = nose_wetted_area(shape, [0.1, 0.2], [0.3, 0.5], segments=4096)
+            numpy.testing.assert_allclose(nose_wetted_area(shape, [0.1, 0.2], [0.3, 0.5]), fine,
+                                          rtol=1e-3)
+            # never less than the cone between the same tip and base
+            self.assertTrue(numpy.all(fine >= nose_wetted_area(Nose.CONE, [0.1, 0.2], [0.3, 0.5])))
+
+    def test_skin_friction(self):
+        laminar = skin_friction(RE_CRITICAL * (1 - 1e-9), 0.0)
+        turbulent = skin_friction(RE_CRITICAL, 0.0)
+        self.assertAlmostEqual(laminar / turbulent, 1, places=2)
+        for Mach in (0.8, 2.0):
+            laminar = skin_friction(RE_CRITICAL * (1 - 1e-9), Mach)
+            self.assertAlmostEqual(laminar / skin_friction(RE_CRITICAL, Mach), 1, places=2)
+        # friction rises through the transition, then falls as the boundary
+        # layer becomes fully turbulent
+        Re = numpy.logspace(5, 8, 20)
+        self.assertTrue(skin_friction(2e6, 0.0) > turbulent)
+        self.assertTrue(numpy.all(numpy.diff(skin_friction(Re[Re > 3e6], 0.5)) < 0))
+        self.assertTrue(skin_friction(1e7, 2.0) < skin_friction(1e7, 0.5))
+
+    def test_table(self):
+        Mach = [0.3, 1.2, 2.5]
+        Re = [1e5, 1e6, 1e7]
+        table = coefficient_table(self.batch, Mach, Re, cg=[0.85, 1.1])
+        self.assertEqual(sorted(table), ['C_D', 'C_Na', 'C_P', 'C_lp', 'C_ls', 'C_mq'])
+        for values in table.values():
+            self.assertEqual(values.shape, (2, 3, 3))
+
+        for j, m in enumerate(Mach):
+            numpy.testing.assert_allclose(table['C_P'][:, j, 1], self.batch.C_P(m), rtol=1e-12)
+            numpy.testing.assert_allclose(table['C_Na'][:, j, 2], self.batch.C_Na(m), rtol=1e-12)
+
+        self.assertTrue(numpy.all(table['C_D'] > 0))
+        self.assertTrue(numpy.all(numpy.diff(table['C_D'][:, :, 1:], axis=2) < 0))
+        self.assertTrue(numpy.all(table['C_lp'] < 0))
+        self.assertTrue(numpy.all(table['C_ls'] > 0))
+        self.assertTrue(numpy.all(table['C_mq'] < 0))
+        self.assertNotIn('C_mq', coefficient_table(self.batch, Mach, Re))
+
+    def test_damping(self):
+        """Against strip theory summed numerically over the fin"""
+        g = Geometry(self.batch)
+        r, s = self.batch.width / 2.0, self.batch.span
+        y = r[:, None] + s[:, None] * (numpy.arange(10000) + 0.5) / 10000
+        chord = self.batch.root[:, None] + (self.batch.tip - self.batch.root)[:, None] * \
+            (y - r[:, None]) / s[:, None]
+        dy = s / 10000
+        fin = g.fin_C_Na(0.3)
+        d = self.batch.width
+
+        moment = (chord * y**2).sum(axis=1) * dy
+        numpy.testing.assert_allclose(
+            C_lp(g, 0.3), -2 * self.batch.N * fin * moment / (g.A_fin * d**2), rtol=1e-6)
+
+        arm = (chord * y).sum(axis=1) * dy / g.A_fin
+        numpy.testing.assert_allclose(C_ls(g, 0.3), self.batch.N * arm * fin / d, rtol=1e-6)
+
+        X_T = self.batch.l_0 - self.batch.root + self.batch.tail_C_P(0.3)
+        expected = -2 * (2 * (self.batch.body_C_P(0.3) - 0.85)**2
+                         + self.batch.tail_C_Na(0.3) * (X_T - 0.85)**2) / d**2
+        numpy.testing.assert_allclose(C_mq(g, 0.3, 0.85), expected, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
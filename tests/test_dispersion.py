@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+test_dispersion
+----------------------------------
+
+Tests for `barrowman.dispersion` module.
+"""
+
+import unittest
+from unittest import mock
+import numpy
+import barrowman
+from barrowman import dispersion as module, original
+from barrowman.dispersion import dispersion, nominal, Normal, Uniform, Statistics
+from tests.test_search import CountingPool
+
+
+class TestDispersion(unittest.TestCase):
+
+    body = original.Body([barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3),
+                          barrowman.Tube(0.1, 1.0)])
+    tail = original.Tail(barrowman.Fin(0.2, 0.05, 0.1, sweepangle=45.0), 4, 0.1)
+    rocket = original.Rocket(body, tail)
+
+    def test_statistics(self):
+        """Merged chunk statistics match the statistics of all the values"""
+        rng = numpy.random.default_rng(0)
+        values = rng.normal(3.0, 2.0, 100000)
+        stats = Statistics.of(values[:1000], rng, reservoir=5000)
+        for start in range(1000, len(values), 7000):
+            stats.merge(Statistics.of(values[start:start + 7000], rng, 5000), rng)
+
+        self.assertEqual(stats.count, len(values))
+        self.assertAlmostEqual(stats.mean, values.mean(), places=10)
+        self.assertAlmostEqual(stats.variance, values.var(ddof=1), places=8)
+        self.assertEqual(stats.minimum, values.min())
+        self.assertEqual(stats.maximum, values.max())
+        self.assertEqual(len(stats._sample), 5000)
+        numpy.testing.assert_allclose(stats.quantile([0.1, 0.5, 0.9]),
+                                      numpy.quantile(values, [0.1, 0.5, 0.9]), atol=0.15)
+
+    def test_nominal(self):
+        """With nothing dispersed every sample is the nominal rocket"""
+        values = nominal(self.rocket)
+        self.assertEqual(values['tube_length'], 1.0)
+        results = dispersion(self.rocket, {}, 1000, cg=0.85, seed=1, chunksize=300)
+        self.assertEqual(sorted(results), ['C_Na', 'C_P', 'margin'])
+        self.assertEqual(results['C_P'].count, 1000)
+        self.assertAlmostEqual(results['C_P'].mean, self.rocket.C_P(0.3), places=10)
+        self.assertAlmostEqual(results['C_Na'].mean, self.rocket.C_Na(0.3), places=10)
+        self.assertAlmostEqual(results['margin'].mean, (self.rocket.C_P(0.3) - 0.85) / 0.1,
+                               places=8)
+        self.assertTrue(results['C_P'].variance < 1e-20)
+
+        for Mach in (0.8, 1.2, 2.5):
+            results = dispersion(self.rocket, {}, 10, Mach=Mach, seed=1)
+            self.assertAlmostEqual(results['C_P'].mean, self.rocket.C_P(Mach), places=10)
+
+    def test_not_modeled(self):
+        """Rockets a batch can't reproduce are refused"""
+        nose = barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3)
+        fin = barrowman.Fin(0.2, 0.05, 0.1)
+        for body, tail in (
+                (original.Body([nose, barrowman.Tube(0.12, 1.0)]), original.Tail(fin, 4, 0.1)),
+                (self.body, original.Tail(fin, 4)),
+                (self.body, original.Tail(fin, 4, 0.12))):
+            with self.assertRaises(ValueError):
+                nominal(original.Rocket(body, tail))
+        with self.assertRaises(ValueError):
+            dispersion(self.rocket, {}, 0)
+
+    def test_dispersed(self):
+        distributions = {'span': Normal(0.002), 'root': Uniform(0.001), 'cg': Normal(0.01)}
+        results = dispersion(self.rocket, distributions, 20000, cg=0.85, seed=2, chunksize=3000)
+        self.assertAlmostEqual(results['C_P'].mean, self.rocket.C_P(0.3), places=3)
+        self.assertTrue(results['C_P'].std > 0)
+        self.assertTrue(results['margin'].std > results['C_P'].std / 0.1)
+
+        # reproducible, also across processes
+        again = dispersion(self.rocket, distributions, 20000, cg=0.85, seed=2, chunksize=3000,
+                           processes=2)
+        self.assertEqual(again['C_P'].mean, results['C_P'].mean)
+        numpy.testing.assert_array_equal(again['margin'].quantile([0.05, 0.95]),
+                                         results['margin'].quantile([0.05, 0.95]))
+
+        with self.assertRaises(ValueError):
+            dispersion(self.rocket, {'fins': Normal(1)}, 10)
+        with self.assertRaises(ValueError):
+            dispersion(self.rocket, {'cg': Normal(1)}, 10)
+
+    def test_bounded(self):
+        """No more than `pending` chunks per worker are submitted ahead of the merge"""
+        submitted = []
+        merge = Statistics.merge
+
+        def counting_merge(stats, other, rng):
+            submitted.append(CountingPool.last.submitted)
+            return merge(stats, other, rng)
+
+        with mock.patch.object(module.multiprocessing, 'Pool', CountingPool), \
+                mock.patch.object(Statistics, 'merge', counting_merge):
+            results = dispersion(self.rocket, {'span': Normal(0.002)}, 20000, seed=2,
+                                 chunksize=1000, processes=2, pending=2)
+        self.assertEqual(submitted[0], 5)
+        self.assertEqual(CountingPool.last.submitted, 20)
+        self.assertEqual(results['C_P'].count, 20000)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+test_frozen
+----------------------------------
+
+Tests for `barrowman.frozen` module.
+"""
+
+import pickle
+import sys
+import threading
+import unittest
+import numpy
+import barrowman
+from barrowman import original
+from barrowman.cache import model_key
+from barrowman.frozen import freeze, FrozenNose, FrozenTube, FrozenFin, FrozenRocket
+
+
+class TestFrozen(unittest.TestCase):
+
+    nose = barrowman.Nose(barrowman.Nose.OGIVE, 0.1, 0.3)
+    tube = barrowman.Tube(0.1, 1.0)
+    fin = barrowman.Fin(0.2, 0.05, 0.1, sweepangle=45.0)
+    rocket = original.Rocket(original.Body([nose, tube]), original.Tail(fin, 4, 0.1))
+
+    def test_same_answers(self):
+        frozen = freeze(self.rocket)
+        self.assertIsInstance(frozen, FrozenRocket)
+        self.assertIsInstance(frozen.body.components[0], FrozenNose)
+        self.assertIsInstance(frozen.tail.fin, FrozenFin)
+        self.assertIs(freeze(frozen), frozen)
+
+        Mach = numpy.linspace(0.1, 3.0, 30)
+        for model, copy in ((self.rocket, frozen), (self.rocket.body, frozen.body)):
+            numpy.testing.assert_array_equal(copy.C_P(Mach), model.C_P(Mach))
+            numpy.testing.assert_array_equal(copy.C_Na(Mach), model.C_Na(Mach))
+        self.assertEqual(frozen.tail.C_P(0.3), self.rocket.tail.C_P(0.3))
+        self.assertEqual(frozen.tail.C_Na(0.3), self.rocket.tail.C_Na(0.3))
+        self.assertEqual(frozen.tail.K_TB, self.rocket.tail.K_TB)
+        self.assertEqual(frozen.compile().C_P(0.3), self.rocket.compile().C_P(0.3))
+        self.assertEqual(model_key(frozen.body), model_key(self.rocket.body))
+
+        # frozen parts in a mutable model
+        mixed = original.Body([FrozenNose('ogive', 0.1, 0.3), FrozenTube(0.1, 1.0)])
+        self.assertEqual(mixed.C_P(0.3), self.rocket.body.C_P(0.3))
+
+    def test_immutable(self):
+        frozen = freeze(self.rocket)
+        with self.assertRaises(AttributeError):
+            frozen.body = None
+        with self.assertRaises(AttributeError):
+            frozen.tail.N = 3
+        with self.assertRaises(AttributeError):
+            frozen.body.components[1]._length = 2.0
+        with self.assertRaises(AttributeError):
+            frozen.tail.fin.extra = 1
+        self.assertFalse(hasattr(frozen.tail.fin, '__dict__'))
+        self.assertTrue(sys.getsizeof(FrozenTube(0.1, 1.0)) < sys.getsizeof(self.tube) +
+                        sys.getsizeof(self.tube.__dict__))
+
+    def test_replace(self):
+        frozen = freeze(self.rocket)
+        longer = frozen.replace(body=frozen.body.replace(
+            components=(frozen.body.components[0], FrozenTube(0.1, 2.0))))
+        expected = original.Rocket(original.Body([self.nose, barrowman.Tube(0.1, 2.0)]),
+                                   original.Tail(self.fin, 4, 0.1))
+        self.assertEqual(longer.C_P(0.3), expected.C_P(0.3))
+        self.assertEqual(frozen.body.l_0, 1.3)   # unchanged
+
+        fin = frozen.tail.fin
+        self.assertEqual(fin.replace(span=0.2).sweep, fin.sweep)
+        self.assertAlmostEqual(fin.replace(span=0.2, sweepangle=45.0).sweep, 0.2, places=12)
+        self.assertEqual(fin.replace(span=0.2), FrozenFin(0.2, 0.05, 0.2, sweep=fin.sweep))
+        self.assertEqual(hash(fin.replace()), hash(fin))
+
+        tail = frozen.tail.replace(N=3)
+        self.assertAlmostEqual(tail.C_Na(0.3) / frozen.tail.C_Na(0.3), 0.75, places=12)
+
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)).C_P(0.3), frozen.C_P(0.3))
+        with self.assertRaises(TypeError):
+            freeze(object())
+
+    def test_threads(self):
+        frozen = freeze(self.rocket)
+        expected = self.rocket.C_P(0.5)
+        results = []
+
+        def work():
+            results.append(all(frozen.C_P(0.5) == expected for i in range(200)))
+
+        threads = [threading.Thread(target=work) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 8)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
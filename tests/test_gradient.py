@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+test_gradient
+----------------------------------
+
+Tests for `barrowman.gradient` module.
+"""
+
+import unittest
+import numpy
+import barrowman
+from barrowman.batch import RocketBatch
+from barrowman.gradient import gradient, PARAMETERS
+
+
+class TestGradient(unittest.TestCase):
+
+    random = numpy.random.RandomState(2)
+    n = 20
+    columns = dict(
+        width=random.uniform(0.05, 0.2, n),
+        nose_length=random.uniform(0.2, 0.6, n),
+        tube_length=random.uniform(0.5, 2.0, n),
+        root=random.uniform(0.1, 0.3, n),
+        tip=random.uniform(0.02, 0.1, n),
+        span=random.uniform(0.05, 0.2, n),
+        sweep=random.uniform(0.0, 0.2, n),
+    )
+    N = random.randint(3, 7, n)
+
+    def check(self, Mach, **kwargs):
+        """Against central finite differences"""
+        batch = RocketBatch(N=self.N, **dict(self.columns, **kwargs))
+        results = gradient(batch, Mach)
+
+        for name, (value, derivatives) in results.items():
+            numpy.testing.assert_allclose(value, getattr(batch, name)(Mach), rtol=1e-12)
+
+        for parameter in PARAMETERS:
+            h = 1e-4 * self.columns[parameter]
+            columns = dict(self.columns, **kwargs)
+            up = RocketBatch(N=self.N, **dict(columns, **{parameter: columns[parameter] + h}))
+            down = RocketBatch(N=self.N, **dict(columns, **{parameter: columns[parameter] - h}))
+            for name, (value, derivatives) in results.items():
+                fd = (getattr(up, name)(Mach) - getattr(down, name)(Mach)) / (2 * h)
+                numpy.testing.assert_allclose(derivatives[parameter], fd, rtol=1e-5, atol=1e-6,
+                                              err_msg='d{0}/d{1}'.format(name, parameter))
+
+    def test_subsonic(self):
+        self.check(0.3)
+
+    def test_transonic_and_supersonic(self):
+        self.check(1.2)
+        self.check(2.5)
+        self.check(numpy.linspace(0.1, 3.0, 6)[:, None])
+
+    def test_nose_shapes(self):
+        for shape in barrowman.Nose.SHAPES:
+            self.check(0.5, nose_shape=shape)
+        self.check(0.5, nose_shape=barrowman.Nose.SECANT_OGIVE, nose_parameter=2.0)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
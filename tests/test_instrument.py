@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+test_instrument
+----------------------------------
+
+Tests for `barrowman.instrument` module.
+"""
+
+import unittest
+import barrowman
+from barrowman import original
+from barrowman.instrument import Instrumentation
+
+
+def workload():
+    nose = barrowman.Nose(barrowman.Nose.OGIVE, 0.1, 0.4)
+    body = original.Body([nose, barrowman.Tube(0.1, 1.2)])
+    tail = original.Tail(barrowman.Fin(0.2, 0.05, 0.1), 4, 0.1)
+    rocket = original.Rocket(body, tail)
+    values = [rocket.C_P(m) for m in (0.3, 0.5, 2.0)]
+    nose._length = 0.5
+    values.append(rocket.C_P(0.3))
+    return values
+
+
+class TestInstrument(unittest.TestCase):
+
+    def test_counts(self):
+        with Instrumentation() as profile:
+            self.assertTrue(profile.active)
+            values = workload()
+        self.assertFalse(profile.active)
+        self.assertEqual(values, workload())
+
+        counts = profile.as_dict()
+        self.assertEqual(counts['Rocket.C_P']['calls'], 4)
+        self.assertEqual(counts['Nose.__init__']['calls'], 1)
+        self.assertEqual(counts['Tail.C_P']['calls'], 4)
+        self.assertIsNone(counts['Rocket.C_P']['hit_rate'])
+
+        # the tail is worked out once; the body once, then updated on the change
+        self.assertEqual(counts['Tail.C_P']['misses'], 1)
+        self.assertEqual(counts['Tail.C_P']['hits'], 3)
+        self.assertEqual(counts['Tail._terms']['misses'], 1)
+        self.assertEqual(counts['Body._sum']['misses'], 1)
+        self.assertEqual(counts['Body._sum']['hits'], counts['Body._sum']['calls'] - 1)
+        self.assertGreater(counts['Body._component_changed']['calls'], 0)
+        self.assertEqual(counts['barrowman.nose_volume']['calls'], 2)
+
+        for name, c in counts.items():
+            self.assertGreaterEqual(c['time'], 0)
+        self.assertGreaterEqual(counts['Rocket.C_P']['time'], counts['Tail.C_P']['time'])
+
+    def test_restored(self):
+        """Methods are only wrapped while active, and the counts add up until reset"""
+        saved = original.Rocket.C_P, barrowman.nose_volume
+        profile = Instrumentation()
+        profile.start()
+        self.assertIsNot(original.Rocket.C_P, saved[0])
+        with self.assertRaises(RuntimeError):
+            Instrumentation().start()
+        workload()
+        profile.stop()
+        self.assertIs(original.Rocket.C_P, saved[0])
+        self.assertIs(barrowman.nose_volume, saved[1])
+
+        workload()
+        self.assertEqual(profile.as_dict()['Rocket.C_P']['calls'], 4)
+        with profile:
+            workload()
+        self.assertEqual(profile.as_dict()['Rocket.C_P']['calls'], 8)
+        profile.reset()
+        self.assertEqual(profile.as_dict(), {})
+
+    def test_report(self):
+        with Instrumentation() as profile:
+            workload()
+        report = profile.report()
+        lines = report.splitlines()
+        self.assertTrue(lines[0].startswith('method'))
+        self.assertEqual(len(lines), len(profile.as_dict()) + 1)
+        self.assertIn('Tail.C_P', report)
+        self.assertIn('75.0%', report)
+        self.assertEqual(sorted(line.split()[0] for line in lines[1:]),
+                         [line.split()[0] for line in profile.report('name').splitlines()[1:]])
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
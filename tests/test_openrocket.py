@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+test_openrocket
+----------------------------------
+
+Tests for `barrowman.openrocket` module.
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+import barrowman
+from barrowman import openrocket
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+STANDARD = os.path.join(DATA, 'standard-rocket.ork')
+
+
+def xml():
+    with zipfile.ZipFile(STANDARD) as archive:
+        return archive.read('rocket.ork').decode('utf-8')
+
+
+class TestOpenRocket(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text, compress=None):
+        path = os.path.join(self.directory, name)
+        if compress == 'zip':
+            with zipfile.ZipFile(path, 'w') as archive:
+                archive.writestr('rocket.ork', text)
+        elif compress == 'gzip':
+            with gzip.open(path, 'wt') as f:
+                f.write(text)
+        else:
+            with open(path, 'w') as f:
+                f.write(text)
+        return path
+
+    def test_standard_rocket(self):
+        design = openrocket.read(STANDARD)
+        self.assertEqual(design.name, 'Standard Rocket')
+        nose, tube = design.components
+        self.assertEqual(nose.shape, barrowman.Nose.CONE)
+        self.assertEqual((nose._width, nose.length), (0.1, 0.3))
+        self.assertEqual((tube._width, tube.length), (0.1, 1.0))   # radius 'auto'
+        self.assertEqual((design.fin.root, design.fin.tip, design.fin.span), (0.2, 0.05, 0.1))
+        self.assertEqual(design.N, 4)
+
+        rocket = openrocket.load(STANDARD)
+        self.assertAlmostEqual(rocket.C_P(0.3), 1.0407, places=4)
+
+    def test_formats(self):
+        """Plain and gzipped XML read the same as zipped"""
+        expected = openrocket.load(STANDARD).C_P(0.3)
+        for compress in (None, 'gzip'):
+            path = self.write('rocket.ork', xml(), compress)
+            self.assertEqual(openrocket.load(path).C_P(0.3), expected)
+
+    def test_shapes(self):
+        text = xml().replace('<shape>conical</shape>',
+                             '<shape>ogive</shape><shapeparameter>0.5</shapeparameter>')
+        nose = openrocket.read(self.write('secant.ork', text)).components[0]
+        self.assertEqual(nose.shape, barrowman.Nose.SECANT_OGIVE)
+        self.assertTrue(nose.parameter > (0.05**2 + 0.3**2) / 0.1)
+
+        text = xml().replace('<shape>conical</shape>', '<shape>haack</shape>')
+        nose = openrocket.read(self.write('haack.ork', text)).components[0]
+        self.assertEqual(nose.shape, barrowman.Nose.HAACK)
+
+        text = xml().replace('<shape>conical</shape>', '<shape>spline</shape>')
+        with self.assertRaises(ValueError):
+            openrocket.read(self.write('spline.ork', text))
+
+    def test_unsupported(self):
+        text = xml().replace('</bodytube>', '</bodytube><transition><length>0.1</length></transition>')
+        with self.assertRaises(ValueError):
+            openrocket.read(self.write('transition.ork', text))
+
+        text = xml().replace('<trapezoidfinset>', '<innertube><length>1</length></innertube>'
+                                                  '<trapezoidfinset>', 1)
+        self.assertEqual(openrocket.read(self.write('inner.ork', text)).N, 4)
+
+    def test_fin_position(self):
+        """Fins must end at the bottom of the rocket"""
+        expected = openrocket.load(STANDARD).C_P(0.3)
+        for position in ('<position type="top">0.8</position>',
+                         '<position type="middle">0.4</position>',
+                         '<position type="absolute">1.1</position>',
+                         '<axialoffset method="bottom">0.0</axialoffset>', ''):
+            text = xml().replace('<position type="bottom">0.0</position>', position)
+            self.assertEqual(openrocket.load(self.write('fins.ork', text)).C_P(0.3), expected)
+
+        for position in ('<position type="top">0.0</position>',
+                         '<axialoffset method="bottom">-0.1</axialoffset>',
+                         '<position type="after">0.0</position>'):
+            text = xml().replace('<position type="bottom">0.0</position>', position)
+            with self.assertRaises(ValueError):
+                openrocket.read(self.write('fins.ork', text))
+
+        # fins on a tube that isn't the last one
+        text = xml().replace('</bodytube>', '</bodytube><bodytube><length>0.5</length>'
+                                            '<radius>auto</radius></bodytube>')
+        with self.assertRaises(ValueError):
+            openrocket.read(self.write('fins.ork', text))
+
+    def test_missing(self):
+        """A file missing values is reported, not raised"""
+        text = xml().replace('<rootchord>0.2</rootchord>', '')
+        result = openrocket.evaluate_file(self.write('missing.ork', text))
+        self.assertIsNone(result.C_P)
+        self.assertTrue(result.error)
+
+    def test_directory(self):
+        os.mkdir(os.path.join(self.directory, 'more'))
+        for i, length in enumerate((1.0, 1.5, 2.0)):
+            text = xml().replace('<length>1.0</length>', '<length>{0}</length>'.format(length), 1)
+            self.write(os.path.join('more' if i else '', 'rocket{0}.ork'.format(i)), text, 'zip')
+        self.write('broken.ork', 'not a rocket')
+        self.write('notes.txt', 'ignored')
+
+        for processes in (1, 2):
+            results = list(openrocket.evaluate_directory(self.directory, Mach=0.3,
+                                                         processes=processes))
+            self.assertEqual([os.path.basename(r.path) for r in results],
+                             ['broken.ork', 'rocket0.ork', 'rocket1.ork', 'rocket2.ork'])
+            self.assertIsNone(results[0].C_P)
+            self.assertTrue(results[0].error)
+            self.assertAlmostEqual(results[1].C_P, 1.0407, places=4)
+            self.assertTrue(results[1].C_P < results[2].C_P < results[3].C_P)
+            self.assertEqual(results[3].name, 'Standard Rocket')
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
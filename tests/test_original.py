@@ -8,7 +8,9 @@ test_original
 Tests for `barrowman.original` module.
 """
 
+import pickle
 import unittest
+import numpy
 import barrowman
 from barrowman import original
 
@@ -19,7 +21,7 @@ class TestOrignal(unittest.TestCase):
     tube = barrowman.Tube(0.1, 1.0)
     fin = barrowman.Fin(0.2, 0.05, 0.1, sweepangle=45.0)
     body = original.Body([nose, tube])
-    tail = original.Tail(fin, 4)
+    tail = original.Tail(fin, 4, 0.1)
 
     def setUp(self):
         pass
@@ -48,7 +50,173 @@ class TestOrignal(unittest.TestCase):
 
     def test_rocket_cp_subsonic(self):
         r = original.Rocket(self.body, self.tail)
-        self.assertAlmostEqual(r.C_P(0.3), 0.475, places=4)  #: FIXME Placeholder test, find real number
+        # OpenRocket puts it at 1.0, it also adds lift on the body tube
+        self.assertAlmostEqual(r.C_P(0.3), 1.0407, places=4)
+
+    def test_tail_C_Na(self):
+        """Four fins in presence of the body, against the closed form of the
+        subsonic fin normal force (Barrowman and Barrowman, TIR-33) times the
+        interference factors.
+        """
+        s, d, l_f = 0.1, 0.1, (0.1**2 + 0.025**2)**0.5
+        beta = (1 - 0.3**2)**0.5
+        C_Na4 = 4 * 4 * (s / d)**2 / (1 + (1 + (2 * beta * l_f / (0.2 + 0.05))**2)**0.5)
+        K = self.tail.K_TB + self.tail.K_BT
+        self.assertAlmostEqual(K, (1 + 0.05 / 0.15)**2, places=12)
+        self.assertAlmostEqual(self.tail.C_Na(0.3), K * C_Na4, places=10)
+
+        # The fins on their own: no interference, reference area must be given
+        alone = original.Tail(self.fin, 4)
+        self.assertAlmostEqual(alone.K_TB, 1.0, places=12)
+        self.assertAlmostEqual(alone.K_BT, 0.0, places=12)
+        self.assertAlmostEqual(alone.C_Na(0.3, self.body.A_r), C_Na4, places=10)
+        with self.assertRaises(ValueError):
+            alone.C_Na(0.3)
+
+        # Supersonic, and faired through the transonic region
+        A_fin = 0.1 * (0.2 + 0.05) / 2
+        self.assertAlmostEqual(alone.C_Na(2.0, self.body.A_r),
+                               2 * 4 * A_fin / (3**0.5 * self.body.A_r), places=10)
+        mach = numpy.linspace(0.0, 3.0, 301)
+        C_Na = alone.C_Na(mach, self.body.A_r)
+        self.assertTrue(numpy.all(numpy.isfinite(C_Na)))
+        self.assertTrue(numpy.all(numpy.abs(numpy.diff(C_Na)) < 0.5))
+
+    def test_mach_array(self):
+        """Every method should accept an array of Mach numbers and give back
+        one answer per Mach number, matching the scalar call.
+        """
+        r = original.Rocket(self.body, self.tail)
+        mach = numpy.linspace(0.1, 0.8, 8)
+
+        for method in (self.body.C_P, self.body.C_Na, self.tail.C_P, r.C_P):
+            result = method(mach)
+            self.assertEqual(result.shape, mach.shape)
+            for m, value in zip(mach, result):
+                self.assertAlmostEqual(value, method(m), places=12)
+
+        # scalar in, scalar out
+        self.assertTrue(numpy.ndim(r.C_P(0.3)) == 0)
+
+    def test_compile(self):
+        r = original.Rocket(self.body, self.tail)
+        compiled = r.compile()
+        mach = numpy.linspace(0.1, 3.0, 30)
+
+        for m in (0.3, 1.2, 2.0):
+            self.assertAlmostEqual(compiled(m), r.C_P(m), places=12)
+        numpy.testing.assert_allclose(compiled.C_P(mach), r.C_P(mach), rtol=1e-12)
+
+        out = numpy.empty_like(mach)
+        self.assertIs(compiled.C_P_into(mach, out), out)
+        numpy.testing.assert_allclose(out, r.C_P(mach), rtol=1e-12)
+
+        # Mach is read after out is written, so the two can't overlap
+        with self.assertRaises(ValueError):
+            compiled.C_P_into(mach, mach)
+        with self.assertRaises(ValueError):
+            compiled.C_P_into(mach[1:], mach[:-1])
+
+    def test_incremental_update(self):
+        """A body updated one change at a time matches one built from scratch"""
+        random = numpy.random.RandomState(1)
+        components = [barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3)]
+        components += [barrowman.Tube(random.uniform(0.05, 0.2), random.uniform(0.1, 2.0))
+                       for i in range(20)]
+        body = original.Body(components + components[3:5])
+        body.C_P(0.3)
+
+        for step in range(200):
+            component = components[random.randint(len(components))]
+            if random.rand() < 0.5:
+                component._length = random.uniform(0.1, 2.0)
+            else:
+                component._width = random.uniform(0.05, 0.2)
+
+            fresh = original.Body(body.components)
+            self.assertEqual(body.l_0, fresh.l_0)
+            self.assertEqual(body.V_B, fresh.V_B)
+            self.assertEqual(body.A_B, fresh.A_B)
+            self.assertEqual(body.A_r, fresh.A_r)
+
+        # only the changed component is looked at again
+        calls = []
+        counted = barrowman.Tube(0.1, 1.0)
+        volume = counted._volume
+        counted._volume = lambda: calls.append(1) or volume()
+        other = barrowman.Tube(0.1, 1.0)
+        body = original.Body([components[0], counted, other])
+        body.V_B
+        other._length = 2.0
+        body.V_B
+        self.assertEqual(len(calls), 1)
+
+    def test_stack(self):
+        """Sub-stacks match bodies built from the same components"""
+        random = numpy.random.RandomState(3)
+        components = [barrowman.Nose(barrowman.Nose.OGIVE, 0.1, 0.4)]
+        components += [barrowman.Tube(random.uniform(0.05, 0.2), random.uniform(0.1, 2.0))
+                       for i in range(13)]
+        body = original.Body(components)
+
+        self.assertEqual(body.station(0), 0.0)
+        self.assertAlmostEqual(body.station(2), 0.4 + components[1].length, places=12)
+        self.assertEqual(body.station(len(components)), body.l_0)
+        for i in (-1, len(components) + 1):
+            with self.assertRaises(IndexError):
+                body.station(i)
+
+        for start in range(len(components)):
+            for stop in range(start + 1, len(components) + 1):
+                stack = body.stack(start, stop)
+                fresh = original.Body(components[start:stop])
+                self.assertEqual(stack.l_0, fresh.l_0)
+                self.assertEqual(stack.V_B, fresh.V_B)
+                self.assertEqual(stack.A_B, fresh.A_B)
+                self.assertEqual(stack.A_r, fresh.A_r)
+                self.assertEqual(stack.C_P(0.3), fresh.C_P(0.3))
+                self.assertEqual(stack.C_Na(0.3), fresh.C_Na(0.3))
+
+        # the upper stage of a two stage rocket, and its stack of the stack
+        upper = body.stack(stop=5)
+        self.assertEqual(upper.components, tuple(components[:5]))
+        self.assertAlmostEqual(upper.stack(2).station(1), components[2].length, places=12)
+        self.assertEqual(upper.station(5), upper.l_0)
+        for i in (-1, 6):
+            with self.assertRaises(IndexError):
+                upper.station(i)
+        rocket = original.Rocket(upper, self.tail)
+        self.assertEqual(rocket.C_P(0.3), original.Rocket(
+            original.Body(components[:5]), self.tail).C_P(0.3))
+
+        # stacks follow changes to the components
+        components[2]._width = 0.5
+        self.assertEqual(upper.A_r, components[2].area)
+        self.assertAlmostEqual(body.stack(1, 3).V_B, components[1].volume + components[2].volume,
+                               places=12)
+
+        with self.assertRaises(ValueError):
+            body.stack(4, 4)
+
+    def test_component_changes(self):
+        """Changing a component after building the body or tail updates them"""
+        tube = barrowman.Tube(0.1, 1.0)
+        fin = barrowman.Fin(0.2, 0.05, 0.1, sweepangle=45.0)
+        body = original.Body([barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3), tube])
+        tail = original.Tail(fin, 4, 0.1)
+        self.assertAlmostEqual(body.l_0, 1.3, places=12)
+        self.assertAlmostEqual(tail.C_P(0.3), 0.075, places=4)
+
+        tube._length = 2.0
+        fin.sweep = 0.0
+        self.assertAlmostEqual(body.l_0, 2.3, places=12)
+        self.assertAlmostEqual(body.C_P(0.3), 0.2, places=4)
+        self.assertAlmostEqual(tail.C_P(0.3), 0.035, places=4)
+
+        # a copy keeps following its own components
+        body = pickle.loads(pickle.dumps(body))
+        body.components[1]._length = 1.0
+        self.assertAlmostEqual(body.l_0, 1.3, places=12)
 
 if __name__ == '__main__':
     import sys
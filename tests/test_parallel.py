@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+test_parallel
+----------------------------------
+
+Tests for `barrowman.parallel` module.
+"""
+
+import unittest
+import numpy
+import barrowman
+from barrowman import parallel
+from barrowman.batch import RocketBatch
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        rng = numpy.random.default_rng(5)
+        size = 10007
+        self.batch = RocketBatch(
+            width=rng.uniform(0.05, 0.2, size), nose_length=rng.uniform(0.2, 0.6, size),
+            tube_length=rng.uniform(0.8, 2.0, size), root=rng.uniform(0.1, 0.3, size),
+            tip=rng.uniform(0.02, 0.1, size), span=rng.uniform(0.05, 0.2, size),
+            sweep=rng.uniform(0.0, 0.1, size), N=rng.choice([3, 4], size),
+            nose_shape=barrowman.Nose.POWER, nose_parameter=rng.uniform(0.3, 0.7, size))
+        self.Mach = rng.uniform(0.1, 3.0, size)
+
+    def test_evaluate(self):
+        """Any number of workers and chunk size give the batch's answer"""
+        expected = numpy.array([self.batch.C_P(self.Mach), self.batch.C_Na(self.Mach)])
+        for processes, chunksize in ((1, 65536), (1, 1000), (2, 999), (3, 4096)):
+            results = parallel.evaluate(self.batch, self.Mach, processes, chunksize)
+            self.assertEqual(results.shape, (2, len(self.batch)))
+            self.assertTrue(results.flags['C_CONTIGUOUS'])
+            numpy.testing.assert_array_equal(results, expected)
+
+    def test_executor(self):
+        """The designs are shared once, and evaluated at many Mach numbers"""
+        with parallel.SharedExecutor(self.batch, processes=2, chunksize=2500) as executor:
+            for Mach in (0.3, 2.0, self.Mach):
+                C_P, C_Na = executor.evaluate(Mach)
+                numpy.testing.assert_array_equal(C_P, self.batch.C_P(Mach))
+                numpy.testing.assert_array_equal(C_Na, self.batch.C_Na(Mach))
+        with self.assertRaises(ValueError):
+            executor.evaluate(0.3)
+        with self.assertRaises(ValueError):
+            parallel.SharedExecutor(self.batch, processes=1, chunksize=0)
+
+    def test_empty(self):
+        batch = self.batch.take(slice(0, 0))
+        self.assertEqual(parallel.evaluate(batch, 0.3, processes=2).shape, (2, 0))
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
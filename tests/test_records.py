@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+test_records
+----------------------------------
+
+Tests for `barrowman.records` module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+from barrowman import Nose, records
+from barrowman.batch import RocketBatch
+
+
+class TestRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'designs.npy')
+
+        random = numpy.random.RandomState(0)
+        n = 1000
+        self.batch = RocketBatch(random.uniform(0.05, 0.2, n), random.uniform(0.2, 0.6, n),
+                                 random.uniform(0.5, 2.0, n), random.uniform(0.1, 0.3, n),
+                                 random.uniform(0.02, 0.1, n), random.uniform(0.05, 0.2, n),
+                                 sweep=random.uniform(0.0, 0.2, n), N=random.randint(3, 7, n))
+        self.Mach = random.uniform(0.0, 3.0, n)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_zero_copy(self):
+        data = records.from_batch(self.batch, self.Mach)
+        batch = RocketBatch.from_records(data)
+        for name in ('width', 'tube_length', 'root', 'sweep', 'N'):
+            self.assertTrue(numpy.shares_memory(getattr(batch, name), data))
+        numpy.testing.assert_array_equal(batch.C_P(self.Mach), self.batch.C_P(self.Mach))
+
+    def test_shapes(self):
+        """Nose shapes and parameters survive the round trip"""
+        for shape, parameter in ((Nose.OGIVE, None), (Nose.POWER, 0.4), (Nose.HAACK, 1 / 3.0)):
+            b = self.batch
+            batch = RocketBatch(b.width, b.nose_length, b.tube_length, b.root, b.tip, b.span,
+                                sweep=b.sweep, N=b.N, nose_shape=shape, nose_parameter=parameter)
+            back = RocketBatch.from_records(records.from_batch(batch, self.Mach))
+            self.assertEqual(back.nose_shape, shape)
+            numpy.testing.assert_array_equal(back.V_B, batch.V_B)
+            numpy.testing.assert_array_equal(back.C_P(self.Mach), batch.C_P(self.Mach))
+
+        # mixed shapes evaluate a shape at a time, but don't make one batch
+        data = records.from_batch(self.batch, self.Mach)
+        data[500:] = records.from_batch(back, self.Mach)[500:]
+        records.evaluate(data, chunksize=300)
+        numpy.testing.assert_array_equal(data['C_P'][:500], self.batch.C_P(self.Mach)[:500])
+        numpy.testing.assert_array_equal(data['C_P'][500:], back.C_P(self.Mach)[500:])
+        with self.assertRaises(ValueError):
+            RocketBatch.from_records(data)
+
+    def test_file(self):
+        out = records.create(self.path, len(self.batch))
+        out[:] = records.from_batch(self.batch, self.Mach)
+        out.flush()
+        del out
+
+        for processes in (1, 2):
+            self.assertEqual(records.evaluate_file(self.path, processes, chunksize=300), 1000)
+            data = records.load(self.path)
+            self.assertIsInstance(data, numpy.memmap)
+            numpy.testing.assert_allclose(data['C_P'], self.batch.C_P(self.Mach), rtol=1e-14)
+            numpy.testing.assert_allclose(data['C_Na'], self.batch.C_Na(self.Mach), rtol=1e-14)
+
+        numpy.save(self.path, numpy.zeros(3))
+        with self.assertRaises(ValueError):
+            records.load(self.path)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+test_search
+----------------------------------
+
+Tests for `barrowman.search` module.
+"""
+
+import unittest
+from unittest import mock
+import numpy
+import barrowman
+from barrowman import original, search
+from barrowman.search import fin_grid_search
+
+
+class CountingPool(object):
+    """Stands in for `multiprocessing.Pool`, running each task in process
+    when its result is asked for, and counting the tasks submitted"""
+
+    def __init__(self, processes=None, initializer=None, initargs=()):
+        if initializer is not None:
+            initializer(*initargs)
+        self.submitted = 0
+        CountingPool.last = self
+
+    def apply_async(self, function, args=()):
+        self.submitted += 1
+        return mock.Mock(get=lambda: function(*args))
+
+    def terminate(self):
+        pass
+
+    def join(self):
+        pass
+
+
+class TestSearch(unittest.TestCase):
+
+    body = original.Body([barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3),
+                          barrowman.Tube(0.1, 1.0)])
+    root = numpy.linspace(0.1, 0.3, 11)
+    tip = numpy.linspace(0.02, 0.1, 5)
+    span = numpy.linspace(0.05, 0.2, 7)
+    sweep = numpy.linspace(0.0, 0.2, 6)
+
+    def search(self, **kwargs):
+        found = list(fin_grid_search(self.body, 0.85, 1.7, self.root, self.tip, self.span,
+                                     sweep=self.sweep, tolerance=0.2, **kwargs))
+        return numpy.concatenate(found)
+
+    def test_matches_rocket(self):
+        designs = self.search(processes=1, chunksize=100)
+        self.assertTrue(0 < len(designs) < 11 * 5 * 7 * 6)
+
+        diameter = 0.1
+        for design in designs:
+            fin = barrowman.Fin(design['root'], design['tip'], design['span'], sweep=design['sweep'])
+            rocket = original.Rocket(self.body, original.Tail(fin, 4, 0.1))
+            margin = (rocket.C_P(0.3) - 0.85) / diameter
+            self.assertAlmostEqual(design['margin'], margin, places=10)
+            self.assertTrue(abs(margin - 1.7) <= 0.2)
+
+    def test_pool(self):
+        serial = self.search(processes=1, chunksize=100)
+        parallel = self.search(processes=2, chunksize=100)
+        numpy.testing.assert_array_equal(serial, parallel)
+
+    def test_bounded(self):
+        """No more than `pending` chunks per worker are submitted ahead of the caller"""
+        with mock.patch.object(search.multiprocessing, 'Pool', CountingPool):
+            results = fin_grid_search(self.body, 0.85, 1.7, self.root, self.tip, self.span,
+                                      sweep=self.sweep, tolerance=1e9, processes=2,
+                                      chunksize=10, pending=2)
+            next(results)
+            self.assertEqual(CountingPool.last.submitted, 4)
+            self.assertEqual(len(numpy.concatenate(list(results))), 11 * 5 * 7 * 6 - 10)
+            self.assertEqual(CountingPool.last.submitted, 231)
+
+    def test_sweepangle(self):
+        designs = numpy.concatenate(list(fin_grid_search(
+            self.body, 0.85, 1.7, self.root, self.tip, self.span,
+            sweepangle=[0.0, 30.0, 45.0], tolerance=0.2, processes=1)))
+        angles = numpy.degrees(numpy.arctan(designs['sweep'] / designs['span']))
+        self.assertTrue(numpy.all(numpy.isclose(angles[:, None], [0.0, 30.0, 45.0]).any(axis=1)))
+        with self.assertRaises(ValueError):     # when called, not when first iterated
+            fin_grid_search(self.body, 0.85, 1.7, 0.2, 0.05, 0.1, sweep=0.1, sweepangle=45.0)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+test_server
+----------------------------------
+
+Tests for `barrowman.server` module.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import unittest
+from barrowman import server
+from tests.test_cli import strict
+from tests.test_stream import DESIGNS, rocket
+
+
+class TestServer(unittest.TestCase):
+
+    def run_server(self, client, **options):
+        """Run a client coroutine against a server on localhost"""
+        async def run():
+            evaluation = server.EvaluationServer(**options)
+            host, port = await evaluation.start()
+            try:
+                return await client(evaluation, host, port)
+            finally:
+                await evaluation.close()
+        return asyncio.run(run())
+
+    def test_pipelined(self):
+        """Requests sent together on one connection are batched, and answered in order"""
+        requests = [dict(design, id=i, Mach=m) for i, design in enumerate(DESIGNS)
+                    for m in (0.3, 2.0)]
+
+        async def client(evaluation, host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(''.join(json.dumps(r) + '\n' for r in requests).encode('utf-8'))
+            await writer.drain()
+            answers = [json.loads(await reader.readline()) for r in requests]
+            writer.write(b'{"metrics": true}\n')
+            metrics = json.loads(await reader.readline())
+            writer.close()
+            return answers, metrics
+
+        answers, metrics = self.run_server(client, window=0.05)
+        for request, answer in zip(requests, answers):
+            self.assertEqual(answer['id'], request['id'])
+            r = rocket(DESIGNS[request['id']])
+            self.assertAlmostEqual(answer['C_P'], r.C_P(request['Mach']), places=10)
+            self.assertAlmostEqual(answer['C_Na'], r.C_Na(request['Mach']), places=10)
+
+        self.assertEqual(metrics['requests'], len(requests))
+        self.assertEqual(metrics['designs'], len(requests))
+        self.assertEqual(metrics['batches'], 1)
+        self.assertEqual(metrics['max_queue_depth'], len(requests))
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertGreater(metrics['throughput'], 0)
+
+    def test_connections(self):
+        """Concurrent clients share batches, no larger than max_batch"""
+        async def one(host, port, design):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write((json.dumps(design) + '\n').encode('utf-8'))
+            answer = json.loads(await reader.readline())
+            writer.close()
+            return answer
+
+        async def client(evaluation, host, port):
+            answers = await asyncio.gather(*[one(host, port, design) for design in DESIGNS * 3])
+            return answers, evaluation.batcher.metrics()
+
+        answers, metrics = self.run_server(client, window=0.2, max_batch=4)
+        for design, answer in zip(DESIGNS * 3, answers):
+            self.assertAlmostEqual(answer['C_P'], rocket(design).C_P(0.3), places=10)
+        self.assertEqual(metrics['designs'], 12)
+        self.assertEqual(metrics['batches'], 3)
+        self.assertEqual(metrics['mean_batch'], 4)
+
+    def test_errors(self):
+        """Bad requests are answered with an error, and don't spoil the batch"""
+        requests = ['not json', '[1, 2]', json.dumps(dict(DESIGNS[0], nose_shape='blunt', id='x')),
+                    json.dumps(dict(DESIGNS[0], span=None)), json.dumps(DESIGNS[1])]
+
+        async def client(evaluation, host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(''.join(r + '\n' for r in requests).encode('utf-8'))
+            answers = [json.loads(await reader.readline()) for r in requests]
+            writer.close()
+            return answers
+
+        answers = self.run_server(client)
+        for answer in answers[:4]:
+            self.assertIn('error', answer)
+        self.assertEqual(answers[2]['id'], 'x')
+        self.assertAlmostEqual(answers[4]['C_Na'], rocket(DESIGNS[1]).C_Na(0.3), places=10)
+
+    def test_not_finite(self):
+        """Results that aren't finite are answered as null, in strict JSON"""
+        async def client(evaluation, host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write((json.dumps(dict(DESIGNS[0], Mach='nan', id=1)) + '\n').encode('utf-8'))
+            answer = json.loads(await reader.readline(), parse_constant=strict)
+            writer.close()
+            return answer
+
+        self.assertEqual(self.run_server(client), {'C_P': None, 'C_Na': None, 'id': 1})
+
+    def test_batcher(self):
+        """The batcher can be used in process, without a socket"""
+        async def run():
+            batcher = server.Batcher(window=0.01)
+            results = await asyncio.gather(*[batcher.evaluate(dict(design, Mach=1.2))
+                                             for design in DESIGNS])
+            return results, batcher.metrics()
+
+        results, metrics = asyncio.run(run())
+        for design, (C_P, C_Na) in zip(DESIGNS, results):
+            self.assertAlmostEqual(C_P, rocket(design).C_P(1.2), places=10)
+            self.assertAlmostEqual(C_Na, rocket(design).C_Na(1.2), places=10)
+        self.assertEqual(metrics['batches'], 1)
+
+    def test_executor(self):
+        """Batches are evaluated in the executor, not on the event loop"""
+        class Executor(concurrent.futures.ThreadPoolExecutor):
+            submitted = 0
+
+            def submit(self, *args, **kwargs):
+                self.submitted += 1
+                return super(Executor, self).submit(*args, **kwargs)
+
+        async def run(executor):
+            batcher = server.Batcher(window=0.01, max_batch=2, executor=executor)
+            return await asyncio.gather(*[batcher.evaluate(design) for design in DESIGNS])
+
+        with Executor(1) as executor:
+            results = asyncio.run(run(executor))
+        self.assertEqual(executor.submitted, 2)
+        for design, (C_P, C_Na) in zip(DESIGNS, results):
+            self.assertAlmostEqual(C_P, rocket(design).C_P(0.3), places=10)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
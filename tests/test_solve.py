@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+test_solve
+----------------------------------
+
+Tests for `barrowman.solve` module.
+"""
+
+import unittest
+import numpy
+import barrowman
+from barrowman import original
+from barrowman.batch import RocketBatch
+from barrowman.solve import size_fins
+
+
+def margin(batch, i, cg, Mach, **fin):
+    """Margin of one design of a batch, as an `original.Rocket`"""
+    width = batch.width[i]
+    values = dict(root=batch.root[i], tip=batch.tip[i], span=batch.span[i], sweep=batch.sweep[i])
+    values.update(fin)
+    body = original.Body([barrowman.Nose(batch.nose_shape, width, batch.nose_length[i]),
+                          barrowman.Tube(width, batch.tube_length[i])])
+    tail = original.Tail(barrowman.Fin(values['root'], values['tip'], values['span'],
+                                       sweep=values['sweep']), int(batch.N[i]), width)
+    return (original.Rocket(body, tail).C_P(Mach) - cg) / width
+
+
+class TestSolve(unittest.TestCase):
+
+    def setUp(self):
+        rng = numpy.random.default_rng(3)
+        size = 500
+        self.batch = RocketBatch(
+            width=rng.uniform(0.05, 0.2, size), nose_length=rng.uniform(0.2, 0.6, size),
+            tube_length=rng.uniform(0.8, 2.0, size), root=rng.uniform(0.1, 0.3, size),
+            tip=rng.uniform(0.02, 0.1, size), span=rng.uniform(0.05, 0.2, size),
+            sweep=rng.uniform(0.0, 0.1, size), N=rng.choice([3, 4], size),
+            nose_shape=barrowman.Nose.OGIVE)
+        self.cg = 0.6 * self.batch.l_0
+
+    def test_span(self):
+        solution = size_fins(self.batch, self.cg, 1.0, 0.005, 1.0, Mach=0.5)
+        fins = solution.fins
+        self.assertTrue(solution.converged.all())
+        self.assertLess(solution.iterations.max(), 20)
+        numpy.testing.assert_allclose(fins['margin'], 1.0, atol=1e-9)
+        numpy.testing.assert_array_equal(fins['root'], self.batch.root)
+        numpy.testing.assert_array_equal(fins['sweep'], self.batch.sweep)
+        for i in range(0, 500, 50):
+            self.assertAlmostEqual(margin(self.batch, i, self.cg[i], 0.5, span=fins['span'][i]),
+                                   1.0, places=8)
+
+    def test_root_sweepangle(self):
+        """Solve the root chord, and the span at a fixed sweep angle, at
+        supersonic speed and per-design margins"""
+        wanted = numpy.linspace(0.5, 1.0, len(self.batch))
+        solution = size_fins(self.batch, self.cg, wanted, 0.01, 1.0, parameter='root', Mach=2.0)
+        ok = solution.converged
+        self.assertGreater(ok.sum(), 100)
+        numpy.testing.assert_allclose(solution.fins['margin'][ok], wanted[ok], atol=1e-9)
+        numpy.testing.assert_array_equal(solution.fins['span'][ok], self.batch.span[ok])
+        self.assertTrue(numpy.isnan(solution.fins['root'][~ok]).all())
+        self.assertTrue((solution.iterations[~ok] == 0).all())
+
+        solution = size_fins(self.batch, self.cg, 1.0, 0.005, 1.0, sweepangle=30.0)
+        fins = solution.fins
+        self.assertTrue(solution.converged.all())
+        numpy.testing.assert_allclose(fins['sweep'], fins['span'] * numpy.tan(numpy.radians(30)))
+        i = 7
+        self.assertAlmostEqual(margin(self.batch, i, self.cg[i], 0.3, span=fins['span'][i],
+                                      sweep=fins['sweep'][i]), 1.0, places=8)
+
+    def test_unbracketed(self):
+        """Designs that can't reach the margin within the bounds are reported, not solved"""
+        cg = self.cg.copy()
+        cg[:10] = self.batch.l_0[:10] * 2    # behind the rocket: no fins are enough
+        solution = size_fins(self.batch, cg, 1.0, 0.005, 1.0)
+        self.assertFalse(solution.converged[:10].any())
+        self.assertTrue(numpy.isnan(solution.fins['span'][:10]).all())
+        self.assertTrue((solution.iterations[:10] == 0).all())
+        self.assertTrue(solution.converged[10:].all())
+
+        with self.assertRaises(ValueError):
+            size_fins(self.batch, cg, 1.5, 0.005, 1.0, parameter='width')
+        with self.assertRaises(ValueError):
+            size_fins(self.batch, cg, 1.5, 0.005, 1.0, parameter='sweep', sweepangle=30.0)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
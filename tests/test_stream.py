@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+test_stream
+----------------------------------
+
+Tests for `barrowman.stream` module.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import barrowman
+from barrowman import original, stream
+
+
+DESIGNS = [
+    dict(id='standard', width=0.1, nose_length=0.3, tube_length=1.0, root=0.2, tip=0.05, span=0.1),
+    dict(width=0.08, nose_length=0.25, tube_length=[0.4, 0.3], root=0.15, tip=0.07, span=0.08,
+         sweep=0.05, N=3),
+    dict(width=0.15, nose_length=0.6, tube_length=2.2, root=0.3, tip=0.1, span=0.2, sweepangle=30.0),
+    dict(width=0.1, nose_shape='haack', nose_parameter=1 / 3.0, nose_length=0.5, tube_length=1.0,
+         root=0.2, tip=0.05, span=0.1),
+]
+
+
+def rocket(design):
+    tubes = design['tube_length']
+    tubes = tubes if isinstance(tubes, list) else [tubes]
+    nose = barrowman.Nose(design.get('nose_shape', barrowman.Nose.CONE), design['width'],
+                          design['nose_length'], design.get('nose_parameter'))
+    body = original.Body([nose] +
+                         [barrowman.Tube(design['width'], length) for length in tubes])
+    fin = barrowman.Fin(design['root'], design['tip'], design['span'], sweep=design.get('sweep'),
+                        sweepangle=design.get('sweepangle', 45.0))
+    return original.Rocket(body, original.Tail(fin, design.get('N', 4), design['width']))
+
+
+class TestStream(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def check(self, rows, Mach, designs=DESIGNS):
+        self.assertEqual(len(rows), len(designs) * len(Mach))
+        for i, design in enumerate(designs):
+            r = rocket(design)
+            for j, m in enumerate(Mach):
+                row = rows[i * len(Mach) + j]
+                self.assertEqual(str(row['id']), design.get('id', str(i)))
+                self.assertAlmostEqual(float(row['Mach']), m, places=12)
+                self.assertAlmostEqual(float(row['C_P']), r.C_P(m), places=10)
+                self.assertAlmostEqual(float(row['C_Na']), r.C_Na(m), places=10)
+                self.assertAlmostEqual(float(row['body_C_Na']), r.body.C_Na(m), places=10)
+
+    def test_jsonl_to_csv(self):
+        with open(self.path('designs.jsonl'), 'w') as out:
+            for design in DESIGNS:
+                out.write(json.dumps(design) + '\n')
+
+        count = stream.evaluate_file(self.path('designs.jsonl'), self.path('results.csv'),
+                                     [0.3, 2.0], chunksize=2)
+        self.assertEqual(count, 8)
+        with open(self.path('results.csv')) as results:
+            self.check(list(csv.DictReader(results)), [0.3, 2.0])
+
+    def test_csv_to_jsonl(self):
+        """Also through a pool of workers, one design per chunk"""
+        designs = [DESIGNS[0], dict(DESIGNS[2], id='1')]
+        fields = ['id', 'width', 'nose_length', 'tube_length', 'root', 'tip', 'span',
+                  'sweep', 'sweepangle', 'N']
+        with open(self.path('designs.csv'), 'w') as out:
+            out.write(','.join(fields) + '\n')
+            for design in designs:
+                out.write(','.join(str(design.get(f, '')) for f in fields) + '\n')
+
+        for processes in (1, 2):
+            stream.evaluate_file(self.path('designs.csv'), self.path('results.jsonl'), 0.5,
+                                 chunksize=1, processes=processes)
+            with open(self.path('results.jsonl')) as results:
+                self.check([json.loads(line) for line in results], [0.5], designs)
+
+    def test_chunks(self):
+        lines = io.StringIO(u'a,b\n1,2\n\n3,4\n5,6\n')
+        chunks = list(stream.read_chunks(lines, stream.CSV, chunksize=2))
+        self.assertEqual(chunks, [(0, 'a,b\n', ['1,2\n', '3,4\n']), (2, 'a,b\n', ['5,6\n'])])
+        with self.assertRaises(ValueError):
+            stream.guess_format('designs.txt')
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+test_table
+----------------------------------
+
+Tests for `barrowman.table` module.
+"""
+
+import unittest
+import warnings
+import numpy
+import barrowman
+from barrowman import original
+from barrowman.table import MachTable
+
+
+class TestTable(unittest.TestCase):
+
+    body = original.Body([barrowman.Nose(barrowman.Nose.CONE, 0.1, 0.3),
+                          barrowman.Tube(0.1, 1.0)])
+    tail = original.Tail(barrowman.Fin(0.2, 0.05, 0.1, sweepangle=45.0), 4, 0.1)
+    rocket = original.Rocket(body, tail)
+
+    def test_grid_points(self):
+        """On the grid the table is exact"""
+        table = MachTable(self.rocket, 0.0, 3.0, step=0.1)
+        self.assertEqual(len(table.Mach), 31)
+        for m in table.Mach:
+            self.assertAlmostEqual(table.C_P(m), self.rocket.C_P(m), places=12)
+            self.assertAlmostEqual(table.C_Na(m), self.rocket.C_Na(m), places=12)
+
+    def test_tolerance(self):
+        table = MachTable(self.rocket, 0.0, 3.0, step=0.5, tolerance=1e-4)
+        self.assertTrue(len(table.Mach) > 7)
+
+        mach = numpy.random.RandomState(0).uniform(0.0, 3.0, 1000)
+        errors = table.error(mach)
+        self.assertEqual(sorted(errors), ['C_Na', 'C_P'])
+        self.assertTrue(max(errors.values()) <= 1e-4)
+        numpy.testing.assert_allclose(table.C_P(mach), self.rocket.C_P(mach), atol=1e-4)
+
+        with self.assertRaises(ValueError):
+            MachTable(self.rocket, 0.0, 3.0, step=0.5, tolerance=1e-12, max_points=100)
+
+    def test_kinks(self):
+        """The tolerance holds across the kinks of the transonic fairing,
+        which fall inside grid cells"""
+        table = MachTable(self.rocket, 0.03, 3.0, step=0.37, tolerance=1e-4)
+        dense = numpy.linspace(0.03, 3.0, 200001)
+        self.assertTrue(max(table.error(dense).values()) <= 1e-4)
+
+    def test_bad(self):
+        with self.assertRaises(ValueError):
+            MachTable(self.rocket, 1.0, 1.0)
+        with self.assertRaises(ValueError):
+            MachTable(self.rocket, 0.0, 2.0, methods=('C_lp',))
+        table = MachTable(self.rocket, 0.0, 2.0)
+        self.assertTrue(numpy.isnan(table.C_P(float('nan'))))
+
+    def test_non_finite(self):
+        """NaN and infinite Mach numbers give NaN, without numpy warnings"""
+        table = MachTable(self.rocket, 0.0, 2.0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            for mach in (float('inf'), -float('inf')):
+                self.assertTrue(numpy.isnan(table.C_P(mach)))
+            result = table.C_P(numpy.array([0.3, numpy.nan, numpy.inf, -numpy.inf, 1e300]))
+        self.assertAlmostEqual(result[0], table.C_P(0.3), places=12)
+        self.assertTrue(numpy.isnan(result[1:4]).all())
+        self.assertTrue(numpy.isfinite(result[4]))
+
+    def test_models(self):
+        """Bodies and tails tabulate too; coefficients a model lacks are skipped"""
+        table = MachTable(self.tail, 0.0, 2.0)
+        self.assertAlmostEqual(table.C_Na(0.3), self.tail.C_Na(0.3), places=6)
+        table = MachTable(self.body, 0.0, 2.0, methods=('C_P', 'C_lp'))
+        self.assertEqual(table.methods, ('C_P',))
+        with self.assertRaises(AttributeError):
+            table.C_Na
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(unittest.main())